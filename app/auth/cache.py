@@ -0,0 +1,96 @@
+# app/auth/cache.py
+# small in-process caches for the authentication path
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from app.config import settings
+
+
+class ExpiringLRUCache:
+    """
+    Thread-safe LRU cache whose entries also expire at a given time.
+
+    Holds at most maxsize entries; adding one more evicts the least recently used.
+    Each entry expires at the time passed to set() (seconds since the epoch), and
+    an expired entry is treated as a miss and dropped. Hit/miss counts are kept for stats().
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, expires_at: float) -> None:
+        """Cache value under key until expires_at (seconds since the epoch)."""
+        if self.maxsize <= 0 or expires_at <= time.time():
+            return
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop the entry for key, if any."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+
+# Verified JWTs, keyed by the SHA-256 digest of the token (see User.verify_token)
+token_cache = ExpiringLRUCache(maxsize=settings.TOKEN_CACHE_SIZE)
+
+# UserResponse objects for get_current_user, keyed by user id
+user_cache = ExpiringLRUCache(maxsize=settings.USER_CACHE_SIZE)
+
+
+def cache_user(user_response) -> None:
+    """Cache a UserResponse for USER_CACHE_TTL_SECONDS."""
+    user_cache.set(user_response.id, user_response, time.time() + settings.USER_CACHE_TTL_SECONDS)
+
+
+def invalidate_user(user_id) -> None:
+    """
+    Drop a user's cached UserResponse.
+
+    Called automatically when a User is updated or deleted through the ORM. Call it
+    directly after changing users with bulk UPDATE/DELETE statements, which skip ORM events.
+    """
+    user_cache.invalidate(user_id)
@@ -2,6 +2,9 @@
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.orm import Session
+from app.auth.cache import cache_user, user_cache
+from app.database import get_db
 from app.models.user import User
 from app.schemas.user import UserResponse
 
@@ -11,7 +14,7 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
     # It takes a single "dependable" callable (like a function).
     # Don't call it directly, FastAPI will call it for you.
 def get_current_user(
-    db,
+    db: Session = Depends(get_db),
     token: str = Depends(oauth2_scheme)
 ) -> UserResponse:
     """Dependency to get current user from JWT token."""
@@ -24,13 +27,20 @@ def get_current_user(
     user_id = User.verify_token(token)
     if user_id is None:
         raise credentials_exception
+
+    # Serve repeat requests from the per-process user cache instead of the database
+    cached_user = user_cache.get(user_id)
+    if cached_user is not None:
+        return cached_user
     
     user = db.query(User).filter(User.id == user_id).first()
     if user is None:
         raise credentials_exception
         
     # Converts the ORM User object into a UserResponse (Pydantic model) using Pydantic's model_validate().
-    return UserResponse.model_validate(user)  # Updated from from_orm
+    user_response = UserResponse.model_validate(user)  # Updated from from_orm
+    cache_user(user_response)
+    return user_response
 
 def get_current_active_user(
     current_user: UserResponse = Depends(get_current_user)
@@ -0,0 +1,97 @@
+# app/auth/hashing.py
+# runs bcrypt hashing/verification on a bounded thread pool so it doesn't block the event loop
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.config import settings
+
+
+class PasswordHashPool:
+    """
+    Bounded thread pool for password hashing and verification.
+
+    bcrypt costs tens to hundreds of milliseconds of CPU per call. Run directly in an
+    async route it stalls every other request on the worker. bcrypt releases the GIL
+    while hashing, so a small thread pool runs several hashes in parallel while the
+    event loop keeps serving requests.
+
+    At most max_workers hashes run at once; the rest wait in the pool's queue. stats()
+    reports the queue so a login storm shows up as queueing instead of as a slow loop.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Created on first use, so importing the module doesn't start threads
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="password-hash"
+                )
+            return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run func(*args) on the pool and await its result."""
+        submitted = time.perf_counter()
+        with self._lock:
+            self._queued += 1
+
+        def call():
+            waited = time.perf_counter() - submitted
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._total_wait += waited
+                self._max_wait = max(self._max_wait, waited)
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+
+        def discard_if_cancelled(future):
+            # A job cancelled before it started (e.g. the client disconnected while it was
+            # queued) never runs call(), so it leaves the queue here instead
+            if future.cancelled():
+                with self._lock:
+                    self._queued -= 1
+
+        future = self._get_executor().submit(call)
+        future.add_done_callback(discard_if_cancelled)
+        # Cancelling the awaiting task cancels the job too, as long as it hasn't started
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queueing metrics: jobs waiting, running and completed, and time spent waiting."""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "queued": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "avg_wait_seconds": self._total_wait / self._completed if self._completed else 0.0,
+                "max_wait_seconds": self._max_wait,
+            }
+
+    def shutdown(self) -> None:
+        """Stop the worker threads; a later run() starts a new pool."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+password_hash_pool = PasswordHashPool(max_workers=settings.PASSWORD_HASH_MAX_CONCURRENCY)
@@ -1,16 +1,54 @@
 # app/database.py
 # creates connection to database
 
-from sqlalchemy import create_engine
+import logging
+import random
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy.exc import SQLAlchemyError
 
 from .config import settings
 
+# Logger for sampled statement echo (see DB_ECHO_SAMPLE_RATE)
+sql_logger = logging.getLogger("sqlalchemy.engine.sampled")
+
+def enable_sampled_echo(engine, sample_rate: float):
+    """
+    Log roughly sample_rate of the statements executed on engine.
+
+    Used instead of echo=True when only a fraction of SQL should be logged,
+    so statement logging doesn't dominate query latency.
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def log_sampled_statement(conn, cursor, statement, parameters, context, executemany):
+        if random.random() < sample_rate:
+            sql_logger.info("%s %r", statement, parameters)
+
+def get_engine_options() -> dict:
+    """
+    Pool and echo keyword arguments for create_engine/create_async_engine, from settings.
+
+    Full echo is only used when every statement should be logged; a sample rate
+    below 1 is handled by enable_sampled_echo instead.
+    """
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "echo": bool(settings.DB_ECHO) and float(settings.DB_ECHO_SAMPLE_RATE) >= 1,
+    }
+
 def get_engine(database_url: str = settings.DATABASE_URL):
     """
     Create and return a new SQLAlchemy engine.
 
+    Pool sizing and SQL echo come from settings (DB_POOL_* and DB_ECHO*).
+
     Args:
         database_url (str): The database connection URL.
 
@@ -18,33 +56,96 @@ def get_engine(database_url: str = settings.DATABASE_URL):
         Engine: A new SQLAlchemy Engine instance.
     """
     try:
-        # Create an engine instance with echo=True to log SQL queries (useful for learning)
-        engine = create_engine(database_url, echo=True)
+        engine = create_engine(database_url, **get_engine_options())
+        sample_rate = float(settings.DB_ECHO_SAMPLE_RATE)
+        if settings.DB_ECHO and 0 < sample_rate < 1:
+            enable_sampled_echo(engine, sample_rate)
         return engine
     except SQLAlchemyError as e:
         print(f"Error creating engine: {e}")
         raise
 
-def get_sessionmaker(engine):
+def get_sessionmaker(engine=None):
     """
     Create and return a new sessionmaker.
 
     Args:
         engine (Engine): The SQLAlchemy Engine to bind the sessionmaker to.
+            Defaults to a new engine configured from settings.
 
     Returns:
         sessionmaker: A configured sessionmaker factory.
     """
+    if engine is None:
+        engine = get_engine()
     return sessionmaker(
         autocommit=False,  # Disable autocommit to control transactions manually
         autoflush=False,   # Disable autoflush to control when changes are sent to the DB
         bind=engine        # Bind the sessionmaker to the provided engine
     )
 
+def get_async_database_url(database_url: str = settings.DATABASE_URL) -> str:
+    """
+    Return database_url with its driver switched to asyncpg.
+
+    DATABASE_URL is shared by the sync and async engines, so
+    'postgresql://...' (psycopg2) becomes 'postgresql+asyncpg://...'.
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+    return url.render_as_string(hide_password=False)
+
+def get_async_engine(database_url: str = settings.DATABASE_URL):
+    """
+    Create and return a new SQLAlchemy AsyncEngine.
+
+    Uses the same pool and echo settings as get_engine.
+
+    Args:
+        database_url (str): The database connection URL (the driver is switched to asyncpg).
+
+    Returns:
+        AsyncEngine: A new SQLAlchemy AsyncEngine instance.
+    """
+    try:
+        engine = create_async_engine(get_async_database_url(database_url), **get_engine_options())
+        sample_rate = float(settings.DB_ECHO_SAMPLE_RATE)
+        if settings.DB_ECHO and 0 < sample_rate < 1:
+            enable_sampled_echo(engine.sync_engine, sample_rate)
+        return engine
+    except SQLAlchemyError as e:
+        print(f"Error creating async engine: {e}")
+        raise
+
+def get_async_sessionmaker(engine=None):
+    """
+    Create and return a new async_sessionmaker.
+
+    Args:
+        engine (AsyncEngine): The AsyncEngine to bind the sessionmaker to.
+            Defaults to a new async engine configured from settings.
+
+    Returns:
+        async_sessionmaker: A configured AsyncSession factory.
+    """
+    if engine is None:
+        engine = get_async_engine()
+    return async_sessionmaker(
+        bind=engine,
+        class_=AsyncSession,
+        autoflush=False,          # Same transaction control as the sync sessions
+        expire_on_commit=False,   # Attributes can't be lazily reloaded after an async commit
+    )
+
 # Initialize engine and SessionLocal using the factory functions
 engine = get_engine()
 SessionLocal = get_sessionmaker(engine)
 
+# Async counterparts, so routes can be migrated to AsyncSession one at a time
+async_engine = get_async_engine()
+AsyncSessionLocal = get_async_sessionmaker(async_engine)
+
 # Base declarative class that our models will inherit from
 Base = declarative_base()
 
@@ -63,3 +164,15 @@ def get_db():
         yield db  # Provide the session to the caller
     finally:
         db.close()  # Ensure the session is closed after use
+
+async def get_async_db():
+    """
+    Dependency function that provides an async database session.
+
+    The async counterpart of get_db, for routes that use AsyncSession.
+
+    Yields:
+        AsyncSession: A SQLAlchemy AsyncSession instance.
+    """
+    async with AsyncSessionLocal() as db:  # The session is closed when the block exits
+        yield db
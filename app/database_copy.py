@@ -0,0 +1,290 @@
+# app/database_copy.py
+# dump, restore and seed the users and calculations tables with PostgreSQL COPY
+#
+# Usage:
+#   python -m app.database_copy dump DIR [--format binary|csv] [--tables users calculations]
+#   python -m app.database_copy restore DIR [--truncate]
+#   python -m app.database_copy seed --users 1000 --calculations 10000000
+#
+# COPY moves rows as one stream per table instead of one INSERT per row, which is what makes
+# backups, data migrations and benchmark fixtures fast. Files are streamed through in chunks,
+# so a dump of any size never sits in memory. A dump directory holds one file per table plus
+# manifest.json with the format, columns and row counts; restore checks the counts against it.
+
+import argparse
+import json
+import os
+import sys
+import uuid
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import Float, case, literal_column, text
+from sqlalchemy.exc import IntegrityError
+
+from app.config import settings
+from app.models.base import Base
+from app.models.calculation import Calculation
+from app.models.user import User  # noqa: F401 (registers the users table on Base.metadata)
+from app.operations.registry import OPERATIONS
+from app.schemas.calculation import CalculationType
+
+# Tables handled by this module, parents before children so foreign keys hold during restore
+COPY_TABLES = ("users", "calculations")
+
+COPY_FORMATS = ("binary", "csv")
+
+MANIFEST_FILE = "manifest.json"
+
+
+class RowCountMismatch(ValueError):
+    """Raised when a restored table's row count doesn't match the dump's manifest."""
+
+
+class RestoreConstraintError(ValueError):
+    """Raised when restored rows violate a key or foreign key rebuilt after the load."""
+
+
+def _tables(names: Iterable[str]):
+    names = set(names)
+    unknown = names - set(COPY_TABLES)
+    if unknown:
+        raise ValueError(f"Unknown tables: {', '.join(sorted(unknown))}")
+    return [Base.metadata.tables[name] for name in COPY_TABLES if name in names]
+
+
+def _copy_sql(conn, table, columns: List[str], direction: str, fmt: str, freeze: bool = False) -> str:
+    preparer = conn.dialect.identifier_preparer
+    column_list = ", ".join(preparer.quote(column) for column in columns)
+    options = [f"FORMAT {fmt}"]
+    if fmt == "csv":
+        options.append("HEADER")
+    if freeze:
+        options.append("FREEZE")
+    return f"COPY {preparer.format_table(table)} ({column_list}) {direction} WITH ({', '.join(options)})"
+
+
+def dump(engine, directory: str, fmt: str = "binary", tables: Iterable[str] = COPY_TABLES) -> Dict[str, int]:
+    """
+    Write each table to DIRECTORY/<table>.<format> with COPY ... TO STDOUT.
+
+    All tables are read in one REPEATABLE READ transaction, so the files form one
+    consistent snapshot (every calculation's user is in the users file).
+
+    Returns:
+        Rows written per table, as also recorded in manifest.json.
+    """
+    if fmt not in COPY_FORMATS:
+        raise ValueError(f"Unknown COPY format: {fmt}")
+    os.makedirs(directory, exist_ok=True)
+    manifest = {"format": fmt, "tables": {}}
+    with engine.connect() as conn:
+        conn = conn.execution_options(isolation_level="REPEATABLE READ")
+        with conn.begin():
+            cursor = conn.connection.dbapi_connection.cursor()
+            for table in _tables(tables):
+                columns = [column.name for column in table.columns]
+                with open(os.path.join(directory, f"{table.name}.{fmt}"), "wb") as f:
+                    cursor.copy_expert(_copy_sql(conn, table, columns, "TO STDOUT", fmt), f)
+                manifest["tables"][table.name] = {"columns": columns, "rows": cursor.rowcount}
+    with open(os.path.join(directory, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return {name: entry["rows"] for name, entry in manifest["tables"].items()}
+
+
+def _drop_constraints_and_indexes(conn, tables) -> List[str]:
+    """
+    Drop the keys, foreign keys and indexes of tables and return the SQL to recreate them.
+
+    The recreate statements come from the catalog (pg_get_constraintdef / pg_indexes),
+    so they match what is actually in the database. They are ordered like pg_restore's
+    post-data section: primary/unique keys, then indexes, then foreign keys.
+    """
+    table_names = [table.name for table in tables]
+    constraints = conn.execute(text("""
+        SELECT DISTINCT c.conrelid::regclass::text AS table_name, c.conname, c.contype,
+               pg_get_constraintdef(c.oid) AS definition
+        FROM pg_constraint c
+        WHERE c.contype IN ('p', 'u', 'f')
+          AND (c.conrelid::regclass::text = ANY(:names) OR c.confrelid::regclass::text = ANY(:names))
+    """), {"names": table_names}).all()
+    indexes = conn.execute(text("""
+        SELECT i.indexname, i.indexdef
+        FROM pg_indexes i
+        WHERE i.tablename = ANY(:names)
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = (quote_ident(i.schemaname) || '.' || quote_ident(i.indexname))::regclass)
+    """), {"names": table_names}).all()
+
+    preparer = conn.dialect.identifier_preparer
+    foreign_keys = [c for c in constraints if c.contype == "f"]
+    keys = [c for c in constraints if c.contype != "f"]
+    for constraint in foreign_keys + keys:  # foreign keys depend on the keys they reference
+        conn.execute(text(f"ALTER TABLE {constraint.table_name} DROP CONSTRAINT {preparer.quote(constraint.conname)}"))
+    for index in indexes:
+        conn.execute(text(f"DROP INDEX {preparer.quote(index.indexname)}"))
+
+    return (
+        [f"ALTER TABLE {c.table_name} ADD CONSTRAINT {preparer.quote(c.conname)} {c.definition}" for c in keys]
+        + [index.indexdef for index in indexes]
+        + [f"ALTER TABLE {c.table_name} ADD CONSTRAINT {preparer.quote(c.conname)} {c.definition}" for c in foreign_keys]
+    )
+
+
+def restore(engine, directory: str, truncate: bool = False) -> Dict[str, int]:
+    """
+    Load a dump written by dump() with COPY ... FROM STDIN, in one transaction.
+
+    With truncate=True the tables are emptied first and loaded the way pg_restore does
+    it: keys, foreign keys and indexes are dropped, the data is copied with FREEZE, and
+    they are rebuilt afterwards. Building an index once is far cheaper than updating it
+    (and checking the foreign key) for every row. The foreign keys are dropped before the
+    TRUNCATE, including those of other tables that reference these ones, so a dump of only
+    some tables (dump --tables users) can be restored too. A violated key or foreign key
+    (e.g. calculations left pointing at users that are not in the dump) still fails the
+    restore when it is rebuilt. Without truncate, rows are added to the existing data with
+    every constraint checked as they arrive.
+
+    Raises:
+        RowCountMismatch: A table loaded a different number of rows than the manifest
+            records. Nothing is restored.
+        RestoreConstraintError: With truncate, the restored rows violate a rebuilt key or
+            foreign key. Nothing is restored.
+
+    Returns:
+        Rows loaded per table.
+    """
+    with open(os.path.join(directory, MANIFEST_FILE), encoding="utf-8") as f:
+        manifest = json.load(f)
+    fmt = manifest["format"]
+    tables = _tables(manifest["tables"])
+    counts = {}
+    with engine.begin() as conn:
+        recreate: List[str] = []
+        if truncate:
+            # Dropped first: TRUNCATE refuses a table that another table's foreign key references
+            recreate = _drop_constraints_and_indexes(conn, tables)
+            names = ", ".join(conn.dialect.identifier_preparer.format_table(table) for table in tables)
+            conn.execute(text(f"TRUNCATE {names}"))
+        cursor = conn.connection.dbapi_connection.cursor()
+        for table in tables:
+            entry = manifest["tables"][table.name]
+            with open(os.path.join(directory, f"{table.name}.{fmt}"), "rb") as f:
+                cursor.copy_expert(_copy_sql(conn, table, entry["columns"], "FROM STDIN", fmt, freeze=truncate), f)
+            if cursor.rowcount != entry["rows"]:
+                raise RowCountMismatch(
+                    f"{table.name}: loaded {cursor.rowcount} rows, manifest has {entry['rows']}"
+                )
+            counts[table.name] = cursor.rowcount
+        for statement in recreate:
+            try:
+                conn.execute(text(statement))
+            except IntegrityError as e:
+                raise RestoreConstraintError(f"Restored rows violate a constraint: {e.orig}".strip()) from e
+    return counts
+
+
+def _id_sql(timestamp: str) -> str:
+    """SQL for a new primary key: gen_random_uuid(), or a uuid7 built from timestamp if configured."""
+    if settings.UUID_VERSION != 7:
+        return "gen_random_uuid()"
+    # Overwrite the first 48 bits of a random UUID with the Unix time in milliseconds and
+    # flip the version nibble from 4 (0100) to 7 (0111)
+    return (
+        "encode(set_bit(set_bit(overlay(uuid_send(gen_random_uuid()) placing "
+        f"substring(int8send((extract(epoch from {timestamp}) * 1000)::bigint) from 3) "
+        "from 1 for 6), 52, 1), 53, 1), 'hex')::uuid"
+    )
+
+
+def _result_sql(conn) -> str:
+    """SQL computing each seeded row's result from v.type, v.a and v.b, one WHEN per registered operation."""
+    a, b = literal_column("v.a", Float), literal_column("v.b", Float)
+    result = case(*(
+        (literal_column("v.type") == literal_column(f"'{operation.type.name}'"), operation.sql(a, b))
+        for operation in OPERATIONS.values()
+    ))
+    return str(result.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+
+
+def seed(engine, users: int, calculations: int) -> Dict[str, int]:
+    """
+    Generate synthetic users and calculations inside the database.
+
+    Rows are produced by INSERT ... SELECT over generate_series, so nothing crosses
+    the network per row. Calculations are spread over the new users, cycle through
+    the four types and are backdated one second apart. Ids follow settings.UUID_VERSION;
+    uuid7 ids carry each row's created_at. The seeded users get password hashes that
+    no password matches, so they can't log in. Dump the result once and restore it to
+    bring the same fixture up again.
+
+    Returns:
+        Rows inserted per table.
+    """
+    if users < 1 and calculations > 0:
+        raise ValueError("Seeding calculations needs at least one user")
+    tag = uuid.uuid4().hex[:8]  # keeps emails/usernames unique across seed runs
+    enum_type = Calculation.__table__.c.type.type.name
+    type_names = ", ".join(f"'{member.name}'" for member in CalculationType)  # stored by member name
+    with engine.begin() as conn:
+        user_ids = conn.execute(text(f"""
+            INSERT INTO users (id, first_name, last_name, email, username, password_hash,
+                               is_active, is_verified, created_at, updated_at)
+            SELECT {_id_sql("now()")}, 'Seed', 'User' || n, 'seed' || n || '-' || :tag || '@example.com',
+                   'seed' || n || '-' || :tag,
+                   -- a well-formed bcrypt string (cost 4, unique per user) that no password matches
+                   '$2b$04$' || left(md5(n || :tag), 21) || '.' || left(md5(:tag || n) || md5(n || :tag), 30) || '.',
+                   true, false, now(), now()
+            FROM generate_series(1, :users) AS n
+            RETURNING id
+        """), {"users": users, "tag": tag}).scalars().all()
+        if calculations > 0:
+            conn.execute(text(f"""
+                INSERT INTO calculations (id, user_id, type, a, b, result, created_at, updated_at)
+                SELECT {_id_sql("now() - n * interval '1 second'")}, (:user_ids)[1 + n % :user_count], v.type, v.a, v.b,
+                       {_result_sql(conn)},
+                       now() - n * interval '1 second', now() - n * interval '1 second'
+                FROM generate_series(1, :calculations) AS n,
+                     LATERAL (SELECT (ARRAY[{type_names}])[1 + n % {len(CalculationType)}]::{enum_type} AS type,
+                                     (n % 1000)::float8 + 1 AS a,
+                                     (n % 7)::float8 + 1 AS b) AS v
+            """), {"user_ids": user_ids, "user_count": len(user_ids), "calculations": calculations})
+    return {"users": len(user_ids), "calculations": calculations}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Dump, restore and seed tables with PostgreSQL COPY.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    dump_parser = commands.add_parser("dump", help="write tables to a dump directory")
+    dump_parser.add_argument("directory")
+    dump_parser.add_argument("--format", choices=COPY_FORMATS, default="binary")
+    dump_parser.add_argument("--tables", nargs="+", choices=COPY_TABLES, default=list(COPY_TABLES))
+
+    restore_parser = commands.add_parser("restore", help="load a dump directory")
+    restore_parser.add_argument("directory")
+    restore_parser.add_argument("--truncate", action="store_true", help="empty the tables first")
+
+    seed_parser = commands.add_parser("seed", help="generate synthetic rows")
+    seed_parser.add_argument("--users", type=int, default=1000)
+    seed_parser.add_argument("--calculations", type=int, default=100_000)
+
+    args = parser.parse_args(argv)
+
+    from app.database import engine
+
+    try:
+        if args.command == "dump":
+            counts = dump(engine, args.directory, args.format, args.tables)
+        elif args.command == "restore":
+            counts = restore(engine, args.directory, args.truncate)
+        else:
+            counts = seed(engine, args.users, args.calculations)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    for name, rows in counts.items():
+        print(f"{name}: {rows} rows")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())  # pragma: no cover
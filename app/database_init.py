@@ -13,6 +13,30 @@ def init_db():
     # This scans all the models that inherit from Base and issues the SQL CREATE TABLE statements to the database.
     # It’s the equivalent of "Apply your models to the database."
     Base.metadata.create_all(bind=engine)
+    sync_schema(engine)
+
+def sync_schema(bind):
+    """
+    Bring tables that already existed up to date with the models.
+
+    create_all skips existing tables, so on a deployed database it adds neither the
+    server defaults (created_at/updated_at are now set by the database, and inserts no
+    longer send them) nor indexes added to a model later. This sets every column's server
+    default and creates any missing index. Each step is idempotent, so it is safe to run
+    on every deploy: python -m app.database_init
+    """
+    with bind.begin() as conn:
+        preparer = conn.dialect.identifier_preparer
+        for table in Base.metadata.sorted_tables:
+            for column in table.columns:
+                if column.server_default is not None:
+                    default = column.server_default.arg.compile(dialect=conn.dialect)
+                    conn.exec_driver_sql(
+                        f"ALTER TABLE {preparer.format_table(table)} "
+                        f"ALTER COLUMN {preparer.quote(column.name)} SET DEFAULT {default}"
+                    )
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
 
 def drop_db():
     Base.metadata.drop_all(bind=engine)
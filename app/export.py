@@ -0,0 +1,110 @@
+# app/export.py
+# streaming export of a user's calculation history as CSV or NDJSON (or Arrow/Parquet,
+# see app.columnar_export)
+
+import csv
+import io
+import json
+import math
+import uuid
+from contextlib import aclosing
+from typing import AsyncIterator, Dict, List, Sequence
+
+from sqlalchemy import func, select
+
+from app.columnar_export import COLUMNAR_MEDIA_TYPES, export_columnar
+from app.models.calculation import Calculation
+
+# Columns written by every export format, in order
+EXPORT_COLUMNS = ("id", "type", "a", "b", "result", "created_at", "updated_at")
+
+# Rows fetched from the server-side cursor at a time; each batch is serialized and sent as
+# one chunk, so memory holds one batch no matter how many rows the user has
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_MEDIA_TYPES: Dict[str, str] = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    **COLUMNAR_MEDIA_TYPES,
+}
+
+
+def export_statement(user_id: uuid.UUID):
+    """
+    Select a user's calculations as plain rows (no ORM instances), oldest first.
+
+    A result that was never stored is computed by the computed_result CASE, like the
+    history API does; it is NULL for a division by zero.
+    """
+    table = Calculation.__table__
+    columns = [
+        func.coalesce(table.c.result, Calculation.computed_result).label("result") if name == "result" else table.c[name]
+        for name in EXPORT_COLUMNS
+    ]
+    return (
+        select(*columns)
+        .where(table.c.user_id == user_id)
+        .order_by(table.c.created_at, table.c.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)  # server-side cursor, fetched in batches
+    )
+
+
+def _record(row) -> Dict:
+    record = dict(row._mapping)
+    for name in ("a", "b", "result"):
+        if record[name] is not None and not math.isfinite(record[name]):
+            record[name] = None  # e.g. a result that overflowed to inf; NaN/Infinity aren't valid JSON
+    record["id"] = str(record["id"])
+    record["type"] = record["type"].value
+    record["created_at"] = record["created_at"].isoformat()
+    record["updated_at"] = record["updated_at"].isoformat()
+    return record
+
+
+def serialize_csv(rows: Sequence, header: bool = False) -> bytes:
+    """Serialize a batch of export rows as CSV lines, optionally preceded by the header."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        record = _record(row)
+        writer.writerow([record[name] for name in EXPORT_COLUMNS])
+    return buffer.getvalue().encode()
+
+
+def serialize_ndjson(rows: Sequence) -> bytes:
+    """Serialize a batch of export rows as NDJSON, one object per row."""
+    return "".join(json.dumps(_record(row), allow_nan=False) + "\n" for row in rows).encode()
+
+
+async def export_calculations(db, user_id: uuid.UUID, fmt: str) -> AsyncIterator[bytes]:
+    """
+    Stream a user's calculations as CSV, NDJSON, Arrow IPC or Parquet chunks.
+
+    Rows come from AsyncSession.stream with yield_per, so they are read from a
+    server-side cursor EXPORT_BATCH_SIZE at a time and never loaded all at once. A CSV
+    export always starts with the header line, even when the user has no calculations.
+    The cursor is closed when the iterator finishes or is closed early (e.g. when the
+    client disconnects).
+
+    Parameters:
+        db: An AsyncSession; it must stay open while the iterator is consumed.
+        user_id: Whose calculations to export.
+        fmt: "csv", "ndjson", "arrow" or "parquet".
+    """
+    if fmt not in EXPORT_MEDIA_TYPES:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if fmt in COLUMNAR_MEDIA_TYPES:
+        async with aclosing(export_columnar(db, fmt, user_id)) as chunks:
+            async for chunk in chunks:
+                yield chunk
+        return
+    result = await db.stream(export_statement(user_id))
+    try:
+        if fmt == "csv":
+            yield serialize_csv([], header=True)
+        async for partition in result.partitions():
+            yield serialize_csv(partition) if fmt == "csv" else serialize_ndjson(partition)
+    finally:
+        await result.close()
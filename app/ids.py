@@ -0,0 +1,44 @@
+# app/ids.py
+# primary-key generation for the models: random uuid4 or time-ordered uuid7
+
+import os
+import threading
+import time
+import uuid
+
+from app.config import settings
+
+_lock = threading.Lock()
+_last_ms = 0
+_sequence = 0
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Generate a time-ordered UUID version 7 (RFC 9562).
+
+    The first 48 bits are the Unix time in milliseconds, so ids created later sort
+    later and new rows land at the right-hand edge of the primary-key B-tree instead of
+    on random pages. The 12 bits after the version are a counter: ids made in the same
+    millisecond by this process still increase. When the counter runs out the
+    timestamp is moved on by a millisecond. The last 62 bits are random.
+    """
+    global _last_ms, _sequence
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _last_ms:
+            _last_ms = ms
+            _sequence = int.from_bytes(os.urandom(2), "big") & 0x7FF  # random start, room to count up
+        else:
+            _sequence += 1
+            if _sequence > 0xFFF:
+                _last_ms += 1
+                _sequence = 0
+        ms, sequence = _last_ms, _sequence
+    random_bits = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    return uuid.UUID(int=(ms << 80) | (0x7 << 76) | (sequence << 64) | (0b10 << 62) | random_bits)
+
+
+def new_id() -> uuid.UUID:
+    """Default primary key for new rows: uuid4 or uuid7, per settings.UUID_VERSION."""
+    return uuid7() if settings.UUID_VERSION == 7 else uuid.uuid4()
@@ -3,6 +3,15 @@
 # shared Base for user.py and calculation.py
 # if User and Calculation are being defined on two different bases, 
     # then this breaks SQLAlchemy relationships.
+from sqlalchemy import text
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
+
+# Current time in UTC as a naive timestamp (the columns are TIMESTAMP WITHOUT TIME ZONE and
+# hold UTC, like datetime.utcnow). Used as a server default so the database sets the time.
+# now() is the start time of the transaction, not of the statement: every row written in one
+# transaction (e.g. a whole Calculation.bulk_create) gets the same created_at. History is
+# ordered by (created_at, id), so such rows are ordered by id. Existing tables get this
+# default from app.database_init.sync_schema.
+UTC_NOW = text("timezone('utc', now())")
@@ -1,26 +1,44 @@
-from datetime import datetime, timezone
+from datetime import datetime
 import enum
+import io
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple, Type
 import uuid
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 
-from sqlalchemy import UUID, Column, DateTime, Enum, Float, ForeignKey
+from sqlalchemy import UUID, Column, DateTime, Enum, Float, ForeignKey, Index, Row, case, event, func, inspect, insert, select, tuple_
+
+from app.ids import new_id
+from app.models.base import Base, UTC_NOW
+from app.operations.registry import OPERATIONS, OPERATIONS_BY_TYPE
+from app.schemas.calculation import CalculationCreate, CalculationType
+
+# Items computed and written together by Calculation.bulk_create (one COPY or executemany);
+# bounds memory for very large inputs, since only a chunk of rows is built at a time
+BULK_CREATE_CHUNK_SIZE = 10_000
+BULK_CREATE_COLUMNS = ("id", "user_id", "type", "a", "b", "result")  # timestamps come from the server default
+# Columns of the rows returned by Calculation.history_rows: the fields of CalculationRead, in order
+HISTORY_ROW_COLUMNS = ("type", "a", "b", "id", "user_id", "result", "created_at", "updated_at")
+# Calculation subclasses by their CalculationType; each subclass adds itself when it is defined
+MODELS_BY_TYPE: Dict[CalculationType, Type["Calculation"]] = {}
 
-from app.models.base import Base
-from app.schemas.calculation import CalculationType
 # SQLAlchemy ORM model that defines how a "calculation" is stored in the database 
 class Calculation(Base):
     """Base calculation model"""
 
     __tablename__ = "calculations"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=new_id)
     a = Column(Float, nullable=False)
     b = Column(Float, nullable=False)
     type = Column(Enum(CalculationType), nullable=False)
     result = Column(Float, nullable=True)
 
-    created_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    # Set by the database (UTC, like datetime.utcnow) and read back through RETURNING in the
+    # INSERT/UPDATE itself (eager_defaults), so no extra SELECT is needed to see them
+    created_at = Column(DateTime, server_default=UTC_NOW, nullable=False)
+    updated_at = Column(DateTime, server_default=UTC_NOW, onupdate=UTC_NOW, nullable=False)
 
     # Foreign key to User
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
@@ -31,18 +49,191 @@ class Calculation(Base):
     __mapper_args__ = {
         "polymorphic_on": "type",
         "polymorphic_identity": "calculation",
+        "eager_defaults": True,
     }
 
+    __table_args__ = (
+        # Serves a user's history newest-first: Calculation.history seeks straight to the
+        # cursor position in this index instead of skipping rows like OFFSET would
+        Index("ix_calculations_user_id_created_at_id", "user_id", "created_at", "id"),
+        # Range filters and ordering on the stored result (e.g. result > 1000); the ORM always
+        # fills result in, see store_result below
+        Index("ix_calculations_result", "result"),
+    )
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)  # maps the subclass
+        MODELS_BY_TYPE[cls.__mapper_args__["polymorphic_identity"]] = cls
+
+    @classmethod
+    def model_for(cls, calc_type: CalculationType) -> Type["Calculation"]:
+        """Return the subclass that stores calc_type. Raises ValueError for an unknown type."""
+        model = MODELS_BY_TYPE.get(calc_type)
+        if model is None:
+            raise ValueError(f"Unknown calculation type: {calc_type}")
+        return model
+
     def get_result(self) -> float:
         """Method to compute calculation result"""
         raise NotImplementedError
 
+    @hybrid_property
+    def computed_result(self) -> float:
+        """
+        The calculation's result, computed from type, a and b.
+
+        On an instance this is get_result(). In a query it compiles to a SQL CASE over
+        type, so rows can be filtered or aggregated by result inside PostgreSQL, including
+        rows whose result column was never filled in (e.g. written with plain SQL).
+        Division by zero gives NULL in SQL, where get_result raises ValueError.
+        """
+        return self.get_result()
+
+    @computed_result.inplace.expression
+    @classmethod
+    def _computed_result_expression(cls):
+        # One WHEN per registered operation, each using that operation's SQL expression
+        return case(*((cls.type == operation.type, operation.sql(cls.a, cls.b)) for operation in OPERATIONS.values()))
+
+    @classmethod
+    def create(cls, db, user_id: uuid.UUID, calc_type: CalculationType, a: float, b: float) -> "Calculation":
+        """Build the calculation for calc_type, store its result and add it to the session."""
+        calculation = cls._build(user_id, calc_type, a, b)
+        db.add(calculation)
+        db.flush()  # pending until the caller commits
+        return calculation
+
+    @classmethod
+    async def create_async(cls, db, user_id: uuid.UUID, calc_type: CalculationType, a: float, b: float) -> "Calculation":
+        """Async counterpart of create, for use with an AsyncSession."""
+        calculation = cls._build(user_id, calc_type, a, b)
+        db.add(calculation)
+        await db.flush()
+        return calculation
+
+    @classmethod
+    def history(
+        cls,
+        db,
+        user_id: uuid.UUID,
+        limit: int,
+        after: Optional[Tuple[datetime, uuid.UUID]] = None,
+    ) -> List["Calculation"]:
+        """
+        Return one page of a user's calculations, newest first.
+
+        Pages are keyed on (created_at, id) rather than an offset: `after` is the
+        (created_at, id) of the last row of the previous page, and the query seeks to it
+        through ix_calculations_user_id_created_at_id. Every page costs the same no matter how
+        deep it is. id breaks ties between rows created in the same instant.
+        """
+        return list(db.scalars(cls._history_page(select(cls), user_id, limit, after)))
+
+    @classmethod
+    def history_rows(
+        cls,
+        db,
+        user_id: uuid.UUID,
+        limit: int,
+        after: Optional[Tuple[datetime, uuid.UUID]] = None,
+    ) -> List[Row]:
+        """
+        Return the same page as history(), as plain rows instead of ORM instances.
+
+        The rows are selected with Core, so nothing is added to the identity map and no
+        polymorphic subclass is built per row; list endpoints only need the column values.
+        Each row has the HISTORY_ROW_COLUMNS, named and ordered like CalculationRead's fields,
+        so it can be passed as is to CalculationRecord(*row). A result that was never stored
+        is computed by the computed_result CASE in the same query (NULL for a division by zero).
+        """
+        table = cls.__table__
+        columns = [
+            func.coalesce(table.c.result, cls.computed_result).label("result") if name == "result" else table.c[name]
+            for name in HISTORY_ROW_COLUMNS
+        ]
+        return list(db.execute(cls._history_page(select(*columns), user_id, limit, after)))
+
+    @classmethod
+    def _history_page(cls, stmt, user_id: uuid.UUID, limit: int, after: Optional[Tuple[datetime, uuid.UUID]]):
+        table = cls.__table__
+        stmt = stmt.where(table.c.user_id == user_id)
+        if after is not None:
+            stmt = stmt.where(tuple_(table.c.created_at, table.c.id) < tuple_(*after))
+        return stmt.order_by(table.c.created_at.desc(), table.c.id.desc()).limit(limit)
+
+    @classmethod
+    def bulk_create(cls, db, user_id: uuid.UUID, items: Iterable[CalculationCreate]) -> List[uuid.UUID]:
+        """
+        Save many calculations for a user and return their ids, in input order.
+
+        create() builds an ORM object per row and the unit of work flushes them one by one.
+        Here each result comes from the operation's scalar function in the registry, so
+        the logic stays in one place. Items are read, computed and written in chunks of
+        BULK_CREATE_CHUNK_SIZE: with psycopg2 as a COPY ... FROM STDIN, otherwise as a Core
+        INSERT executemany. Only one chunk of rows is held at a time, however many items
+        there are. Ids are generated up front, so nothing is read back and no ORM instances
+        are loaded.
+
+        The chunks are written inside a savepoint: a division by zero raises ValueError
+        (naming the item's index) and none of this call's rows are inserted, while the
+        rest of the caller's transaction is kept. Like create(), the rows stay uncommitted
+        until the caller commits.
+        """
+        write = cls._copy_rows if cls._supports_copy(db) else cls._insert_rows
+        numbered = enumerate(items)
+        ids = []
+        with db.begin_nested():
+            while chunk := list(islice(numbered, BULK_CREATE_CHUNK_SIZE)):
+                rows = []
+                for index, item in chunk:
+                    try:
+                        result = OPERATIONS_BY_TYPE[item.type].scalar(item.a, item.b)
+                    except ValueError as e:
+                        raise ValueError(f"Item {index}: {e}")
+                    rows.append((new_id(), user_id, item.type, item.a, item.b, result))
+                write(db, rows)
+                ids.extend(row[0] for row in rows)
+        return ids
+
+    @staticmethod
+    def _supports_copy(db) -> bool:
+        return db.get_bind().dialect.driver == "psycopg2"
+
+    @classmethod
+    def _copy_rows(cls, db, rows) -> None:
+        # The raw connection is the one under the session's transaction, so the COPY
+        # commits or rolls back with everything else in the session
+        buffer = io.StringIO()
+        for id_, user_id, calc_type, a, b, result in rows:
+            # the Enum column stores member names; repr() keeps full float precision
+            buffer.write(f"{id_}\t{user_id}\t{calc_type.name}\t{a!r}\t{b!r}\t{result!r}\n")
+        buffer.seek(0)
+        cursor = db.connection().connection.dbapi_connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {cls.__tablename__} ({', '.join(BULK_CREATE_COLUMNS)}) FROM STDIN", buffer
+            )
+        finally:
+            cursor.close()
+
+    @classmethod
+    def _insert_rows(cls, db, rows) -> None:
+        db.execute(insert(cls.__table__), [dict(zip(BULK_CREATE_COLUMNS, row)) for row in rows])
+
+    @staticmethod
+    def _build(user_id: uuid.UUID, calc_type: CalculationType, a: float, b: float) -> "Calculation":
+        calculation = Calculation.model_for(calc_type)(a=a, b=b)
+        calculation.user_id = user_id
+        calculation.result = calculation.get_result()  # raises ValueError for division by zero
+        return calculation
+
     def __repr__(self):
         return f"<Calculation(type={self.type}, a={self.a}, b={self.b})>"
     
 class Addition(Calculation):
     __mapper_args__ = {
         "polymorphic_identity": CalculationType.ADDITION,
+        "eager_defaults": True,  # not inherited from Calculation's mapper
     }
 
     def get_result(self) -> float:
@@ -51,6 +242,7 @@ class Addition(Calculation):
 class Subtraction(Calculation):
     __mapper_args__ = {
         "polymorphic_identity": CalculationType.SUBTRACTION,
+        "eager_defaults": True,  # not inherited from Calculation's mapper
     }
 
     def get_result(self) -> float:
@@ -59,6 +251,7 @@ class Subtraction(Calculation):
 class Multiplication(Calculation):
     __mapper_args__ = {
         "polymorphic_identity": CalculationType.MULTIPLICATION,
+        "eager_defaults": True,  # not inherited from Calculation's mapper
     }
 
     def get_result(self) -> float:
@@ -67,9 +260,20 @@ class Multiplication(Calculation):
 class Division(Calculation):
     __mapper_args__ = {
         "polymorphic_identity": CalculationType.DIVISION,
+        "eager_defaults": True,  # not inherited from Calculation's mapper
     }
 
     def get_result(self) -> float:
         if self.b == 0 :
             raise ValueError("The divisor 'b' cannot be zero")
-        return self.a / self.b
\ No newline at end of file
+        return self.a / self.b
+
+
+# Persist result for every calculation the ORM writes, not just those made through create(),
+# so the result column (and its index) can be trusted by SQL filters and aggregates
+@event.listens_for(Calculation, "before_insert", propagate=True)
+@event.listens_for(Calculation, "before_update", propagate=True)
+def store_result(mapper, connection, target):
+    state = inspect(target)
+    if target.result is None or any(state.attrs[name].history.has_changes() for name in ("a", "b")):
+        target.result = target.get_result()  # raises ValueError for division by zero
@@ -1,19 +1,24 @@
-from app.models.calculation import Addition, Subtraction, Multiplication, Division, Calculation
-from app.schemas.calculation import CalculationType
+from typing import Iterable, List
 
-# The factory replaces manual if/else logic where you choose 
+from app.models.calculation import MODELS_BY_TYPE, Calculation
+from app.schemas.calculation import CalculationCreate, CalculationType
+
+# The factory replaces manual if/else logic where you choose
     # and instantiate calculation subclasses (Addition, Subtraction, etc.) based on the type.
 class CalculationFactory:
 
     @staticmethod
     def create_calculation(calc_type: CalculationType, a: float, b: float) -> Calculation:
-        if calc_type == CalculationType.ADDITION:
-            return Addition(a=a, b=b)
-        elif calc_type == CalculationType.SUBTRACTION:
-            return Subtraction(a=a, b=b)
-        elif calc_type == CalculationType.MULTIPLICATION:
-            return Multiplication(a=a, b=b)
-        elif calc_type == CalculationType.DIVISION:
-            return Division(a=a, b=b)
-        else:
-            raise ValueError(f"Unknown calculation type: {calc_type}")
\ No newline at end of file
+        # One dict lookup in the registered subclasses, however many operations there are
+        return Calculation.model_for(calc_type)(a=a, b=b)
+
+    @staticmethod
+    def create_many(items: Iterable[CalculationCreate]) -> List[Calculation]:
+        """Build a calculation for every item (anything with type, a and b), in order."""
+        calculations = []
+        for item in items:
+            model = MODELS_BY_TYPE.get(item.type)
+            if model is None:
+                raise ValueError(f"Unknown calculation type: {item.type}")
+            calculations.append(model(a=item.a, b=item.b))
+        return calculations
@@ -1,10 +1,12 @@
 # app/models/user.py
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timedelta
+import hashlib
+import time
 import uuid
 from typing import Optional, Dict, Any
 
-from sqlalchemy import Column, String, DateTime, Boolean
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, DateTime, Boolean, event, exists, insert, select
+from sqlalchemy.dialects.postgresql import UUID, insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 from passlib.context import CryptContext
 from jose import JWTError, jwt
@@ -15,7 +17,11 @@ from sqlalchemy.orm import relationship
 from app.schemas.base import UserCreate
 from app.schemas.user import UserResponse, Token
 
-from app.models.base import Base
+from app.models.base import Base, UTC_NOW
+from app.auth.cache import invalidate_user, token_cache
+from app.auth.hashing import password_hash_pool
+from app.config import settings
+from app.ids import new_id
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -28,7 +34,7 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 class User(Base):
     __tablename__ = 'users'
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=new_id)
     first_name = Column(String(50), nullable=False)
     last_name = Column(String(50), nullable=False)
     email = Column(String(120), unique=True, nullable=False)
@@ -37,11 +43,14 @@ class User(Base):
     is_active = Column(Boolean, default=True, nullable=False)
     is_verified = Column(Boolean, default=False, nullable=False)
     last_login = Column(DateTime, nullable=True)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    # Set by the database and read back through RETURNING (see Calculation)
+    created_at = Column(DateTime, server_default=UTC_NOW, nullable=False)
+    updated_at = Column(DateTime, server_default=UTC_NOW, onupdate=UTC_NOW, nullable=False)
 
     # calculations associated with a user (1 to many relationship)
     calculations = relationship("Calculation", back_populates="user", cascade="all, delete-orphan")
+
+    __mapper_args__ = {"eager_defaults": True}
     
     def __repr__(self):
         return f"<User(name={self.first_name} {self.last_name}, email={self.email})>"
@@ -55,6 +64,15 @@ class User(Base):
         """Verify a plain password against the hashed password."""
         return pwd_context.verify(plain_password, self.password_hash)
 
+    @staticmethod
+    async def hash_password_async(password: str) -> str:
+        """Hash a password using bcrypt on the password hash pool, off the event loop."""
+        return await password_hash_pool.run(pwd_context.hash, password)
+
+    async def verify_password_async(self, plain_password: str) -> bool:
+        """Verify a plain password on the password hash pool, off the event loop."""
+        return await password_hash_pool.run(pwd_context.verify, plain_password, self.password_hash)
+
     @staticmethod
     def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
         """Create a JWT access token."""
@@ -65,12 +83,47 @@ class User(Base):
 
     @staticmethod
     def verify_token(token: str) -> Optional[UUID]:
-        """Verify and decode a JWT token."""
+        """
+        Verify and decode a JWT token, reusing the result for tokens seen before.
+
+        Verified tokens are cached by the SHA-256 digest of the token, until the token's
+        exp or TOKEN_CACHE_TTL_SECONDS, whichever comes first. Invalid tokens are not cached.
+        """
+        key = hashlib.sha256(token.encode()).digest()
+        user_id = token_cache.get(key)
+        if user_id is not None:
+            return user_id
+
+        payload = User.decode_token(token)
+        user_id = User._user_id_from_payload(payload)
+        if user_id is not None:
+            expires_at = time.time() + settings.TOKEN_CACHE_TTL_SECONDS
+            if payload.get("exp") is not None:
+                expires_at = min(expires_at, float(payload["exp"]))
+            token_cache.set(key, user_id, expires_at)
+        return user_id
+
+    @staticmethod
+    def verify_token_uncached(token: str) -> Optional[UUID]:
+        """Verify and decode a JWT token without the token cache."""
+        return User._user_id_from_payload(User.decode_token(token))
+
+    @staticmethod
+    def decode_token(token: str) -> Optional[Dict[str, Any]]:
+        """Check the token's signature and expiry and return its payload, or None if invalid."""
+        try:
+            return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            return None
+
+    @staticmethod
+    def _user_id_from_payload(payload: Optional[Dict[str, Any]]) -> Optional[UUID]:
+        if not payload:
+            return None
         try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
             user_id = payload.get("sub")
             return uuid.UUID(user_id) if user_id else None
-        except (JWTError, ValueError):
+        except (ValueError, TypeError, AttributeError):
             return None
 
     @classmethod
@@ -121,6 +174,103 @@ class User(Base):
         except ValueError as e:
             raise e
 
+    @classmethod
+    def register_atomic(cls, db, user_data: Dict[str, Any]) -> "User":
+        """
+        Register a new user with a single INSERT, without checking for duplicates first.
+
+        register() runs a SELECT for the email/username and then an INSERT: two round trips,
+        and two concurrent signups can both pass the SELECT. Here the unique constraints on
+        email and username decide instead. On PostgreSQL the user is written with
+        INSERT ... ON CONFLICT DO NOTHING RETURNING. Other dialects use a plain INSERT in a
+        savepoint. Either way a taken email or username raises the same ValueError as
+        register().
+
+        PostgreSQL accepts a single conflict target, and there are two unique columns to
+        catch, so DO NOTHING can't say which constraint it hit. When no row comes back, a
+        SELECT checks that the email or username really is taken; any other conflict (e.g.
+        on id) is retried as a plain INSERT so its IntegrityError is raised. The extra work
+        happens only on that rare path.
+        """
+        try:
+            password = user_data.get('password', '')
+            if len(password) < 6:
+                raise ValueError("Password must be at least 6 characters long")
+            user_create = UserCreate.model_validate(user_data)
+        except ValidationError as e:
+            raise ValueError(str(e))
+
+        values = {
+            "first_name": user_create.first_name,
+            "last_name": user_create.last_name,
+            "email": user_create.email,
+            "username": user_create.username,
+            "password_hash": cls.hash_password(user_create.password),
+            "is_active": True,
+            "is_verified": False,
+        }
+
+        if cls._supports_on_conflict(db):
+            stmt = pg_insert(cls).values(**values).on_conflict_do_nothing().returning(cls)
+            new_user = db.scalars(stmt).first()
+            if new_user is not None:
+                return new_user
+            if cls._email_or_username_taken(db, values["email"], values["username"]):
+                raise ValueError("Username or email already exists")
+
+        try:
+            with db.begin_nested():  # savepoint, so a duplicate doesn't roll back the caller's transaction
+                return db.scalars(insert(cls).values(**values).returning(cls)).one()
+        except IntegrityError:
+            if cls._email_or_username_taken(db, values["email"], values["username"]):
+                raise ValueError("Username or email already exists")
+            raise
+
+    @staticmethod
+    def _supports_on_conflict(db) -> bool:
+        return db.get_bind().dialect.name == "postgresql"
+
+    @classmethod
+    def _email_or_username_taken(cls, db, email: str, username: str) -> bool:
+        return db.scalar(select(exists().where((cls.email == email) | (cls.username == username))))
+
+    @classmethod
+    async def register_async(cls, db, user_data: Dict[str, Any]) -> "User":
+        """Register a new user with validation, using an AsyncSession."""
+        try:
+            # Same checks, in the same order, as register()
+            password = user_data.get('password', '')
+            if len(password) < 6:
+                raise ValueError("Password must be at least 6 characters long")
+
+            result = await db.execute(
+                select(cls).where(
+                    (cls.email == user_data.get('email')) |
+                    (cls.username == user_data.get('username'))
+                )
+            )
+            if result.scalars().first():
+                raise ValueError("Username or email already exists")
+
+            user_create = UserCreate.model_validate(user_data)
+
+            new_user = cls(
+                first_name=user_create.first_name,
+                last_name=user_create.last_name,
+                email=user_create.email,
+                username=user_create.username,
+                password_hash=await cls.hash_password_async(user_create.password),
+                is_active=True,
+                is_verified=False
+            )
+
+            db.add(new_user)
+            await db.flush()  # pending until the caller commits, like register()
+            return new_user
+
+        except ValidationError as e:
+            raise ValueError(str(e)) # pragma: no cover
+
     # deealing with all the data 
     @classmethod
     def authenticate(cls, db, username: str, password: str) -> Optional[Dict[str, Any]]:
@@ -144,5 +294,34 @@ class User(Base):
         )
 
         return token_response.model_dump()
+
+    @classmethod
+    async def authenticate_async(cls, db, username: str, password: str) -> Optional[Dict[str, Any]]:
+        """Authenticate user and return token with user data, using an AsyncSession."""
+        result = await db.execute(
+            select(cls).where((cls.username == username) | (cls.email == username))
+        )
+        user = result.scalars().first()
+
+        if not user or not await user.verify_password_async(password):
+            return None
+
+        user.last_login = datetime.utcnow()
+        await db.commit()
+
+        user_response = UserResponse.model_validate(user)
+        token_response = Token(
+            access_token=cls.create_access_token({"sub": str(user.id)}),
+            token_type="bearer",
+            user=user_response
+        )
+
+        return token_response.model_dump()
     
+# Keep get_current_user's cache in step with the users table
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def invalidate_cached_user(mapper, connection, target):
+    invalidate_user(target.id)
+
 from app.models.calculation import Calculation # avoid circular dependency error
\ No newline at end of file
@@ -0,0 +1,193 @@
+# app/operations/batch.py
+
+"""
+Module: batch.py
+
+This module contains array-aware versions of the arithmetic functions in
+app.operations. Instead of taking two scalars, each function takes two sequences
+(or NumPy arrays) of operands and computes every result in a single vectorized pass,
+which avoids paying Python function-call overhead once per pair of numbers.
+
+Functions:
+- batch_add(a: ArrayLike, b: ArrayLike) -> np.ndarray: Returns the element-wise sums.
+- batch_subtract(a: ArrayLike, b: ArrayLike) -> np.ndarray: Returns the element-wise differences.
+- batch_multiply(a: ArrayLike, b: ArrayLike) -> np.ndarray: Returns the element-wise products.
+- batch_divide(a: ArrayLike, b: ArrayLike) -> Tuple[np.ndarray, np.ndarray]: Returns the
+  element-wise quotients together with a mask of the elements whose divisor is zero.
+
+Usage:
+The scalar functions raise ValueError("Cannot divide by zero!") for a zero divisor. A batch
+must not fail because of one bad element, so batch_divide reports those elements through a
+boolean mask instead and leaves NaN in their slot of the result array.
+"""
+
+from typing import Sequence, Tuple, Union  # Import typing helpers for the operand types
+
+import numpy as np
+
+# Operands can be any sequence of numbers or an existing NumPy array
+ArrayLike = Union[Sequence[float], np.ndarray]
+
+# Same message the scalar divide() raises, so callers can report it per element
+DIVIDE_BY_ZERO_ERROR = "Cannot divide by zero!"
+
+# Reported instead of a result that overflowed to infinity (e.g. 1e308 * 10), which JSON can't hold
+NON_FINITE_ERROR = "Result is not a finite number"
+
+
+def _as_operands(a: ArrayLike, b: ArrayLike) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert both operands to float64 arrays of the same shape.
+
+    Raises:
+    - ValueError: If the two operands do not have the same number of elements.
+    """
+    a_arr = np.asarray(a, dtype=np.float64)
+    b_arr = np.asarray(b, dtype=np.float64)
+    if a_arr.shape != b_arr.shape:
+        raise ValueError(
+            f"Operands must have the same shape, got {a_arr.shape} and {b_arr.shape}"
+        )
+    return a_arr, b_arr
+
+
+def batch_add(a: ArrayLike, b: ArrayLike) -> np.ndarray:
+    """
+    Add two sequences of numbers element by element.
+
+    Parameters:
+    - a (sequence or np.ndarray): The first numbers to add.
+    - b (sequence or np.ndarray): The second numbers to add.
+
+    Returns:
+    - np.ndarray: The element-wise sums of a and b.
+
+    Example:
+    >>> batch_add([2, 2.5], [3, 3]).tolist()
+    [5.0, 5.5]
+    """
+    a_arr, b_arr = _as_operands(a, b)
+    return np.add(a_arr, b_arr)
+
+
+def batch_subtract(a: ArrayLike, b: ArrayLike) -> np.ndarray:
+    """
+    Subtract the second sequence of numbers from the first element by element.
+
+    Parameters:
+    - a (sequence or np.ndarray): The numbers from which to subtract.
+    - b (sequence or np.ndarray): The numbers to subtract.
+
+    Returns:
+    - np.ndarray: The element-wise differences between a and b.
+
+    Example:
+    >>> batch_subtract([5, 5.5], [3, 2]).tolist()
+    [2.0, 3.5]
+    """
+    a_arr, b_arr = _as_operands(a, b)
+    return np.subtract(a_arr, b_arr)
+
+
+def batch_multiply(a: ArrayLike, b: ArrayLike) -> np.ndarray:
+    """
+    Multiply two sequences of numbers element by element.
+
+    Parameters:
+    - a (sequence or np.ndarray): The first numbers to multiply.
+    - b (sequence or np.ndarray): The second numbers to multiply.
+
+    Returns:
+    - np.ndarray: The element-wise products of a and b.
+
+    Example:
+    >>> batch_multiply([2, 2.5], [3, 4]).tolist()
+    [6.0, 10.0]
+    """
+    a_arr, b_arr = _as_operands(a, b)
+    return np.multiply(a_arr, b_arr)
+
+
+def batch_divide(a: ArrayLike, b: ArrayLike) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Divide the first sequence of numbers by the second element by element.
+
+    Parameters:
+    - a (sequence or np.ndarray): The dividends.
+    - b (sequence or np.ndarray): The divisors.
+
+    Returns:
+    - Tuple[np.ndarray, np.ndarray]: The element-wise quotients, and a boolean mask that is
+      True wherever the divisor is zero. Masked elements hold NaN and should be reported
+      with DIVIDE_BY_ZERO_ERROR, matching the ValueError raised by the scalar divide().
+
+    Example:
+    >>> quotients, zero_mask = batch_divide([6, 5], [3, 0])
+    >>> float(quotients[0]), bool(zero_mask[1])
+    (2.0, True)
+    """
+    a_arr, b_arr = _as_operands(a, b)
+
+    # Find every zero divisor up front instead of raising on the first one
+    zero_mask = b_arr == 0
+
+    # Only divide where the divisor is non-zero; masked slots stay NaN
+    quotients = np.full(a_arr.shape, np.nan, dtype=np.float64)
+    np.divide(a_arr, b_arr, out=quotients, where=~zero_mask)
+    return quotients, zero_mask
+
+
+def evaluate_batch(
+    ops: Sequence[str], a: ArrayLike, b: ArrayLike
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Evaluate a mixed list of operations, one vectorized pass per operation type.
+
+    Parameters:
+    - ops (sequence of str): The operation name for each element, as registered in
+      app.operations.registry ('add', 'subtract', 'multiply', 'divide').
+    - a (sequence or np.ndarray): The first operand for each element.
+    - b (sequence or np.ndarray): The second operand for each element.
+
+    Returns:
+    - Tuple[np.ndarray, np.ndarray]: The results in input order, and a boolean mask that
+      is True for elements that failed (their result is NaN); report them with their
+      operation's registered error, e.g. DIVIDE_BY_ZERO_ERROR.
+
+    Raises:
+    - ValueError: If an operation name is unknown or the inputs differ in length.
+
+    Example:
+    >>> results, errors = evaluate_batch(["add", "divide"], [2, 1], [3, 0])
+    >>> float(results[0]), bool(errors[1])
+    (5.0, True)
+    """
+    a_arr, b_arr = _as_operands(a, b)
+    ops_arr = np.asarray(ops, dtype=object)
+    if ops_arr.shape != a_arr.shape:
+        raise ValueError(
+            f"Expected one operation per operand pair, got {ops_arr.shape} and {a_arr.shape}"
+        )
+
+    from app.operations.registry import OPERATIONS  # avoid circular import
+
+    unknown = set(ops_arr.tolist()) - OPERATIONS.keys()
+    if unknown:
+        raise ValueError(f"Unknown operation(s): {', '.join(sorted(map(str, unknown)))}")
+
+    results = np.full(a_arr.shape, np.nan, dtype=np.float64)
+    errors = np.zeros(a_arr.shape, dtype=bool)
+
+    # Group the elements by operation so every kernel runs once over its slice
+    for name, operation in OPERATIONS.items():
+        selected = ops_arr == name
+        if not selected.any():
+            continue
+        with np.errstate(over="ignore"):  # overflow gives inf, which callers report as NON_FINITE_ERROR
+            output = operation.kernel(a_arr[selected], b_arr[selected])
+        if isinstance(output, tuple):  # kernels whose elements can fail also return an error mask
+            results[selected], errors[selected] = output
+        else:
+            results[selected] = output
+
+    return results, errors
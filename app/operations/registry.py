@@ -0,0 +1,64 @@
+# app/operations/registry.py
+
+"""
+Module: registry.py
+
+This module is the single list of the calculator's operations. Each entry ties together
+everything the app needs to know about one operation: its name (the /add, /subtract, ...
+route and the batch/WebSocket "op"), its CalculationType, the scalar function from
+app.operations, the vectorized kernel from app.operations.batch, the message reported for
+elements the kernel flags as failed, and the SQL expression used by
+Calculation.computed_result. The registry doesn't know about the ORM: each Calculation
+subclass registers itself in app.models.calculation.MODELS_BY_TYPE under its
+CalculationType, so the models depend on the operations and not the other way round.
+
+Constants:
+- OPERATIONS (Dict[str, Operation]): Operations by name, in route order.
+- OPERATIONS_BY_TYPE (Dict[CalculationType, Operation]): The same operations by CalculationType.
+- OPERATION_NAMES (Tuple[str, ...]): The valid operation names.
+
+Usage:
+The factory, the routes in main.py, the batch engine and the SQL CASE are all built from
+OPERATIONS with plain dict lookups, so none of them repeats the list of operations. To add
+an operation, write its scalar function, its kernel and its Calculation subclass (with the
+new CalculationType member as polymorphic_identity), and register it in OPERATIONS below.
+"""
+
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+from sqlalchemy import Float, func
+
+from app.operations import add, divide, multiply, subtract
+from app.operations.batch import DIVIDE_BY_ZERO_ERROR, batch_add, batch_divide, batch_multiply, batch_subtract
+from app.schemas.calculation import CalculationType
+
+
+class Operation(NamedTuple):
+    """One arithmetic operation and every implementation of it"""
+    name: str  # route path and batch/WebSocket op, e.g. "add"
+    label: str  # used in log messages, e.g. "Add"
+    description: str  # docstring of the generated route
+    type: CalculationType  # stored in calculations.type
+    scalar: Callable[[float, float], float]  # raises ValueError for invalid operands
+    kernel: Callable  # element-wise; returns the results, or (results, error mask) if elements can fail
+    sql: Callable  # SQL expression over two columns; NULL where scalar would raise
+    error: Optional[str] = None  # reported for elements in the kernel's error mask
+
+
+OPERATIONS: Dict[str, Operation] = {
+    operation.name: operation
+    for operation in (
+        Operation("add", "Add", "Add two numbers.", CalculationType.ADDITION,
+                  add, batch_add, lambda a, b: a + b),
+        Operation("subtract", "Subtract", "Subtract two numbers.", CalculationType.SUBTRACTION,
+                  subtract, batch_subtract, lambda a, b: a - b),
+        Operation("multiply", "Multiply", "Multiply two numbers.", CalculationType.MULTIPLICATION,
+                  multiply, batch_multiply, lambda a, b: a * b),
+        Operation("divide", "Divide", "Divide two numbers.", CalculationType.DIVISION,
+                  divide, batch_divide, lambda a, b: a / func.nullif(b, 0, type_=Float), DIVIDE_BY_ZERO_ERROR),
+    )
+}
+
+OPERATIONS_BY_TYPE: Dict[CalculationType, Operation] = {operation.type: operation for operation in OPERATIONS.values()}
+
+OPERATION_NAMES: Tuple[str, ...] = tuple(OPERATIONS)
@@ -0,0 +1,39 @@
+# app/pagination.py
+# opaque cursors for keyset pagination
+
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Tuple
+
+
+def encode_cursor(created_at: datetime, id_: uuid.UUID) -> str:
+    """
+    Encode the (created_at, id) of the last row on a page as an opaque cursor.
+
+    The next page starts right after this row. Clients pass the string back unchanged
+    and shouldn't rely on what's inside it.
+    """
+    raw = json.dumps([created_at.isoformat(), str(id_)], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """
+    Decode a cursor made by encode_cursor. Raises ValueError if it is malformed.
+
+    created_at columns hold naive UTC, so a timestamp with a UTC offset is rejected rather
+    than compared against them.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value = json.loads(raw)
+        if not (isinstance(value, list) and len(value) == 2 and all(isinstance(part, str) for part in value)):
+            raise ValueError("not a [created_at, id] pair of strings")
+        created_at, id_ = datetime.fromisoformat(value[0]), uuid.UUID(value[1])
+    except ValueError:  # bad base64/JSON/shape/timestamp/uuid; binascii.Error is a ValueError
+        raise ValueError("Invalid cursor")
+    if created_at.tzinfo is not None:
+        raise ValueError("Invalid cursor")
+    return created_at, id_
@@ -0,0 +1,238 @@
+# app/recompute.py
+# recompute the stored result of every calculation, in parallel chunks, resumably
+#
+# Usage: python -m app.recompute [--chunk-size 10000] [--workers 4] [--checkpoint recompute.json] [--strategy sql|python]
+#
+# Run it after calculation semantics change, or to backfill rows whose nullable result column
+# was never filled in. The calculations table is split into primary-key ranges of about
+# chunk-size rows. Worker threads recompute one range at a time with a single set-based
+# UPDATE, and each range commits on its own. Finished ranges are recorded in a checkpoint
+# file, so a crashed or interrupted run picks up where it stopped when started again with
+# the same checkpoint. Rows whose stored result is already right are not rewritten, so
+# running a range twice is harmless.
+
+import argparse
+import json
+import os
+import sys
+import threading
+import uuid
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from typing import Callable, List, Optional, Set, Tuple
+
+from sqlalchemy import bindparam, select, text, update
+from sqlalchemy.exc import DataError
+from sqlalchemy.dialects.postgresql import ARRAY, DOUBLE_PRECISION, UUID
+
+from app.models.calculation import Calculation
+
+# A primary-key range (lower, upper]: None means unbounded on that side
+KeyRange = Tuple[Optional[str], Optional[str]]
+
+DEFAULT_CHUNK_SIZE = 10_000
+DEFAULT_WORKERS = 4
+
+# "sql": the result is computed in the UPDATE itself from Calculation.computed_result's CASE.
+# A range holding a row whose result overflows float8 falls back to "python" (see
+# recompute_range_sql).
+# "python": rows are loaded and computed with each subclass's get_result, then written back
+# in one UPDATE per range. Use it when the Python semantics are the reference.
+STRATEGIES = ("sql", "python")
+
+
+def plan_ranges(db, chunk_size: int) -> List[KeyRange]:
+    """
+    Split the calculations table into primary-key ranges of about chunk_size rows.
+
+    Boundaries come from one pass over the primary-key index. The first range has no
+    lower bound and the last no upper bound, so rows inserted while the job runs
+    still fall into some range.
+    """
+    boundaries = db.execute(text("""
+        SELECT id FROM (
+            SELECT id, row_number() OVER (ORDER BY id) AS position FROM calculations
+        ) AS numbered
+        WHERE position % :chunk_size = 0
+        ORDER BY id
+    """), {"chunk_size": chunk_size}).scalars().all()
+    edges = [None] + [str(boundary) for boundary in boundaries] + [None]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def _in_range(column, key_range: KeyRange):
+    lower, upper = key_range
+    conditions = []
+    if lower is not None:
+        conditions.append(column > uuid.UUID(lower))
+    if upper is not None:
+        conditions.append(column <= uuid.UUID(upper))
+    return conditions
+
+
+def recompute_range_sql(db, key_range: KeyRange) -> int:
+    """
+    Recompute one range in a single UPDATE ... SET result = <CASE over type>.
+
+    Python stores inf when a result overflows (e.g. 1e308 * 10), but PostgreSQL raises
+    "value out of range" for the same float8 arithmetic, failing the whole statement. The
+    UPDATE runs in a savepoint, and a range that overflows is recomputed with
+    recompute_range_python instead, which gives those rows the ORM's inf.
+    """
+    computed = Calculation.computed_result
+    stmt = (
+        update(Calculation)
+        .where(*_in_range(Calculation.id, key_range), Calculation.result.is_distinct_from(computed))
+        .values(result=computed)
+        .execution_options(synchronize_session=False)
+    )
+    try:
+        with db.begin_nested():
+            return db.execute(stmt).rowcount
+    except DataError:
+        return recompute_range_python(db, key_range)
+
+
+# One statement writes a whole range of Python-computed results
+_update_from_arrays = text("""
+    UPDATE calculations AS c
+    SET result = v.result, updated_at = timezone('utc', now())
+    FROM unnest(:ids, :results) AS v(id, result)
+    WHERE c.id = v.id AND c.result IS DISTINCT FROM v.result
+""").bindparams(
+    bindparam("ids", type_=ARRAY(UUID(as_uuid=True))),
+    bindparam("results", type_=ARRAY(DOUBLE_PRECISION)),
+)
+
+
+def recompute_range_python(db, key_range: KeyRange) -> int:
+    """Load one range's calculations, compute with get_result, write back in one UPDATE."""
+    ids, results = [], []
+    for calculation in db.scalars(select(Calculation).where(*_in_range(Calculation.id, key_range))):
+        try:
+            result = calculation.get_result()
+        except ValueError:
+            result = None  # division by zero, as in the SQL strategy
+        ids.append(calculation.id)
+        results.append(result)
+    db.expunge_all()  # drop the loaded instances before the next range
+    if not ids:
+        return 0
+    return db.execute(_update_from_arrays, {"ids": ids, "results": results}).rowcount
+
+
+class Checkpoint:
+    """
+    Progress of a recompute run, saved as JSON after every finished range.
+
+    Holds the planned ranges and the indexes of the ranges already committed. The file
+    is replaced atomically, so a crash never leaves it half written.
+    """
+
+    def __init__(self, path: Optional[str], ranges: List[KeyRange], done: Optional[Set[int]] = None):
+        self.path = path
+        self.ranges = ranges
+        self.done = set(done or ())
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Optional[str]) -> Optional["Checkpoint"]:
+        """Read a checkpoint, or return None if there is no file to resume from."""
+        if path is None or not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(path, [tuple(key_range) for key_range in data["ranges"]], set(data["done"]))
+
+    def pending(self) -> List[int]:
+        return [index for index in range(len(self.ranges)) if index not in self.done]
+
+    def mark_done(self, index: int) -> None:
+        with self._lock:
+            self.done.add(index)
+            self.save()
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"ranges": self.ranges, "done": sorted(self.done)}, f)
+        os.replace(tmp_path, self.path)
+
+    def remove(self) -> None:
+        if self.path is not None and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def recompute_results(
+    session_factory: Callable,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: int = DEFAULT_WORKERS,
+    checkpoint_path: Optional[str] = None,
+    strategy: str = "sql",
+) -> int:
+    """
+    Recompute the result column of every calculation.
+
+    Parameters:
+        session_factory: Makes a sync Session (e.g. SessionLocal); each range gets its own.
+        chunk_size: About how many rows each range (and transaction) covers.
+        workers: Ranges processed at the same time, one connection each.
+        checkpoint_path: Where progress is saved. If the file exists, its remaining ranges
+            are resumed instead of planning new ones. It is deleted once every range is done.
+        strategy: "sql" or "python" (see STRATEGIES).
+
+    Returns:
+        The number of rows whose result changed. A resumed run counts only its own rows.
+
+    Raises:
+        Whatever a range raised. Ranges already committed stay in the checkpoint.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy: {strategy}")
+    recompute_range = recompute_range_sql if strategy == "sql" else recompute_range_python
+
+    checkpoint = Checkpoint.load(checkpoint_path)
+    if checkpoint is None:
+        with session_factory() as db:
+            checkpoint = Checkpoint(checkpoint_path, plan_ranges(db, chunk_size))
+        checkpoint.save()
+
+    def run(index: int) -> int:
+        with session_factory() as db:
+            updated = recompute_range(db, checkpoint.ranges[index])
+            db.commit()
+        checkpoint.mark_done(index)
+        return updated
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="recompute") as executor:
+        futures = [executor.submit(run, index) for index in checkpoint.pending()]
+        finished, _ = wait(futures, return_when=FIRST_EXCEPTION)
+        failed = next((future for future in finished if future.exception() is not None), None)
+        if failed is not None:
+            for future in futures:
+                future.cancel()  # ranges not started yet are skipped; running ones still commit
+            raise failed.exception()
+        updated = sum(future.result() for future in futures)
+
+    checkpoint.remove()
+    return updated
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Recompute the stored result of every calculation.")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows per range")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="ranges processed in parallel")
+    parser.add_argument("--checkpoint", help="progress file; rerun with the same file to resume")
+    parser.add_argument("--strategy", choices=STRATEGIES, default="sql")
+    args = parser.parse_args(argv)
+
+    from app.database import SessionLocal
+
+    updated = recompute_results(SessionLocal, args.chunk_size, args.workers, args.checkpoint, args.strategy)
+    print(f"Updated {updated} calculations")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())  # pragma: no cover
@@ -0,0 +1,55 @@
+# app/schemas/adapters.py
+
+"""
+Pre-built Pydantic TypeAdapters for validating and serializing whole batches of calculations.
+
+Building a validator or serializer for a type is the expensive part of a TypeAdapter, so
+each one here is built once at import and reused by every request. A batch is validated
+or serialized in one call into pydantic-core, straight from or to JSON bytes, rather than
+item by item through Python.
+
+strict=True turns off type coercion: "1" is no longer accepted for a float, for example.
+Use it when clients are known to send well-typed data and lax coercion would hide bugs.
+"""
+
+from typing import List, Sequence, Union
+
+from pydantic import TypeAdapter
+
+from app.schemas.calculation import CalculationCreate, CalculationRead, CalculationRecord, CalculationRecordPage
+
+calculation_create_list_adapter = TypeAdapter(List[CalculationCreate])
+
+calculation_read_list_adapter = TypeAdapter(List[CalculationRead])
+
+# CalculationRecordPage to the JSON body documented by CalculationPage (GET /calculations)
+calculation_page_adapter = TypeAdapter(CalculationRecordPage)
+
+# CalculationRecords to the JSON array documented as List[CalculationRead] (POST /calculations/batch)
+calculation_record_list_adapter = TypeAdapter(List[CalculationRecord])
+
+
+def validate_calculation_creates(data: Union[bytes, str], strict: bool = False) -> List[CalculationCreate]:
+    """
+    Validate a JSON array of calculations to create.
+
+    Raises:
+        pydantic.ValidationError: The body isn't a JSON array or an item is invalid. The
+            error locations start with the item's index.
+    """
+    return calculation_create_list_adapter.validate_json(data, strict=strict)
+
+
+def validate_calculation_reads(data: Union[bytes, str], strict: bool = False) -> List[CalculationRead]:
+    """Validate a JSON array of calculations, e.g. the items of a history page."""
+    return calculation_read_list_adapter.validate_json(data, strict=strict)
+
+
+def dump_calculation_reads(calculations: Sequence[CalculationRead]) -> bytes:
+    """Serialize calculations to a JSON array in one call."""
+    return calculation_read_list_adapter.dump_json(list(calculations))
+
+
+def dump_calculation_records(records: Sequence[CalculationRecord]) -> bytes:
+    """Serialize CalculationRecords to the same JSON array as the equivalent CalculationReads."""
+    return calculation_record_list_adapter.dump_json(list(records))
@@ -1,5 +1,7 @@
+from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
+from typing import List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict, Field
@@ -66,9 +68,12 @@ class CalculationRead(CalculationBase):
         example="123e4567-e89b-12d3-a456-426614174002"
     )
 
-    result: float = Field(
+    result: Optional[float] = Field(
         ...,
-        description="Result of operation between first number and second number",
+        description=(
+            "Result of operation between first number and second number; "
+            "null for a division by zero stored without a result"
+        ),
         example=12.5
     )
 
@@ -89,3 +94,41 @@ class CalculationRead(CalculationBase):
             }
         }
     )
+
+# Server sends this back for GET /calculations: one page of a user's history
+class CalculationPage(BaseModel):
+    """Schema for one page of calculation history, newest first"""
+
+    items: List[CalculationRead] = Field(..., description="Calculations on this page")
+
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Opaque cursor for the next page; null when this is the last page"
+    )
+
+# Server-side record for list responses: the fields of CalculationRead, in the same order
+@dataclass(slots=True)
+class CalculationRecord:
+    """
+    One calculation as read by Calculation.history_rows, without model validation.
+
+    Building a CalculationRead costs a validation (or a model_construct) per item, which is
+    most of the time spent on a large page. This slotted record is filled straight from a
+    database row, CalculationRecord(*row), and serialized by app.schemas.adapters'
+    calculation_page_adapter to the same JSON a CalculationRead would produce.
+    """
+
+    type: CalculationType
+    a: float
+    b: float
+    id: UUID
+    user_id: UUID
+    result: Optional[float]  # None only for a division by zero written behind the ORM's back, as CalculationRead allows
+    created_at: datetime
+    updated_at: datetime
+
+# CalculationPage made of CalculationRecords, for serializing with adapters.calculation_page_adapter
+@dataclass(slots=True)
+class CalculationRecordPage:
+    items: List[CalculationRecord]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,132 @@
+# app/streaming.py
+# helpers for streaming routes: NDJSON in and out, and long downloads
+
+from typing import AsyncIterable, AsyncIterator, List
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# A single NDJSON line larger than this is rejected instead of buffered,
+# so a client can't grow worker memory by never sending a newline
+MAX_LINE_BYTES = 64 * 1024
+
+
+class LineTooLongError(ValueError):
+    """Raised when an NDJSON line exceeds MAX_LINE_BYTES."""
+
+
+class BodyTooLargeError(ValueError):
+    """Raised when a request body exceeds the size a route accepts."""
+
+
+async def read_body(request: Request, max_bytes: int) -> bytes:
+    """
+    Read the whole request body, refusing it once it passes max_bytes.
+
+    An oversized Content-Length is refused before anything is read; a body without one
+    (chunked) is counted as it arrives, so at most max_bytes are ever buffered.
+
+    Raises:
+        BodyTooLargeError: The body is larger than max_bytes.
+    """
+    message = f"Request body exceeds {max_bytes} bytes"
+    content_length = request.headers.get("content-length")
+    if content_length is not None and content_length.isdigit() and int(content_length) > max_bytes:
+        raise BodyTooLargeError(message)
+    chunks, size = [], 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > max_bytes:
+            raise BodyTooLargeError(message)
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body iterator is allowed to read the request body.
+
+    Starlette's StreamingResponse runs a background task that calls receive() to
+    watch for client disconnects. That task would swallow the request body
+    messages a streaming route is still reading, so here the body iterator is
+    the only consumer of receive(): request.stream() raises ClientDisconnect
+    when the client goes away, and the iterator is expected to stop on it.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()  # pragma: no cover
+
+
+class ClosingStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that always closes its body iterator.
+
+    When the client disconnects, Starlette cancels the streaming task and leaves the
+    body generator suspended at its last yield. Its cleanup (closing a database cursor,
+    returning a connection to the pool) would only run whenever the generator is
+    garbage collected. Here aclose() runs as soon as the response ends, however it ends.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            aclose = getattr(self.body_iterator, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+
+async def iter_line_batches(
+    chunks: AsyncIterable[bytes], max_line_bytes: int = MAX_LINE_BYTES
+) -> AsyncIterator[List[bytes]]:
+    """
+    Split a stream of byte chunks into lines, yielding the lines each chunk completes.
+
+    Nothing waits for more input than the chunk that completes a line, so a caller can
+    answer an interactive client line by line while still handling the many lines of a
+    large chunk together. Only the current, incomplete line is buffered. Blank lines are
+    skipped, and chunks that complete no line yield nothing.
+
+    Raises:
+        LineTooLongError: If a line grows past max_line_bytes. The lines before it are
+        yielded first.
+    """
+    too_long = f"Line exceeds {max_line_bytes} bytes"
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        complete = []
+        for line in lines:
+            if len(line) > max_line_bytes:
+                if complete:
+                    yield complete
+                raise LineTooLongError(too_long)
+            if line.strip():
+                complete.append(line)
+        if complete:
+            yield complete
+        if len(buffer) > max_line_bytes:
+            raise LineTooLongError(too_long)
+    if buffer.strip():
+        yield [buffer]
+
+
+async def iter_lines(
+    chunks: AsyncIterable[bytes], max_line_bytes: int = MAX_LINE_BYTES
+) -> AsyncIterator[bytes]:
+    """
+    Split a stream of byte chunks into lines as the chunks arrive.
+
+    Only the current, incomplete line is buffered. Blank lines are skipped.
+
+    Raises:
+        LineTooLongError: If a line grows past max_line_bytes.
+    """
+    async for lines in iter_line_batches(chunks, max_line_bytes):
+        for line in lines:
+            yield line
@@ -1,11 +1,32 @@
 # main.py
 
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, Response
 from fastapi.templating import Jinja2Templates
-from pydantic import BaseModel, Field, field_validator  # Use @validator for Pydantic 1.x
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError, field_validator  # Use @validator for Pydantic 1.x
 from fastapi.exceptions import RequestValidationError
-from app.operations import add, subtract, multiply, divide  # Ensure correct import path
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+from typing import Callable, List, Literal, Optional, Union
+from app.auth.dependencies import get_current_active_user
+from app.config import settings
+from app.database import AsyncSessionLocal, get_db
+from app.export import EXPORT_MEDIA_TYPES, export_calculations
+from app.models.base import UTC_NOW
+from app.models.calculation import Calculation
+from app.negotiation import MSGPACK_MEDIA_TYPE, is_msgpack, negotiate, pack, unpack
+from app.operations.batch import NON_FINITE_ERROR, evaluate_batch
+from app.operations.registry import OPERATION_NAMES, OPERATIONS, OPERATIONS_BY_TYPE, Operation
+from app.pagination import decode_cursor, encode_cursor
+from app.schemas.adapters import calculation_create_list_adapter, calculation_page_adapter, dump_calculation_records, validate_calculation_creates
+from app.schemas.calculation import CalculationCreate, CalculationPage, CalculationRead, CalculationRecord, CalculationRecordPage
+from app.schemas.user import UserResponse
+from app.streaming import NDJSON_MEDIA_TYPE, BodyTooLargeError, ClosingStreamingResponse, DuplexStreamingResponse, LineTooLongError, iter_line_batches, read_body
+from contextlib import aclosing
+import json
+import math
 import uvicorn
 import logging
 
@@ -37,6 +58,25 @@ class OperationResponse(BaseModel):
 class ErrorResponse(BaseModel):
     error: str = Field(..., description="Error message")
 
+# Pydantic model for one item of a batch request
+class BatchOperation(BaseModel):
+    op: Literal[OPERATION_NAMES] = Field(..., description="The operation to perform")
+    a: float = Field(..., description="The first number")
+    b: float = Field(..., description="The second number")
+
+# Pydantic model for a WebSocket message: a batch item tagged with a client-chosen correlation id
+class WebSocketOperation(BatchOperation):
+    id: Union[int, str] = Field(..., description="Correlation id echoed back in the reply")
+
+# Pydantic model for one item of a batch response: either a result or an error
+class BatchItemResult(BaseModel):
+    result: Optional[float] = Field(None, description="The result of the operation")
+    error: Optional[str] = Field(None, description="Error message if this operation failed")
+
+# Pydantic model for a batch response, one entry per request item in the same order
+class BatchResponse(BaseModel):
+    results: List[BatchItemResult] = Field(..., description="Per-item results in request order")
+
 # Custom Exception Handlers
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
@@ -46,16 +86,59 @@ async def http_exception_handler(request: Request, exc: HTTPException):
         content={"error": exc.detail},
     )
 
+def format_validation_errors(errors) -> str:
+    """Join Pydantic validation errors into the single message used in ErrorResponse."""
+    # Errors about the whole payload (e.g. invalid JSON) have an empty location
+    return "; ".join([f"{err['loc'][-1] if err['loc'] else 'body'}: {err['msg']}" for err in errors])
+
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     # Extracting error messages
-    error_messages = "; ".join([f"{err['loc'][-1]}: {err['msg']}" for err in exc.errors()])
+    error_messages = format_validation_errors(exc.errors())
     logger.error(f"ValidationError on {request.url.path}: {error_messages}")
     return JSONResponse(
         status_code=400,
         content={"error": error_messages},
     )
 
+# Pre-built serializer for OperationResponse, used by the fast JSON routes
+operation_response_adapter = TypeAdapter(OperationResponse)
+
+def fast_operation_route(operation: Callable[[float, float], float], name: str):
+    """
+    Build a route for one operation that skips FastAPI's generic request/response handling.
+
+    The request body is parsed straight from raw bytes with model_validate_json, and the
+    result is written with the pre-built serializer instead of being re-validated through
+    response_model. Errors are raised as RequestValidationError/HTTPException, so the
+    exception handlers above produce the same error responses as the classic routes.
+    """
+    async def route(request: Request) -> Response:
+        try:
+            payload = OperationRequest.model_validate_json(await request.body())
+        except ValidationError as e:
+            raise RequestValidationError(e.errors())
+        try:
+            result = operation(payload.a, payload.b)
+        except ValueError as e:
+            logger.error(f"{name} Operation Error: {str(e)}")
+            raise HTTPException(status_code=400, detail=str(e))
+        body = operation_response_adapter.dump_json(OperationResponse.model_construct(result=result))
+        return Response(content=body, media_type="application/json")
+    route.__name__ = f"fast_{name.lower()}_route"
+    return route
+
+if settings.FAST_JSON_RESPONSES:
+    # Registered before the classic routes below, so these answer on the same paths.
+    # They are left out of the schema: the classic routes still document the same contract.
+    for operation in OPERATIONS.values():
+        app.add_api_route(
+            f"/{operation.name}",
+            fast_operation_route(operation.scalar, operation.label),
+            methods=["POST"],
+            include_in_schema=False,
+        )
+
 @app.get("/")
 async def read_root(request: Request):
     """
@@ -63,56 +146,352 @@ async def read_root(request: Request):
     """
     return templates.TemplateResponse("index.html", {"request": request})
 
-@app.post("/add", response_model=OperationResponse, responses={400: {"model": ErrorResponse}})
-async def add_route(operation: OperationRequest):
+def operation_route(operation: Operation):
     """
-    Add two numbers.
+    Build the POST /<name> route for one registered operation.
+
+    Invalid operands (the scalar function's ValueError, e.g. division by zero) are a 400;
+    anything else is logged and answered with a 500.
     """
+    async def route(payload: OperationRequest):
+        try:
+            result = operation.scalar(payload.a, payload.b)
+            return OperationResponse(result=result)
+        except ValueError as e:
+            logger.error(f"{operation.label} Operation Error: {str(e)}")
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"{operation.label} Operation Internal Error: {str(e)}")
+            raise HTTPException(status_code=500, detail="Internal Server Error")
+    route.__name__ = f"{operation.name}_route"
+    route.__doc__ = operation.description
+    return route
+
+# One route per registered operation: /add, /subtract, /multiply, /divide
+for operation in OPERATIONS.values():
+    app.add_api_route(
+        f"/{operation.name}",
+        operation_route(operation),
+        methods=["POST"],
+        response_model=OperationResponse,
+        responses={400: {"model": ErrorResponse}},
+    )
+
+def batch_error(op: str, value: float, failed: bool) -> Optional[str]:
+    """
+    Return the error to report for one evaluate_batch element, or None for a valid result.
+
+    Failed elements get their operation's registered error; a result that overflowed to
+    infinity gets NON_FINITE_ERROR, since JSON has no value for it.
+    """
+    if failed:
+        return OPERATIONS[op].error
+    if not math.isfinite(value):
+        return NON_FINITE_ERROR
+    return None
+
+# Most operations POST /batch evaluates in one request, and the largest body it reads: 128
+# bytes per operation is generous for {"op", "a", "b"} in JSON, and more so in MessagePack
+BATCH_MAX_ITEMS = 10_000
+BATCH_MAX_BYTES = BATCH_MAX_ITEMS * 128
+
+# Pre-built validator for /batch bodies, used for both JSON and MessagePack requests
+batch_operation_list_adapter = TypeAdapter(List[BatchOperation])
+
+# Request/response body docs for the routes that negotiate JSON or MessagePack
+BATCH_BODY_SCHEMA = {"type": "array", "items": BatchOperation.model_json_schema()}
+MSGPACK_CONTENT = {MSGPACK_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}}}
+
+@app.post(
+    "/batch",
+    response_model=BatchResponse,
+    responses={200: {"content": MSGPACK_CONTENT}, 400: {"model": ErrorResponse}, 413: {"model": ErrorResponse}},
+    openapi_extra={"requestBody": {"required": True, "content": {
+        "application/json": {"schema": BATCH_BODY_SCHEMA}, **MSGPACK_CONTENT,
+    }}},
+)
+async def batch_route(request: Request):
+    """
+    Evaluate many operations in one request.
+
+    The whole list is validated in one pass and evaluated with the vectorized
+    batch engine. A failing item (e.g. division by zero) is reported in its own
+    slot instead of failing the whole batch.
+
+    The body is JSON, or MessagePack when sent as application/msgpack; the response
+    is MessagePack when the Accept header prefers application/msgpack. A body larger
+    than BATCH_MAX_BYTES is refused with a 413 before it is decoded, and at most
+    BATCH_MAX_ITEMS operations are evaluated per request.
+    """
+    try:
+        body = await read_body(request, BATCH_MAX_BYTES)
+    except BodyTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     try:
-        result = add(operation.a, operation.b)
-        return OperationResponse(result=result)
-    except Exception as e:
-        logger.error(f"Add Operation Error: {str(e)}")
+        if is_msgpack(request.headers.get("content-type")):
+            operations = batch_operation_list_adapter.validate_python(unpack(body))
+        else:
+            operations = batch_operation_list_adapter.validate_json(body)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+    except ValueError as e:  # undecodable MessagePack
         raise HTTPException(status_code=400, detail=str(e))
+    if len(operations) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_ITEMS} operations per batch")
 
-@app.post("/subtract", response_model=OperationResponse, responses={400: {"model": ErrorResponse}})
-async def subtract_route(operation: OperationRequest):
+    results, errors = evaluate_batch(
+        [operation.op for operation in operations],
+        [operation.a for operation in operations],
+        [operation.b for operation in operations],
+    )
+    # Build the body directly: re-validating thousands of BatchItemResult models would cost more than the math
+    content = {"results": []}
+    for operation, value, failed in zip(operations, results.tolist(), errors.tolist()):
+        error = batch_error(operation.op, value, failed)
+        content["results"].append({"result": None, "error": error} if error else {"result": value, "error": None})
+    if negotiate(request.headers.get("accept")) == MSGPACK_MEDIA_TYPE:
+        return Response(content=pack(content), media_type=MSGPACK_MEDIA_TYPE, headers={"Vary": "Accept"})
+    return JSONResponse(content=content, headers={"Vary": "Accept"})
+
+# Most NDJSON lines evaluated together by /calculate/stream; a body chunk with more lines
+# is answered in several pieces
+STREAM_CHUNK_SIZE = 1000
+
+def evaluate_ndjson_chunk(lines: List[bytes]) -> bytes:
     """
-    Subtract two numbers.
+    Evaluate a chunk of NDJSON operation lines and return the NDJSON result lines.
+
+    Each output line is either an OperationResponse ({"result": ...}) or an
+    ErrorResponse ({"error": ...}), in the same order as the input lines.
     """
+    outputs: List[dict] = [None] * len(lines)
+    valid_positions, ops, a_values, b_values = [], [], [], []
+    for position, line in enumerate(lines):
+        try:
+            operation = BatchOperation.model_validate_json(line)
+        except ValidationError as e:
+            outputs[position] = {"error": format_validation_errors(e.errors())}
+            continue
+        valid_positions.append(position)
+        ops.append(operation.op)
+        a_values.append(operation.a)
+        b_values.append(operation.b)
+
+    if valid_positions:
+        results, errors = evaluate_batch(ops, a_values, b_values)
+        for position, op, value, failed in zip(valid_positions, ops, results.tolist(), errors.tolist()):
+            error = batch_error(op, value, failed)
+            outputs[position] = {"error": error} if error else {"result": value}
+
+    return "".join(json.dumps(output, allow_nan=False) + "\n" for output in outputs).encode()
+
+@app.post(
+    "/calculate/stream",
+    response_class=DuplexStreamingResponse,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}},
+)
+async def calculate_stream_route(request: Request):
+    """
+    Evaluate a stream of newline-delimited JSON operations.
+
+    Each request line is a `{"op", "a", "b"}` object. The lines completed by each
+    body chunk are answered as soon as that chunk arrives, evaluated together (at
+    most STREAM_CHUNK_SIZE at a time) with the batch engine, so an interactive
+    client gets its results right away, a bulk upload is still vectorized, and
+    memory stays flat no matter how large the input is.
+    """
+    async def results():
+        try:
+            async for lines in iter_line_batches(request.stream()):
+                for start in range(0, len(lines), STREAM_CHUNK_SIZE):
+                    yield evaluate_ndjson_chunk(lines[start:start + STREAM_CHUNK_SIZE])
+        except LineTooLongError as e:
+            # The status line is already sent, so report the error in the stream and stop
+            logger.error(f"Stream Operation Error: {str(e)}")
+            yield (json.dumps({"error": str(e)}) + "\n").encode()
+        except ClientDisconnect:
+            logger.info("Client disconnected from /calculate/stream")
+
+    return DuplexStreamingResponse(results(), media_type=NDJSON_MEDIA_TYPE)
+
+@app.websocket("/ws/calculate")
+async def calculate_websocket(websocket: WebSocket):
+    """
+    Evaluate operations sent over a long-lived WebSocket.
+
+    Each message is a JSON object `{"id", "op", "a", "b"}`. The reply is sent on
+    the same socket as `{"id", "result"}` or `{"id", "error"}`, so clients can
+    match replies to requests by id without opening a new connection per call.
+    """
+    await websocket.accept()
     try:
-        result = subtract(operation.a, operation.b)
-        return OperationResponse(result=result)
-    except Exception as e:
-        logger.error(f"Subtract Operation Error: {str(e)}")
-        raise HTTPException(status_code=400, detail=str(e))
+        while True:
+            message = await websocket.receive_text()
+            try:
+                operation = WebSocketOperation.model_validate_json(message)
+            except ValidationError as e:
+                # Echo the id back if the client sent one, so it can fail the right request
+                try:
+                    message_id = json.loads(message).get("id")
+                except (ValueError, AttributeError):
+                    message_id = None
+                await websocket.send_json({"id": message_id, "error": format_validation_errors(e.errors())})
+                continue
 
-@app.post("/multiply", response_model=OperationResponse, responses={400: {"model": ErrorResponse}})
-async def multiply_route(operation: OperationRequest):
+            try:
+                result = OPERATIONS[operation.op].scalar(operation.a, operation.b)
+                error = batch_error(operation.op, result, False)  # an overflow has no JSON value
+                if error:
+                    raise ValueError(error)
+                await websocket.send_json({"id": operation.id, "result": result})
+            except ValueError as e:
+                logger.error(f"WebSocket Operation Error: {str(e)}")
+                await websocket.send_json({"id": operation.id, "error": str(e)})
+    except WebSocketDisconnect:
+        logger.info("Client disconnected from /ws/calculate")
+
+# Page size limits for GET /calculations
+HISTORY_DEFAULT_LIMIT = 50
+HISTORY_MAX_LIMIT = 500
+
+@app.get(
+    "/calculations",
+    response_model=CalculationPage,
+    responses={200: {"content": MSGPACK_CONTENT}, 400: {"model": ErrorResponse}},
+)
+def list_calculations_route(
+    request: Request,
+    limit: int = Query(HISTORY_DEFAULT_LIMIT, ge=1, le=HISTORY_MAX_LIMIT, description="Calculations per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    current_user: UserResponse = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+):
     """
-    Multiply two numbers.
+    List the current user's calculations, newest first, one page at a time.
+
+    Pass the returned next_cursor to get the following page; it is null on the last
+    page. Pages are keyset-paginated, so a deep page is as fast as the first one.
+    The page is MessagePack when the Accept header prefers application/msgpack.
     """
     try:
-        result = multiply(operation.a, operation.b)
-        return OperationResponse(result=result)
-    except Exception as e:
-        logger.error(f"Multiply Operation Error: {str(e)}")
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@app.post("/divide", response_model=OperationResponse, responses={400: {"model": ErrorResponse}})
-async def divide_route(operation: OperationRequest):
+    # Fetch one extra row to learn whether there is a next page without a COUNT. Plain rows,
+    # not ORM instances: the page only needs the column values
+    rows = Calculation.history_rows(db, current_user.id, limit + 1, after)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    page = CalculationRecordPage([CalculationRecord(*row) for row in rows], next_cursor)
+    # Serialized directly: response_model would validate every item first
+    if negotiate(request.headers.get("accept")) == MSGPACK_MEDIA_TYPE:
+        body = pack(calculation_page_adapter.dump_python(page))
+        return Response(content=body, media_type=MSGPACK_MEDIA_TYPE, headers={"Vary": "Accept"})
+    return Response(content=calculation_page_adapter.dump_json(page), media_type="application/json", headers={"Vary": "Accept"})
+
+# Most calculations POST /calculations/batch stores in one request
+CALCULATION_BATCH_MAX_ITEMS = 10_000
+# Largest body it reads: a generous 256 bytes per item (a compact item is under 100), so an
+# oversized request is refused before it is buffered or validated
+CALCULATION_BATCH_MAX_BYTES = CALCULATION_BATCH_MAX_ITEMS * 256
+
+# The batch route reads the raw body, so FastAPI can't derive its schema; CalculationType's
+# $ref resolves to the component FastAPI registers for CalculationRead
+CALCULATION_BATCH_BODY_SCHEMA = {
+    "type": "array",
+    "items": calculation_create_list_adapter.json_schema(ref_template="#/components/schemas/{model}")["$defs"]["CalculationCreate"],
+}
+
+def save_calculation_batch(db: Session, user_id, items: List[CalculationCreate]) -> List[CalculationRecord]:
+    """
+    Store a validated batch with Calculation.bulk_create and return it as records, in input order.
+
+    Nothing is read back or validated again: ids come from bulk_create, results from the
+    operation registry, and created_at/updated_at are the transaction's now(), which the
+    server default gave every row, fetched with one query before the commit.
+    """
+    ids = Calculation.bulk_create(db, user_id, items)
+    created_at = db.scalar(select(UTC_NOW))
+    db.commit()
+    return [
+        CalculationRecord(
+            item.type, item.a, item.b, id_, user_id,
+            OPERATIONS_BY_TYPE[item.type].scalar(item.a, item.b), created_at, created_at,
+        )
+        for item, id_ in zip(items, ids)
+    ]
+
+@app.post(
+    "/calculations/batch",
+    status_code=201,
+    response_model=List[CalculationRead],
+    responses={400: {"model": ErrorResponse}},
+    openapi_extra={"requestBody": {"required": True, "content": {"application/json": {"schema": CALCULATION_BATCH_BODY_SCHEMA}}}},
+)
+async def create_calculation_batch_route(
+    request: Request,
+    strict: bool = Query(False, description="Reject values that would need type coercion, e.g. \"1\" for a number"),
+    current_user: UserResponse = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+):
     """
-    Divide two numbers.
+    Store many calculations for the current user and return them.
+
+    The JSON array is validated from the raw body in one pass with a pre-built TypeAdapter
+    and written with Calculation.bulk_create, so nothing is saved unless every item is valid
+    (a division by zero fails the batch and names the item).
     """
     try:
-        result = divide(operation.a, operation.b)
-        return OperationResponse(result=result)
+        body = await read_body(request, CALCULATION_BATCH_MAX_BYTES)
+    except BodyTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    try:
+        items = validate_calculation_creates(body, strict=strict)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+    if len(items) > CALCULATION_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {CALCULATION_BATCH_MAX_ITEMS} calculations per batch")
+    try:
+        # The session is synchronous; keep the inserts off the event loop
+        calculations = await run_in_threadpool(save_calculation_batch, db, current_user.id, items)
     except ValueError as e:
-        logger.error(f"Divide Operation Error: {str(e)}")
+        logger.error(f"Batch Calculation Error: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        logger.error(f"Divide Operation Internal Error: {str(e)}")
-        raise HTTPException(status_code=500, detail="Internal Server Error")
+    return Response(content=dump_calculation_records(calculations), status_code=201, media_type="application/json")
+
+@app.get(
+    "/calculations/export",
+    response_class=ClosingStreamingResponse,
+    responses={200: {"content": {media_type: {} for media_type in EXPORT_MEDIA_TYPES.values()}}},
+)
+async def export_calculations_route(
+    format: Literal["csv", "ndjson", "arrow", "parquet"] = Query("ndjson", description="Export format"),
+    current_user: UserResponse = Depends(get_current_active_user),
+):
+    """
+    Download all of the current user's calculations, oldest first, as CSV or NDJSON,
+    or for analytics as an Arrow IPC stream or a Parquet file.
+
+    Rows are streamed from a server-side cursor in batches and written as they are
+    read, so the export uses the same memory for ten rows or ten million.
+    """
+    async def body():
+        # The session lives inside the generator: dependency sessions are closed before
+        # a streaming body is sent, and this one must stay open until the last row
+        async with AsyncSessionLocal() as db:
+            async with aclosing(export_calculations(db, current_user.id, format)) as chunks:
+                async for chunk in chunks:
+                    yield chunk
+
+    return ClosingStreamingResponse(
+        body(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="calculations.{format}"'},
+    )
 
 if __name__ == "__main__":
     uvicorn.run(app, host="127.0.0.1", port=8000)
@@ -1,21 +1,26 @@
 # tests/conftest.py
 
+import asyncio
 import subprocess
 import time
 import logging
-from typing import Generator, Dict, List
+from typing import Callable, Generator, Dict, List, Optional
 from contextlib import contextmanager
 
 import pytest
 import requests
 from faker import Faker # create fake data
+from fastapi.testclient import TestClient
 from playwright.sync_api import sync_playwright, Browser, Page
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 
-from app.database import Base, get_engine, get_sessionmaker
+from app.database import get_async_engine, get_async_sessionmaker, get_engine, get_sessionmaker
+from app.models.base import Base  # the Base the models are registered on (app.database.Base has no tables)
+from app.models.calculation import Calculation
 from app.models.user import User
+from app.schemas.calculation import CalculationCreate, CalculationType
 from app.config import settings
 from app.database_init import init_db, drop_db
 
@@ -58,6 +63,26 @@ def create_fake_user() -> Dict[str, str]:
         "password": fake.password(length=12)
     }
 
+def auth_headers(user: User, **headers: str) -> Dict[str, str]:
+    """Request headers carrying a bearer token for user, plus any extra headers given."""
+    return {"Authorization": f"Bearer {User.create_access_token({'sub': str(user.id)})}", **headers}
+
+def run_with_session(test):
+    """
+    Run an async test function with a fresh AsyncSession, then dispose its engine.
+
+    asyncpg connections belong to the event loop that opened them, so every call gets its
+    own asyncio.run() and its own engine.
+    """
+    async def runner():
+        engine = get_async_engine()
+        try:
+            async with get_async_sessionmaker(engine)() as session:
+                return await test(session)
+        finally:
+            await engine.dispose()
+    return asyncio.run(runner())
+
 @contextmanager
 def managed_db_session():
     """
@@ -186,6 +211,26 @@ def test_user(db_session: Session) -> User:
     logger.info(f"Created test user with ID: {user.id}")
     return user
 
+@pytest.fixture
+def seed_calculations(db_session: Session) -> Callable:
+    """
+    Provide a function that stores count calculations for a user with Calculation.bulk_create.
+
+    Item i is (a=i + 1, b=2), of calc_type or, by default, of each CalculationType in turn.
+    The rows share one created_at, so history lists them in id order. Returns their ids.
+
+    Usage:
+        def test_history(test_user, seed_calculations):
+            ids = seed_calculations(test_user, 10)
+    """
+    def seed(user: User, count: int, calc_type: Optional[CalculationType] = None) -> List:
+        types = list(CalculationType)
+        items = [CalculationCreate(type=calc_type or types[i % len(types)], a=i + 1, b=2) for i in range(count)]
+        ids = Calculation.bulk_create(db_session, user.id, items)
+        db_session.commit()
+        return ids
+    return seed
+
 @pytest.fixture
 def seed_users(db_session: Session, request) -> List[User]:
     """
@@ -209,6 +254,31 @@ def seed_users(db_session: Session, request) -> List[User]:
     db_session.commit()
     return users
 
+# ======================================================================================
+# FastAPI TestClient Fixtures
+# ======================================================================================
+@pytest.fixture
+def client() -> Generator[TestClient, None, None]:
+    """Provide a TestClient for the app in main.py, with its startup and shutdown events run."""
+    from main import app
+
+    with TestClient(app) as client:
+        yield client
+
+@pytest.fixture
+def async_client(monkeypatch) -> Generator[TestClient, None, None]:
+    """
+    Provide a TestClient whose routes get AsyncSessions from an async engine of their own.
+
+    asyncpg connections belong to the event loop that opened them, and every TestClient
+    runs its own loop, so routes using AsyncSessionLocal need a fresh engine per test.
+    """
+    import main
+
+    monkeypatch.setattr(main, "AsyncSessionLocal", get_async_sessionmaker(get_async_engine()))
+    with TestClient(main.app) as client:
+        yield client
+
 # ======================================================================================
 # FastAPI Server Fixture (Optional)
 # ======================================================================================
@@ -0,0 +1,123 @@
+# tests/integration/test_async_database.py
+
+# The async engine, AsyncSession dependency and async persistence paths, used side by side
+# with the sync session from conftest. asyncpg connections belong to the event loop that
+# opened them, so each test runs in its own asyncio.run() with its own engine and disposes it.
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import database
+from app.database import get_async_database_url, get_async_engine, get_async_sessionmaker
+from app.models.calculation import Addition, Calculation, Division
+from app.models.user import User
+from app.schemas.calculation import CalculationType
+from tests.conftest import create_fake_user, run_with_session
+
+def test_get_async_database_url():
+    assert get_async_database_url("postgresql://u:p@host:5432/db") == "postgresql+asyncpg://u:p@host:5432/db"
+    assert get_async_database_url("postgresql+psycopg2://u:p@host/db") == "postgresql+asyncpg://u:p@host/db"
+
+def test_async_engine_uses_pool_settings():
+    engine = get_async_engine()
+    assert engine.sync_engine.pool.size() == database.settings.DB_POOL_SIZE
+    assert engine.url.drivername == "postgresql+asyncpg"
+
+def test_get_async_engine_failure():
+    with patch("app.database.create_async_engine", side_effect=SQLAlchemyError("Engine error")):
+        with pytest.raises(SQLAlchemyError, match="Engine error"):
+            get_async_engine()
+
+def test_async_sampled_echo(monkeypatch):
+    monkeypatch.setattr(database.settings, "DB_ECHO", True)
+    monkeypatch.setattr(database.settings, "DB_ECHO_SAMPLE_RATE", 0.5)
+    with patch("app.database.enable_sampled_echo") as mock_enable:
+        engine = get_async_engine()
+    mock_enable.assert_called_once_with(engine.sync_engine, 0.5)
+
+def test_get_async_sessionmaker_default_engine():
+    factory = get_async_sessionmaker()
+    assert factory.kw["bind"].url.drivername == "postgresql+asyncpg"
+
+def test_get_async_db_yields_session():
+    async def runner():
+        gen = database.get_async_db()
+        db = await gen.__anext__()
+        assert isinstance(db, AsyncSession)
+        assert (await db.execute(text("SELECT 1"))).scalar() == 1
+        with pytest.raises(StopAsyncIteration):
+            await gen.__anext__()
+        await database.async_engine.dispose()
+    asyncio.run(runner())
+
+def test_register_async_and_authenticate_async(db_session):
+    user_data = create_fake_user()
+    user_data["password"] = "TestPass123"
+
+    async def test(session):
+        user = await User.register_async(session, user_data)
+        await session.commit()
+        assert user.id is not None
+        assert user.verify_password("TestPass123")
+
+        auth_result = await User.authenticate_async(session, user_data["username"], "TestPass123")
+        assert auth_result["token_type"] == "bearer"
+        assert auth_result["user"]["email"] == user_data["email"]
+        assert await User.authenticate_async(session, user_data["username"], "WrongPass123") is None
+        return user.id
+
+    user_id = run_with_session(test)
+
+    # The sync session sees the user written through the async one
+    user = db_session.query(User).filter(User.id == user_id).first()
+    assert user.last_login is not None
+
+def test_register_async_duplicate(db_session):
+    user_data = create_fake_user()
+    user_data["password"] = "TestPass123"
+    User.register(db_session, user_data)
+    db_session.commit()
+
+    async def test(session):
+        with pytest.raises(ValueError, match="Username or email already exists"):
+            await User.register_async(session, user_data)
+
+    run_with_session(test)
+
+def test_register_async_short_password():
+    user_data = create_fake_user()
+    user_data["password"] = "Ab1"
+
+    async def test(session):
+        with pytest.raises(ValueError, match="Password must be at least 6 characters long"):
+            await User.register_async(session, user_data)
+
+    run_with_session(test)
+
+def test_calculation_create(db_session, test_user):
+    calculation = Calculation.create(db_session, test_user.id, CalculationType.ADDITION, 2, 3)
+    db_session.commit()
+
+    assert isinstance(calculation, Addition)
+    assert calculation.result == 5
+    assert calculation.user_id == test_user.id
+
+def test_calculation_create_async(db_session, test_user):
+    async def test(session):
+        calculation = await Calculation.create_async(session, test_user.id, CalculationType.DIVISION, 9, 3)
+        await session.commit()
+        assert isinstance(calculation, Division)
+        assert calculation.result == 3
+
+        with pytest.raises(ValueError, match="cannot be zero"):
+            await Calculation.create_async(session, test_user.id, CalculationType.DIVISION, 1, 0)
+
+        rows = (await session.execute(select(Calculation).where(Calculation.user_id == test_user.id))).scalars().all()
+        return len(rows)
+
+    assert run_with_session(test) == 1
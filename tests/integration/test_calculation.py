@@ -1,5 +1,6 @@
 import pytest
 from app.models.calculation import Calculation, Division, Multiplication, Subtraction
+from app.schemas.calculation import CalculationCreate, CalculationType
 
 from app.models.calculation import Addition
 
@@ -45,3 +46,137 @@ def test_division_by_zero_raises_error():
     with pytest.raises(ValueError, match="The divisor 'b' cannot be zero"):
         division.get_result()
 
+
+
+# bulk_create tests
+@pytest.mark.parametrize("use_copy", [True, False], ids=["copy", "executemany"])
+def test_bulk_create(db_session, test_user, monkeypatch, use_copy):
+    from app.models import calculation as calculation_module
+    monkeypatch.setattr(calculation_module, "BULK_CREATE_CHUNK_SIZE", 2)  # force several chunks
+    monkeypatch.setattr(Calculation, "_supports_copy", staticmethod(lambda db: use_copy))
+    items = [
+        CalculationCreate(type=CalculationType.ADDITION, a=1, b=2),
+        CalculationCreate(type=CalculationType.SUBTRACTION, a=5, b=3),
+        CalculationCreate(type=CalculationType.MULTIPLICATION, a=4, b=2.5),
+        CalculationCreate(type=CalculationType.DIVISION, a=9, b=3),
+        CalculationCreate(type=CalculationType.ADDITION, a=0.1, b=0.2),
+    ]
+    ids = Calculation.bulk_create(db_session, test_user.id, items)
+    db_session.commit()
+
+    assert len(ids) == len(set(ids)) == 5
+    saved = {calc.id: calc for calc in db_session.query(Calculation).all()}
+    assert [type(saved[i]) for i in ids] == [Addition, Subtraction, Multiplication, Division, Addition]
+    assert [saved[i].result for i in ids] == [3, 2, 10, 3, 0.1 + 0.2]  # exact, full precision
+    assert all(saved[i].user_id == test_user.id and saved[i].created_at is not None for i in ids)
+
+def test_bulk_create_division_by_zero_writes_nothing(db_session, test_user):
+    items = [
+        CalculationCreate(type=CalculationType.ADDITION, a=1, b=2),
+        CalculationCreate(type=CalculationType.DIVISION, a=1, b=0),
+    ]
+    with pytest.raises(ValueError, match="Item 1: Cannot divide by zero!"):
+        Calculation.bulk_create(db_session, test_user.id, items)
+    assert db_session.query(Calculation).count() == 0
+
+def test_bulk_create_failure_in_a_later_chunk(db_session, test_user, monkeypatch):
+    from app.models import calculation as calculation_module
+    monkeypatch.setattr(calculation_module, "BULK_CREATE_CHUNK_SIZE", 2)
+    Calculation.bulk_create(db_session, test_user.id, [CalculationCreate(type=CalculationType.ADDITION, a=1, b=1)])
+    items = [CalculationCreate(type=CalculationType.ADDITION, a=i, b=1) for i in range(4)]
+    items.append(CalculationCreate(type=CalculationType.DIVISION, a=1, b=0))
+    with pytest.raises(ValueError, match="Item 4: Cannot divide by zero!"):
+        Calculation.bulk_create(db_session, test_user.id, items)
+    # The chunks written before the failure are undone; the earlier call's row is kept
+    assert db_session.query(Calculation).count() == 1
+
+def test_bulk_create_rolls_back_with_session(db_session, test_user):
+    items = [CalculationCreate(type=CalculationType.MULTIPLICATION, a=2, b=3)]
+    assert Calculation._supports_copy(db_session) is True
+    Calculation.bulk_create(db_session, test_user.id, items)
+    assert db_session.query(Calculation).count() == 1
+    db_session.rollback()
+    assert db_session.query(Calculation).count() == 0
+
+def test_bulk_create_empty(db_session, test_user):
+    assert Calculation.bulk_create(db_session, test_user.id, []) == []
+
+# UUID_VERSION=7 ids for both models
+def test_uuid7_primary_keys(db_session, monkeypatch):
+    from app.config import settings
+    from app.models.user import User
+    from tests.conftest import create_fake_user
+    monkeypatch.setattr(settings, "UUID_VERSION", 7)
+
+    user_data = create_fake_user()
+    user_data["password"] = "TestPass123"
+    user = User.register(db_session, user_data)
+    calculation = Calculation.create(db_session, user.id, CalculationType.ADDITION, 1, 2)
+    ids = Calculation.bulk_create(db_session, user.id, [CalculationCreate(type=CalculationType.ADDITION, a=1, b=2)] * 3)
+    db_session.commit()
+
+    assert user.id.version == 7
+    assert calculation.id.version == 7
+    assert all(i.version == 7 for i in ids)
+    assert [calculation.id] + ids == sorted([calculation.id] + ids)  # created later, sorts later
+
+# computed_result hybrid and stored result
+def test_computed_result_instance():
+    assert Addition(a=2, b=3).computed_result == 5
+    with pytest.raises(ValueError):
+        Division(a=1, b=0).computed_result
+
+def test_computed_result_in_sql(db_session, test_user):
+    from sqlalchemy import func, insert, select
+    from uuid import uuid4
+    items = [
+        CalculationCreate(type=CalculationType.ADDITION, a=600, b=500),
+        CalculationCreate(type=CalculationType.SUBTRACTION, a=5000, b=1),
+        CalculationCreate(type=CalculationType.MULTIPLICATION, a=10, b=10),
+        CalculationCreate(type=CalculationType.DIVISION, a=9000, b=3),
+    ]
+    Calculation.bulk_create(db_session, test_user.id, items)
+    # A row written with plain SQL and no stored result (and a zero divisor)
+    db_session.execute(insert(Calculation.__table__).values(
+        id=uuid4(), user_id=test_user.id, type=CalculationType.DIVISION, a=1, b=0, result=None,
+    ))
+
+    big = db_session.scalars(
+        select(Calculation.computed_result).where(Calculation.computed_result > 1000).order_by(Calculation.computed_result)
+    ).all()
+    assert big == [1100, 3000, 4999]
+    assert db_session.scalar(select(func.sum(Calculation.computed_result))) == 1100 + 4999 + 100 + 3000
+    # Division by zero is NULL in SQL
+    assert db_session.scalar(select(func.count()).where(Calculation.computed_result.is_(None))) == 1
+    # Subclasses get the same expression
+    assert db_session.scalars(select(Addition.computed_result)).all() == [1100]
+
+def test_result_stored_on_insert_and_update(db_session, test_user):
+    calculation = Multiplication(a=6, b=7, user_id=test_user.id)  # not built through create()
+    db_session.add(calculation)
+    db_session.flush()
+    assert calculation.result == 42
+
+    calculation.b = 2
+    db_session.flush()
+    assert calculation.result == 12
+
+    calculation.user_id = test_user.id  # unrelated change keeps the stored result
+    calculation.result = 99
+    db_session.flush()
+    assert calculation.result == 99
+
+def test_result_stored_division_by_zero_rejected(db_session, test_user):
+    db_session.add(Division(a=1, b=0, user_id=test_user.id))
+    with pytest.raises(ValueError, match="cannot be zero"):
+        db_session.flush()
+    db_session.rollback()
+
+def test_result_range_query_uses_index(db_session, test_user):
+    from sqlalchemy import select, text
+    assert "ix_calculations_result" in {index.name for index in Calculation.__table__.indexes}
+    db_session.execute(text("SET enable_seqscan = off"))  # the test table is tiny; ask for the index plan
+    query = select(Calculation.id).where(Calculation.result > 1000)
+    plan = "\n".join(db_session.execute(text("EXPLAIN " + str(query.compile(compile_kwargs={"literal_binds": True})))).scalars())
+    db_session.rollback()
+    assert "ix_calculations_result" in plan
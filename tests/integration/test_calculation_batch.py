@@ -0,0 +1,78 @@
+# tests/integration/test_calculation_batch.py
+
+# POST /calculations/batch: a JSON array of calculations validated with a pre-built TypeAdapter
+# and stored with Calculation.bulk_create
+
+import json
+
+import pytest
+
+import main
+from app.models.calculation import Calculation
+from app.schemas.adapters import validate_calculation_reads
+from tests.conftest import auth_headers
+
+def post_batch(client, user, items, **params):
+    return client.post("/calculations/batch", content=json.dumps(items), params=params, headers=auth_headers(user))
+
+def test_batch_creates_and_returns_calculations(db_session, test_user, client):
+    items = [
+        {"type": "division", "a": 9, "b": 2},
+        {"type": "addition", "a": 1, "b": 2},
+        {"type": "multiplication", "a": "3", "b": 4},  # coerced outside strict mode
+    ]
+    response = post_batch(client, test_user, items)
+    assert response.status_code == 201
+
+    calculations = validate_calculation_reads(response.content)
+    assert [(c.type.value, c.a, c.b, c.result) for c in calculations] == [
+        ("division", 9, 2, 4.5), ("addition", 1, 2, 3), ("multiplication", 3, 4, 12),
+    ]
+    assert all(c.user_id == test_user.id and c.created_at for c in calculations)
+
+    stored = {c.id: c for c in db_session.query(Calculation).filter_by(user_id=test_user.id)}
+    assert {c.id: c.result for c in stored.values()} == {c.id: c.result for c in calculations}
+    # The response is built without reading the rows back; its timestamps still match them
+    assert all((c.created_at, c.updated_at) == (stored[c.id].created_at, stored[c.id].updated_at) for c in calculations)
+
+def test_batch_strict_mode(db_session, test_user, client):
+    items = [{"type": "addition", "a": "1", "b": 2}]
+    response = post_batch(client, test_user, items, strict="true")
+    assert response.status_code == 400
+    assert response.json() == {"error": "a: Input should be a valid number"}
+    assert post_batch(client, test_user, [{"type": "addition", "a": 1, "b": 2}], strict="true").status_code == 201
+
+def test_batch_fails_as_a_whole(db_session, test_user, client):
+    items = [{"type": "addition", "a": 1, "b": 2}, {"type": "division", "a": 1, "b": 0}]
+    response = post_batch(client, test_user, items)
+    assert response.status_code == 400
+    assert response.json() == {"error": "Item 1: Cannot divide by zero!"}
+    assert db_session.query(Calculation).count() == 0
+
+@pytest.mark.parametrize("body", ['{"type": "addition"}', '[{"type": "power", "a": 1, "b": 2}]', "not json"])
+def test_batch_rejects_invalid_bodies(test_user, client, body):
+    response = client.post("/calculations/batch", content=body, headers=auth_headers(test_user))
+    assert response.status_code == 400
+    assert "error" in response.json()
+
+def test_batch_size_limit(test_user, client, monkeypatch):
+    monkeypatch.setattr(main, "CALCULATION_BATCH_MAX_ITEMS", 2)
+    response = post_batch(client, test_user, [{"type": "addition", "a": 1, "b": 2}] * 3)
+    assert response.status_code == 400
+    assert response.json() == {"error": "At most 2 calculations per batch"}
+
+def test_batch_body_size_limit(db_session, test_user, client, monkeypatch):
+    monkeypatch.setattr(main, "CALCULATION_BATCH_MAX_BYTES", 64)
+    items = [{"type": "addition", "a": 1, "b": 2}] * 3
+    response = post_batch(client, test_user, items)  # refused on Content-Length
+    assert response.status_code == 413
+    assert response.json() == {"error": "Request body exceeds 64 bytes"}
+
+    def chunked():  # no Content-Length: refused while the body is read
+        yield json.dumps(items).encode()
+    response = client.post("/calculations/batch", content=chunked(), headers=auth_headers(test_user))
+    assert response.status_code == 413
+    assert db_session.query(Calculation).count() == 0
+
+def test_batch_requires_auth(client):
+    assert client.post("/calculations/batch", content="[]").status_code == 401
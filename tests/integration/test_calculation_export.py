@@ -0,0 +1,102 @@
+# tests/integration/test_calculation_export.py
+
+# GET /calculations/export and app.export: streamed CSV/NDJSON history
+
+import csv
+import io
+import json
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import insert, select
+
+from app import export
+from app.export import export_calculations, export_statement
+from app.models.calculation import Calculation
+from app.schemas.calculation import CalculationType
+from tests.conftest import auth_headers, run_with_session
+
+def test_export_ndjson(db_session, test_user, async_client, monkeypatch, seed_calculations):
+    monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", 3)  # several cursor batches
+    ids = seed_calculations(test_user, 10)
+
+    response = async_client.get("/calculations/export", headers=auth_headers(test_user))
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["content-disposition"] == 'attachment; filename="calculations.ndjson"'
+
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(record["id"] for record in records) == sorted(map(str, ids))
+    assert list(records[0]) == list(export.EXPORT_COLUMNS)
+    by_a = {record["a"]: record for record in records}
+    assert by_a[1.0]["type"] == "addition" and by_a[1.0]["result"] == 3
+    assert by_a[4.0]["type"] == "division" and by_a[4.0]["result"] == 2
+
+def test_export_csv(db_session, test_user, async_client, seed_calculations):
+    seed_calculations(test_user, 4)
+    # Written with plain SQL, so result was never stored
+    db_session.execute(insert(Calculation.__table__).values(
+        id=uuid4(), user_id=test_user.id, type=CalculationType.DIVISION, a=9, b=3, result=None,
+    ))
+    db_session.commit()
+
+    response = async_client.get("/calculations/export", params={"format": "csv"}, headers=auth_headers(test_user))
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 5
+    assert rows[-1]["type"] == "division" and float(rows[-1]["result"]) == 3
+
+def test_export_csv_empty_has_header(test_user, async_client):
+    response = async_client.get("/calculations/export", params={"format": "csv"}, headers=auth_headers(test_user))
+    assert response.text == ",".join(export.EXPORT_COLUMNS) + "\n"
+
+def test_export_invalid_format_and_auth(test_user, async_client):
+    response = async_client.get("/calculations/export", params={"format": "xml"}, headers=auth_headers(test_user))
+    assert response.status_code == 400
+    assert async_client.get("/calculations/export").status_code == 401
+
+def test_export_streams_from_server_side_cursor(db_session, test_user, monkeypatch, seed_calculations):
+    monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", 4)
+    seed_calculations(test_user, 10)
+    assert export_statement(test_user.id).get_execution_options()["yield_per"] == 4
+
+    async def test(session):
+        chunks = [chunk async for chunk in export_calculations(session, test_user.id, "ndjson")]
+        return [chunk.count(b"\n") for chunk in chunks]
+
+    # One chunk per cursor batch, never the whole result at once
+    assert run_with_session(test) == [4, 4, 2]
+
+def test_export_closed_early_releases_connection(db_session, test_user, seed_calculations):
+    seed_calculations(test_user, 10)
+
+    async def test(session):
+        chunks = export_calculations(session, test_user.id, "csv")
+        assert (await chunks.__anext__()).startswith(b"id,type")
+        await chunks.aclose()  # what ClosingStreamingResponse does when the client disconnects
+        # The cursor is closed, so the session can run new statements right away
+        return (await session.execute(select(Calculation.id).limit(1))).first() is not None
+
+    assert run_with_session(test) is True
+
+def test_export_unknown_format(test_user):
+    async def test(session):
+        with pytest.raises(ValueError, match="Unknown export format"):
+            await export_calculations(session, test_user.id, "xml").__anext__()
+
+    run_with_session(test)
+
+def test_export_ndjson_null_results_stay_valid(db_session, test_user, async_client):
+    # Written with plain SQL: a stored division by zero and a result that overflowed to inf
+    db_session.execute(insert(Calculation.__table__).values([
+        dict(id=uuid4(), user_id=test_user.id, type=CalculationType.DIVISION, a=1, b=0, result=None),
+        dict(id=uuid4(), user_id=test_user.id, type=CalculationType.MULTIPLICATION, a=1e308, b=10, result=float("inf")),
+    ]))
+    db_session.commit()
+
+    response = async_client.get("/calculations/export", headers=auth_headers(test_user))
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    assert len(lines) == 2
+    records = [json.loads(line) for line in lines]  # strict JSON: no NaN/Infinity
+    assert [record["result"] for record in records] == [None, None]
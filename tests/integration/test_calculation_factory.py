@@ -2,7 +2,7 @@
 
 import pytest
 from app.models.calculation_factory import CalculationFactory
-from app.schemas.calculation import CalculationType
+from app.schemas.calculation import CalculationCreate, CalculationType
 from app.models.calculation import Addition, Subtraction, Multiplication, Division
 
 @pytest.mark.parametrize("calc_type, a, b, expected_class, expected_result", [
@@ -19,3 +19,19 @@ def test_calculation_factory(calc_type, a, b, expected_class, expected_result):
 def test_calculation_factory_invalid_type():
     with pytest.raises(ValueError, match="Unknown calculation type"):
         CalculationFactory.create_calculation("invalid", 1, 2)
+
+def test_calculation_factory_create_many():
+    items = [
+        CalculationCreate(type=CalculationType.DIVISION, a=10, b=4),
+        CalculationCreate(type=CalculationType.ADDITION, a=1, b=2),
+        CalculationCreate(type=CalculationType.MULTIPLICATION, a=3, b=3),
+    ]
+    calculations = CalculationFactory.create_many(items)
+    assert [type(c) for c in calculations] == [Division, Addition, Multiplication]
+    assert [c.get_result() for c in calculations] == [2.5, 3, 9]
+    assert CalculationFactory.create_many([]) == []
+
+def test_calculation_factory_create_many_invalid_type():
+    item = CalculationCreate.model_construct(type="invalid", a=1, b=2)
+    with pytest.raises(ValueError, match="Unknown calculation type: invalid"):
+        CalculationFactory.create_many([item])
@@ -0,0 +1,134 @@
+# tests/integration/test_calculation_history.py
+
+# GET /calculations and Calculation.history: keyset-paginated history, newest first
+
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import insert, text
+
+from app.models.calculation import HISTORY_ROW_COLUMNS, Addition, Calculation
+from app.models.user import User
+from app.schemas.calculation import (
+    CalculationPage,
+    CalculationRead,
+    CalculationRecord,
+    CalculationRecordPage,
+    CalculationType,
+)
+from app.schemas.adapters import calculation_page_adapter
+from tests.conftest import auth_headers, create_fake_user
+
+def test_history_pages_through_everything(db_session, test_user, client, seed_calculations):
+    ids = seed_calculations(test_user, 7)
+    older = Addition(a=100, b=1, result=101, user_id=test_user.id, created_at=datetime.utcnow() - timedelta(days=1))
+    db_session.add(older)
+    db_session.commit()
+
+    seen, cursor = [], None
+    for _ in range(3):
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/calculations", params=params, headers=auth_headers(test_user))
+        assert response.status_code == 200
+        page = response.json()
+        seen.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+    assert cursor is None
+    assert len(page["items"]) == 2
+
+    # Every row exactly once, newest first; ties on created_at are ordered by id
+    assert seen == sorted(map(str, ids), reverse=True) + [str(older.id)]
+    assert page["items"][-1]["result"] == 101
+
+def test_history_only_lists_own_calculations(db_session, test_user, client, seed_calculations):
+    seed_calculations(test_user, 2)
+    other = User(**{k: v for k, v in create_fake_user().items() if k != "password"}, password_hash="x")
+    db_session.add(other)
+    db_session.commit()
+
+    response = client.get("/calculations", headers=auth_headers(other))
+    assert response.json() == {"items": [], "next_cursor": None}
+
+def test_history_computes_missing_result(db_session, test_user, client):
+    # Written with plain SQL, so result was never stored
+    db_session.execute(insert(Calculation.__table__).values(
+        id=uuid4(), user_id=test_user.id, type=CalculationType.DIVISION, a=9, b=3, result=None,
+    ))
+    db_session.commit()
+
+    response = client.get("/calculations", headers=auth_headers(test_user))
+    item = response.json()["items"][0]
+    assert item["result"] == 3
+    assert item["type"] == "division"
+    assert item["user_id"] == str(test_user.id)
+
+def test_history_division_by_zero_matches_documented_schema(db_session, test_user, client):
+    # Written with plain SQL: the computed_result CASE gives NULL for a division by zero
+    db_session.execute(insert(Calculation.__table__).values(
+        id=uuid4(), user_id=test_user.id, type=CalculationType.DIVISION, a=9, b=0, result=None,
+    ))
+    db_session.commit()
+
+    body = client.get("/calculations", headers=auth_headers(test_user)).json()
+    assert body["items"][0]["result"] is None
+    CalculationPage.model_validate(body)  # the response_model advertised in OpenAPI accepts it
+
+    schema = client.get("/openapi.json").json()["components"]["schemas"]["CalculationRead"]
+    assert {"type": "null"} in schema["properties"]["result"]["anyOf"]
+
+def test_history_rows_match_orm_history(db_session, test_user, seed_calculations):
+    seed_calculations(test_user, 4)
+    db_session.add(Addition(a=1, b=2, user_id=test_user.id, created_at=datetime.utcnow() - timedelta(days=1)))
+    db_session.commit()
+
+    orm_page = Calculation.history(db_session, test_user.id, 3)
+    after = (orm_page[-1].created_at, orm_page[-1].id)
+    for limit, cursor in ((3, None), (3, after)):
+        calculations = Calculation.history(db_session, test_user.id, limit, cursor)
+        rows = Calculation.history_rows(db_session, test_user.id, limit, cursor)
+        expected = CalculationPage(items=[CalculationRead.model_validate(c, from_attributes=True) for c in calculations])
+        page = CalculationRecordPage([CalculationRecord(*row) for row in rows])
+        assert calculation_page_adapter.dump_json(page) == expected.model_dump_json().encode()
+
+def test_history_rows_are_not_orm_instances(db_session, test_user, seed_calculations):
+    seed_calculations(test_user, 2)
+    user_id = test_user.id
+    db_session.expunge_all()
+    rows = Calculation.history_rows(db_session, user_id, 10)
+    assert len(rows) == 2
+    assert rows[0]._fields == HISTORY_ROW_COLUMNS
+    assert len(db_session.identity_map) == 0
+
+@pytest.mark.parametrize("cursor", ["garbage", "WyIyMDI1LTAxLTAxIiwxXQ"])  # ["2025-01-01",1]
+def test_history_invalid_cursor(test_user, client, cursor):
+    response = client.get("/calculations", params={"cursor": cursor}, headers=auth_headers(test_user))
+    assert response.status_code == 400
+    assert response.json() == {"error": "Invalid cursor"}
+
+@pytest.mark.parametrize("limit", [0, 501])
+def test_history_limit_bounds(test_user, client, limit):
+    response = client.get("/calculations", params={"limit": limit}, headers=auth_headers(test_user))
+    assert response.status_code == 400
+
+def test_history_requires_auth(client):
+    assert client.get("/calculations").status_code == 401
+    response = client.get("/calculations", headers={"Authorization": "Bearer not-a-token"})
+    assert response.status_code == 401
+
+def test_history_uses_composite_index(db_session, test_user, seed_calculations):
+    seed_calculations(test_user, 3)
+    index_names = {index.name for index in Calculation.__table__.indexes}
+    assert "ix_calculations_user_id_created_at_id" in index_names
+
+    stmt = (
+        "EXPLAIN SELECT * FROM calculations WHERE user_id = :user_id "
+        "AND (created_at, id) < (:created_at, :id) ORDER BY created_at DESC, id DESC LIMIT 50"
+    )
+    db_session.execute(text("SET enable_seqscan = off"))  # the test table is tiny; ask for the index plan
+    plan = "\n".join(row[0] for row in db_session.execute(text(stmt), {
+        "user_id": test_user.id, "created_at": datetime.utcnow(), "id": test_user.id,
+    }))
+    db_session.rollback()
+    assert "ix_calculations_user_id_created_at_id" in plan
+    assert "Sort" not in plan  # rows come out of the index already ordered
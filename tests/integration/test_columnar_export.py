@@ -0,0 +1,124 @@
+# tests/integration/test_columnar_export.py
+
+# Arrow IPC / Parquet export: GET /calculations/export?format=arrow|parquet and app.columnar_export
+# (Parquet is read with ParquetFile rather than pq.read_table, whose thread pool can abort at exit)
+
+from uuid import uuid4
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from sqlalchemy import insert
+
+from app import columnar_export
+from app.columnar_export import COLUMNAR_SCHEMA, ColumnarWriter, export_columnar, write_columnar
+from app.models.calculation import Calculation
+from app.models.user import User
+from app.schemas.calculation import CalculationType
+from tests.conftest import auth_headers, create_fake_user, run_with_session
+
+def read(fmt, data) -> pa.Table:
+    if fmt == "arrow":
+        return pa.ipc.open_stream(data).read_all()
+    return pq.ParquetFile(pa.BufferReader(data)).read()
+
+@pytest.mark.parametrize("fmt, media_type", [
+    ("arrow", "application/vnd.apache.arrow.stream"),
+    ("parquet", "application/vnd.apache.parquet"),
+])
+def test_export_columnar_route(db_session, test_user, async_client, monkeypatch, fmt, media_type, seed_calculations):
+    monkeypatch.setattr(columnar_export, "COLUMNAR_BATCH_SIZE", 3)  # several record batches
+    ids = seed_calculations(test_user, 10)
+    # Written with plain SQL, so result was never stored
+    db_session.execute(insert(Calculation.__table__).values(
+        id=uuid4(), user_id=test_user.id, type=CalculationType.DIVISION, a=9, b=0, result=None,
+    ))
+    db_session.commit()
+
+    response = async_client.get("/calculations/export", params={"format": fmt}, headers=auth_headers(test_user))
+    assert response.status_code == 200
+    assert response.headers["content-type"] == media_type
+    assert response.headers["content-disposition"] == f'attachment; filename="calculations.{fmt}"'
+
+    table = read(fmt, response.content)
+    assert table.schema.equals(COLUMNAR_SCHEMA)
+    assert table.num_rows == 11
+    assert sorted(table.column("id").to_pylist()[:10]) == sorted(map(str, ids))
+    assert set(table.column("user_id").to_pylist()) == {str(test_user.id)}
+    rows = {row["a"]: row for row in table.to_pylist()}
+    assert rows[1.0]["type"] == "addition" and rows[1.0]["result"] == 3
+    assert rows[4.0]["type"] == "division" and rows[4.0]["result"] == 2
+    assert rows[9.0]["result"] is None  # division by zero computed in SQL
+    assert rows[1.0]["created_at"].tzinfo is not None
+    assert rows[1.0]["created_at"].utcoffset().total_seconds() == 0
+
+def test_record_batch_types(db_session, test_user, seed_calculations):
+    seed_calculations(test_user, 8)
+    rows = db_session.connection().execute(columnar_export.columnar_statement(test_user.id)).all()
+    batch = columnar_export.record_batch(rows)
+    assert batch.num_rows == 8
+    types = batch.column("type")
+    assert types.dictionary.to_pylist() == [calc_type.value for calc_type in CalculationType]
+    # bulk_create gives every row the same created_at, so rows come in id order: match by a
+    expected = {i + 1.0: i % 4 for i in range(8)}
+    assert dict(zip(batch.column("a").to_pylist(), types.indices.to_pylist())) == expected
+    for name in ("a", "b", "result"):
+        assert batch.schema.field(name).type == pa.float64()
+
+def test_export_columnar_streams_batches(db_session, test_user, monkeypatch, seed_calculations):
+    monkeypatch.setattr(columnar_export, "COLUMNAR_BATCH_SIZE", 4)
+    seed_calculations(test_user, 10)
+    assert columnar_export.columnar_statement(test_user.id).get_execution_options()["yield_per"] == 4
+
+    async def test(session):
+        return [chunk async for chunk in export_columnar(session, "arrow", test_user.id)]
+
+    chunks = run_with_session(test)
+    assert len(chunks) == 4  # one per cursor batch, then the end-of-stream marker
+    batches = list(pa.ipc.open_stream(b"".join(chunks)))
+    assert [batch.num_rows for batch in batches] == [4, 4, 2]
+
+@pytest.mark.parametrize("fmt", ["arrow", "parquet"])
+def test_empty_export_has_schema(fmt):
+    writer = ColumnarWriter(fmt)
+    table = read(fmt, writer.close())
+    assert table.num_rows == 0 and table.schema.equals(COLUMNAR_SCHEMA)
+
+def test_unknown_format():
+    with pytest.raises(ValueError, match="Unknown export format"):
+        ColumnarWriter("xml")
+
+def test_write_columnar_whole_table(db_session, test_user, tmp_path, seed_calculations):
+    other = create_fake_user()
+    other_user = User(password_hash=User.hash_password(other.pop("password")), **other)
+    db_session.add(other_user)
+    db_session.commit()
+    seed_calculations(test_user, 5)
+    seed_calculations(other_user, 3)
+
+    path = tmp_path / "all.parquet"
+    with open(path, "wb") as output:
+        assert write_columnar(db_session.connection(), "parquet", output) == 8
+    table = pq.ParquetFile(path).read()
+    assert table.num_rows == 8
+    assert set(table.column("user_id").to_pylist()) == {str(test_user.id), str(other_user.id)}
+
+def test_main(db_session, test_user, tmp_path, capsys, seed_calculations):
+    seed_calculations(test_user, 6)
+    path = tmp_path / "mine.arrow"
+    assert columnar_export.main([str(path), "--format", "arrow", "--user-id", str(test_user.id)]) == 0
+    assert "calculations: 6 rows" in capsys.readouterr().out
+    assert pa.ipc.open_stream(path.read_bytes()).read_all().num_rows == 6
+    assert columnar_export.main([str(tmp_path / "missing" / "out.parquet")]) == 1
+
+def test_parquet_row_groups_span_batches(db_session, test_user, monkeypatch, seed_calculations):
+    monkeypatch.setattr(columnar_export, "COLUMNAR_BATCH_SIZE", 2)
+    monkeypatch.setattr(columnar_export, "PARQUET_ROW_GROUP_SIZE", 4)
+    seed_calculations(test_user, 10)
+
+    async def test(session):
+        return [chunk async for chunk in export_columnar(session, "parquet", test_user.id)]
+
+    parquet_file = pq.ParquetFile(pa.BufferReader(b"".join(run_with_session(test))))
+    sizes = [parquet_file.metadata.row_group(i).num_rows for i in range(parquet_file.num_row_groups)]
+    assert sizes == [4, 4, 2]  # cursor batches of 2 buffered into row groups of 4
@@ -66,4 +66,65 @@ def test_get_db_yields_session():
     with pytest.raises(StopIteration):
         next(gen)
 
-    # We can't directly check if db.close() was called, but no exceptions means cleanup ran.
\ No newline at end of file
+    # We can't directly check if db.close() was called, but no exceptions means cleanup ran.
+def test_get_engine_pool_settings(monkeypatch):
+    """Test that get_engine sizes the pool and echo from settings."""
+    database = reload_database_module()
+    monkeypatch.setattr(database.settings, "DB_POOL_SIZE", 3)
+    monkeypatch.setattr(database.settings, "DB_MAX_OVERFLOW", 2)
+    monkeypatch.setattr(database.settings, "DB_POOL_TIMEOUT", 7)
+    monkeypatch.setattr(database.settings, "DB_POOL_RECYCLE", 60)
+    monkeypatch.setattr(database.settings, "DB_POOL_PRE_PING", True)
+    monkeypatch.setattr(database.settings, "DB_ECHO", False)
+
+    engine = database.get_engine()
+
+    assert engine.pool.size() == 3
+    assert engine.pool._max_overflow == 2
+    assert engine.pool._timeout == 7
+    assert engine.pool._recycle == 60
+    assert engine.pool._pre_ping is True
+    assert engine.echo is False
+
+def test_get_engine_full_echo(monkeypatch):
+    database = reload_database_module()
+    monkeypatch.setattr(database.settings, "DB_ECHO", True)
+    monkeypatch.setattr(database.settings, "DB_ECHO_SAMPLE_RATE", 1.0)
+
+    engine = database.get_engine()
+    assert engine.echo is True
+
+def test_get_engine_sampled_echo(monkeypatch):
+    """Test that a sample rate below 1 logs through the sampling listener instead of echo."""
+    database = reload_database_module()
+    monkeypatch.setattr(database.settings, "DB_ECHO", True)
+    monkeypatch.setattr(database.settings, "DB_ECHO_SAMPLE_RATE", 0.5)
+
+    with patch("app.database.enable_sampled_echo") as mock_enable:
+        engine = database.get_engine()
+
+    assert engine.echo is False
+    mock_enable.assert_called_once_with(engine, 0.5)
+
+def test_sampled_echo_logs_fraction(caplog):
+    """Test that the sampling listener logs statements when the sample hits."""
+    database = reload_database_module()
+    engine = database.get_engine()
+    database.enable_sampled_echo(engine, 0.5)
+
+    with caplog.at_level("INFO", logger="sqlalchemy.engine.sampled"):
+        with patch("app.database.random.random", side_effect=[0.1, 0.9]):
+            with engine.connect() as conn:
+                conn.exec_driver_sql("SELECT 1")
+                conn.exec_driver_sql("SELECT 2")
+
+    sampled = [r.getMessage() for r in caplog.records if r.name == "sqlalchemy.engine.sampled"]
+    assert len(sampled) == 1
+    assert "SELECT 1" in sampled[0]
+
+def test_get_sessionmaker_default_engine():
+    """Test that get_sessionmaker builds an engine from settings when none is given."""
+    database = reload_database_module()
+    SessionLocal = database.get_sessionmaker()
+    assert isinstance(SessionLocal, sessionmaker)
+    assert SessionLocal.kw["bind"].pool.size() == database.settings.DB_POOL_SIZE
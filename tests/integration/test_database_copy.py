@@ -0,0 +1,154 @@
+# tests/integration/test_database_copy.py
+
+import json
+
+import pytest
+from sqlalchemy import inspect, text
+
+from app import database_copy
+from app.database_copy import RestoreConstraintError, RowCountMismatch, dump, restore, seed
+from app.models.calculation import Calculation
+from app.models.user import User
+from tests.conftest import test_engine
+
+def snapshot(db_session):
+    db_session.expire_all()
+    users = sorted((u.id, u.email, u.password_hash, u.created_at) for u in db_session.query(User))
+    calculations = sorted((c.id, c.user_id, c.type, c.a, c.b, c.result, c.created_at) for c in db_session.query(Calculation))
+    return users, calculations
+
+def schema():
+    inspector = inspect(test_engine)
+    return {
+        table: (
+            inspector.get_pk_constraint(table),
+            inspector.get_unique_constraints(table),
+            inspector.get_foreign_keys(table),
+            inspector.get_indexes(table),
+        )
+        for table in ("users", "calculations")
+    }
+
+def test_seed(db_session):
+    assert seed(test_engine, 3, 20) == {"users": 3, "calculations": 20}
+    calculations = db_session.query(Calculation).all()
+    assert len(calculations) == 20
+    assert len({c.user_id for c in calculations}) == 3
+    assert all(c.result == c.get_result() for c in calculations)  # the SQL CASE matches get_result
+    assert {type(c).__name__ for c in calculations} == {"Addition", "Subtraction", "Multiplication", "Division"}
+    user = db_session.query(User).first()
+    assert User.authenticate(db_session, user.username, "anything") is None
+
+    # A second run adds new users instead of colliding with the first
+    assert seed(test_engine, 3, 0) == {"users": 3, "calculations": 0}
+    assert db_session.query(User).count() == 6
+
+def test_seed_needs_a_user():
+    with pytest.raises(ValueError, match="at least one user"):
+        seed(test_engine, 0, 10)
+
+@pytest.mark.parametrize("fmt", ["binary", "csv"])
+def test_dump_and_restore_round_trip(db_session, tmp_path, fmt):
+    seed(test_engine, 2, 50)
+    before = snapshot(db_session)
+    db_session.commit()
+    original_schema = schema()
+
+    assert dump(test_engine, str(tmp_path), fmt) == {"users": 2, "calculations": 50}
+    manifest = json.loads((tmp_path / "manifest.json").read_text())
+    assert manifest["format"] == fmt
+    assert manifest["tables"]["calculations"]["rows"] == 50
+    assert (tmp_path / f"calculations.{fmt}").exists()
+
+    assert restore(test_engine, str(tmp_path), truncate=True) == {"users": 2, "calculations": 50}
+    assert snapshot(db_session) == before
+    assert schema() == original_schema  # keys, foreign keys and indexes rebuilt as they were
+
+def test_restore_appends_without_truncate(db_session, tmp_path):
+    seed(test_engine, 1, 5)
+    dump(test_engine, str(tmp_path), "csv")
+    before = snapshot(db_session)
+    db_session.commit()
+    with test_engine.begin() as conn:
+        conn.execute(text("TRUNCATE users, calculations"))
+
+    assert restore(test_engine, str(tmp_path)) == {"users": 1, "calculations": 5}
+    assert snapshot(db_session) == before
+
+    # Loading the same rows again violates the primary keys, and nothing is added
+    with pytest.raises(Exception, match="duplicate key"):
+        restore(test_engine, str(tmp_path))
+    assert snapshot(db_session) == before
+
+def test_restore_row_count_mismatch_rolls_back(db_session, tmp_path):
+    seed(test_engine, 1, 5)
+    dump(test_engine, str(tmp_path))
+    before = snapshot(db_session)
+    db_session.commit()
+    original_schema = schema()
+
+    manifest_path = tmp_path / "manifest.json"
+    manifest = json.loads(manifest_path.read_text())
+    manifest["tables"]["calculations"]["rows"] = 6
+    manifest_path.write_text(json.dumps(manifest))
+
+    with pytest.raises(RowCountMismatch, match="calculations: loaded 5 rows, manifest has 6"):
+        restore(test_engine, str(tmp_path), truncate=True)
+    assert snapshot(db_session) == before
+    assert schema() == original_schema
+
+def test_dump_single_table(db_session, tmp_path):
+    seed(test_engine, 2, 3)
+    assert dump(test_engine, str(tmp_path), tables=["users"]) == {"users": 2}
+    assert not (tmp_path / "calculations.binary").exists()
+
+def test_restore_single_table_with_truncate(db_session, tmp_path):
+    seed(test_engine, 2, 0)
+    dump(test_engine, str(tmp_path), tables=["users"])
+    before = snapshot(db_session)
+    db_session.commit()
+    original_schema = schema()
+
+    # calculations' foreign key references users, yet users alone can be truncated and reloaded
+    assert restore(test_engine, str(tmp_path), truncate=True) == {"users": 2}
+    assert snapshot(db_session) == before
+    assert schema() == original_schema
+
+    # Calculations whose users would be truncated away fail the rebuilt foreign key
+    seed(test_engine, 1, 3)
+    with_calculations = snapshot(db_session)
+    db_session.commit()
+    with pytest.raises(RestoreConstraintError, match="foreign key"):
+        restore(test_engine, str(tmp_path), truncate=True)
+    assert snapshot(db_session) == with_calculations
+    assert schema() == original_schema
+
+    assert database_copy.main(["restore", str(tmp_path), "--truncate"]) == 1
+
+def test_invalid_arguments(tmp_path):
+    with pytest.raises(ValueError, match="Unknown COPY format"):
+        dump(test_engine, str(tmp_path), "xml")
+    with pytest.raises(ValueError, match="Unknown tables: orders"):
+        dump(test_engine, str(tmp_path), tables=["orders"])
+
+def test_cli(db_session, tmp_path, capsys):
+    assert database_copy.main(["seed", "--users", "2", "--calculations", "10"]) == 0
+    assert "calculations: 10 rows" in capsys.readouterr().out
+
+    assert database_copy.main(["dump", str(tmp_path), "--format", "csv"]) == 0
+    assert database_copy.main(["restore", str(tmp_path), "--truncate"]) == 0
+    assert "users: 2 rows" in capsys.readouterr().out
+    assert db_session.query(Calculation).count() == 10
+
+    assert database_copy.main(["restore", str(tmp_path / "missing")]) == 1
+    assert "Error:" in capsys.readouterr().err
+
+def test_seed_uuid7(db_session, monkeypatch):
+    from app.config import settings
+    monkeypatch.setattr(settings, "UUID_VERSION", 7)
+    seed(test_engine, 2, 10)
+    calculations = db_session.query(Calculation).all()
+    assert all(c.id.version == 7 and c.id.variant == "specified in RFC 4122" for c in calculations)
+    # The ids carry each row's backdated created_at, so they sort the same way
+    assert [c.id for c in sorted(calculations, key=lambda c: c.created_at)] == sorted(c.id for c in calculations)
+    assert all(u.id.version == 7 for u in db_session.query(User))
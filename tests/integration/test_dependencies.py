@@ -3,6 +3,7 @@
 import pytest
 from unittest.mock import MagicMock, patch, ANY
 from fastapi import HTTPException, status
+from app.auth.cache import invalidate_user, user_cache
 from app.auth.dependencies import get_current_user, get_current_active_user
 from app.schemas.user import UserResponse
 from app.models.user import User
@@ -34,6 +35,13 @@ inactive_user = User(
     updated_at=datetime.utcnow()
 )
 
+# Start every test with an empty user cache, so lookups reach the mocked database
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
 # Fixture for mocking the database session
 @pytest.fixture
 def mock_db():
@@ -121,3 +129,60 @@ def test_get_current_active_user_inactive(mock_db, mock_verify_token):
 
     assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
     assert exc_info.value.detail == "Inactive user"
+
+# Test that repeat lookups are served from the user cache without querying the database
+def test_get_current_user_cached(mock_db, mock_verify_token):
+    mock_verify_token.return_value = sample_user.id
+    mock_db.query.return_value.filter.return_value.first.return_value = sample_user
+
+    first = get_current_user(db=mock_db, token="validtoken")
+    second = get_current_user(db=mock_db, token="validtoken")
+
+    assert second == first
+    mock_db.query.assert_called_once_with(User)
+    assert user_cache.stats()["hits"] == 1
+
+# Test that invalidate_user forces the next lookup back to the database
+def test_get_current_user_after_invalidation(mock_db, mock_verify_token):
+    mock_verify_token.return_value = sample_user.id
+    mock_db.query.return_value.filter.return_value.first.return_value = sample_user
+
+    get_current_user(db=mock_db, token="validtoken")
+    invalidate_user(sample_user.id)
+    get_current_user(db=mock_db, token="validtoken")
+
+    assert mock_db.query.call_count == 2
+
+# Test that a TTL of 0 disables the cache
+def test_get_current_user_cache_disabled(mock_db, mock_verify_token, monkeypatch):
+    from app.config import settings
+    monkeypatch.setattr(settings, "USER_CACHE_TTL_SECONDS", 0)
+    mock_verify_token.return_value = sample_user.id
+    mock_db.query.return_value.filter.return_value.first.return_value = sample_user
+
+    get_current_user(db=mock_db, token="validtoken")
+    get_current_user(db=mock_db, token="validtoken")
+
+    assert mock_db.query.call_count == 2
+
+# Test that updating or deleting a user through the ORM drops its cached entry
+def test_user_cache_invalidated_on_update_and_delete(db_session, test_user):
+    token = User.create_access_token({"sub": str(test_user.id)})
+    assert get_current_user(db=db_session, token=token).is_active is True
+    assert user_cache.stats()["size"] == 1
+
+    # Deactivate the user: the next lookup must see is_active=False
+    test_user.is_active = False
+    db_session.commit()
+    assert user_cache.stats()["size"] == 0
+    current_user = get_current_user(db=db_session, token=token)
+    with pytest.raises(HTTPException) as exc_info:
+        get_current_active_user(current_user=current_user)
+    assert exc_info.value.detail == "Inactive user"
+
+    # Delete the user: the cached entry goes with it
+    db_session.delete(test_user)
+    db_session.commit()
+    with pytest.raises(HTTPException) as exc_info:
+        get_current_user(db=db_session, token=token)
+    assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
@@ -2,7 +2,11 @@
 
 import pytest  # Import the pytest framework for writing and running tests
 from fastapi.testclient import TestClient  # Import TestClient for simulating API requests
-from main import app  # Import the FastAPI app instance from your main application file
+import asyncio
+import importlib
+import json
+from app.operations.batch import NON_FINITE_ERROR
+from main import app, STREAM_CHUNK_SIZE  # Import the FastAPI app instance from your main application file
 
 # ---------------------------------------------
 # Pytest Fixture: client
@@ -153,3 +157,301 @@ def test_divide_by_zero_api(client):
     # Assert that the 'error' field contains the correct error message
     assert "Cannot divide by zero!" in response.json()['error'], \
         f"Expected error message 'Cannot divide by zero!', got '{response.json()['error']}'"
+
+# ---------------------------------------------
+# Test Function: test_batch_api
+# ---------------------------------------------
+
+def test_batch_api(client):
+    """
+    Test the Batch API Endpoint.
+
+    This test verifies that the `/batch` endpoint evaluates a list of mixed operations
+    and returns one result per item, in the same order as the request.
+    """
+    response = client.post('/batch', json=[
+        {'op': 'add', 'a': 14, 'b': 5},
+        {'op': 'subtract', 'a': 19, 'b': 10},
+        {'op': 'multiply', 'a': 100, 'b': 7},
+        {'op': 'divide', 'a': 24, 'b': 3},
+    ])
+
+    assert response.status_code == 200, f"Expected status code 200, got {response.status_code}"
+    results = response.json()['results']
+    assert [item['result'] for item in results] == [19, 9, 700, 8]
+    assert all(item['error'] is None for item in results)
+
+# ---------------------------------------------
+# Test Function: test_batch_divide_by_zero_api
+# ---------------------------------------------
+
+def test_batch_divide_by_zero_api(client):
+    """
+    Test that a division by zero only fails its own item in a batch.
+    """
+    response = client.post('/batch', json=[
+        {'op': 'divide', 'a': 10, 'b': 0},
+        {'op': 'add', 'a': 1, 'b': 2},
+    ])
+
+    assert response.status_code == 200, f"Expected status code 200, got {response.status_code}"
+    results = response.json()['results']
+    assert results[0] == {'result': None, 'error': 'Cannot divide by zero!'}
+    assert results[1] == {'result': 3, 'error': None}
+
+# ---------------------------------------------
+# Test Function: test_batch_invalid_operation_api
+# ---------------------------------------------
+
+def test_batch_invalid_operation_api(client):
+    """
+    Test that an unknown operation is rejected by validation with a 400 error.
+    """
+    response = client.post('/batch', json=[{'op': 'modulo', 'a': 10, 'b': 3}])
+
+    assert response.status_code == 400, f"Expected status code 400, got {response.status_code}"
+    assert 'op' in response.json()['error']
+
+# ---------------------------------------------
+# Test Function: test_batch_size_limits_api
+# ---------------------------------------------
+
+def test_batch_size_limits_api(client, monkeypatch):
+    """
+    Test that /batch refuses oversized JSON and MessagePack bodies with a 413 before
+    decoding them, and more than BATCH_MAX_ITEMS operations with a 400.
+    """
+    import main
+    import msgpack
+
+    operations = [{'op': 'add', 'a': 1, 'b': 2}] * 3
+    monkeypatch.setattr(main, "BATCH_MAX_BYTES", 32)
+    response = client.post('/batch', json=operations)
+    assert response.status_code == 413
+    assert response.json() == {'error': 'Request body exceeds 32 bytes'}
+    response = client.post('/batch', content=msgpack.packb(operations), headers={'Content-Type': 'application/msgpack'})
+    assert response.status_code == 413
+
+    monkeypatch.setattr(main, "BATCH_MAX_BYTES", 1024)
+    monkeypatch.setattr(main, "BATCH_MAX_ITEMS", 2)
+    response = client.post('/batch', json=operations)
+    assert response.status_code == 400
+    assert response.json() == {'error': 'At most 2 operations per batch'}
+    assert client.post('/batch', json=operations[:2]).status_code == 200
+
+# ---------------------------------------------
+# Test Function: test_calculate_stream_api
+# ---------------------------------------------
+
+def test_calculate_stream_api(client):
+    """
+    Test the NDJSON streaming endpoint.
+
+    This test verifies that `/calculate/stream` returns one NDJSON line per input line,
+    in order, using the OperationResponse shape for results and the ErrorResponse shape
+    for failures (division by zero and invalid lines).
+    """
+    body = "\n".join([
+        json.dumps({'op': 'add', 'a': 14, 'b': 5}),
+        json.dumps({'op': 'divide', 'a': 10, 'b': 0}),
+        json.dumps({'op': 'multiply', 'a': 'x', 'b': 7}),
+        json.dumps({'op': 'divide', 'a': 24, 'b': 3}),
+    ]) + "\n"
+    response = client.post('/calculate/stream', content=body)
+
+    assert response.status_code == 200, f"Expected status code 200, got {response.status_code}"
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0] == {'result': 19}
+    assert lines[1] == {'error': 'Cannot divide by zero!'}
+    assert 'a:' in lines[2]['error']
+    assert lines[3] == {'result': 8}
+
+# ---------------------------------------------
+# Test Function: test_calculate_stream_chunked_body
+# ---------------------------------------------
+
+def test_calculate_stream_chunked_body(client):
+    """
+    Test that lines split across request body chunks and spanning several
+    evaluation chunks are all answered in order.
+    """
+    count = STREAM_CHUNK_SIZE * 2 + 7
+    body = "".join(json.dumps({'op': 'add', 'a': i, 'b': 1}) + "\n" for i in range(count)).encode()
+
+    def body_chunks(size=333):
+        # Deliberately cut the body mid-line
+        for start in range(0, len(body), size):
+            yield body[start:start + size]
+
+    response = client.post('/calculate/stream', content=body_chunks())
+
+    assert response.status_code == 200
+    results = [json.loads(line)['result'] for line in response.text.splitlines()]
+    assert results == [i + 1 for i in range(count)]
+
+# ---------------------------------------------
+# Test Function: test_calculate_stream_answers_each_chunk
+# ---------------------------------------------
+
+def test_calculate_stream_answers_each_chunk():
+    """
+    Test that each line is answered before the client sends the next one, as an
+    interactive client on a duplex connection needs.
+    """
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": "/calculate/stream", "raw_path": b"/calculate/stream",
+        "query_string": b"", "root_path": "", "headers": [], "client": ("127.0.0.1", 1234),
+        "server": ("127.0.0.1", 8000),
+    }
+
+    async def run():
+        answered = asyncio.Queue()
+        requests = [json.dumps({'op': 'multiply', 'a': i, 'b': 2}).encode() + b"\n" for i in range(3)]
+        replies = []
+
+        async def receive():
+            if len(requests) < 3:
+                # Only send the next line once the previous one has been answered
+                replies.append(await asyncio.wait_for(answered.get(), timeout=5))
+            body = requests.pop(0)
+            return {"type": "http.request", "body": body, "more_body": bool(requests)}
+
+        async def send(message):
+            if message["type"] == "http.response.body" and message.get("body"):
+                await answered.put(message["body"])
+
+        await app(scope, receive, send)
+        replies.append(answered.get_nowait())  # the answer to the last line
+        return replies
+
+    replies = asyncio.run(run())
+    assert [json.loads(reply) for reply in replies] == [{'result': 0}, {'result': 2}, {'result': 4}]
+
+# ---------------------------------------------
+# Test Function: test_calculate_stream_overflow
+# ---------------------------------------------
+
+def test_calculate_stream_overflow(client):
+    """
+    Test that a result that overflows to infinity is reported as an error, keeping
+    every line valid JSON, in the stream and in /batch.
+    """
+    body = json.dumps({'op': 'multiply', 'a': 1e308, 'b': 10}) + "\n" + json.dumps({'op': 'add', 'a': 1, 'b': 1}) + "\n"
+    lines = client.post('/calculate/stream', content=body).text.splitlines()
+    assert "Infinity" not in lines[0]
+    assert [json.loads(line) for line in lines] == [{'error': NON_FINITE_ERROR}, {'result': 2}]
+
+    response = client.post('/batch', json=[{'op': 'multiply', 'a': -1e308, 'b': 10}])
+    assert response.status_code == 200
+    assert response.json() == {'results': [{'result': None, 'error': NON_FINITE_ERROR}]}
+
+# ---------------------------------------------
+# Test Function: test_websocket_calculate
+# ---------------------------------------------
+
+def test_websocket_calculate(client):
+    """
+    Test the WebSocket calculator channel.
+
+    This test verifies that several operations sent over one socket each get a reply
+    carrying the same correlation id, including an error reply for division by zero.
+    """
+    with client.websocket_connect('/ws/calculate') as websocket:
+        websocket.send_json({'id': 1, 'op': 'add', 'a': 14, 'b': 5})
+        websocket.send_json({'id': 'two', 'op': 'divide', 'a': 10, 'b': 0})
+        websocket.send_json({'id': 3, 'op': 'multiply', 'a': 100, 'b': 7})
+
+        assert websocket.receive_json() == {'id': 1, 'result': 19}
+        assert websocket.receive_json() == {'id': 'two', 'error': 'Cannot divide by zero!'}
+        assert websocket.receive_json() == {'id': 3, 'result': 700}
+
+# ---------------------------------------------
+# Test Function: test_websocket_invalid_message
+# ---------------------------------------------
+
+def test_websocket_invalid_message(client):
+    """
+    Test that invalid messages get an error reply and keep the socket open.
+    """
+    with client.websocket_connect('/ws/calculate') as websocket:
+        websocket.send_json({'id': 7, 'op': 'modulo', 'a': 1, 'b': 2})
+        reply = websocket.receive_json()
+        assert reply['id'] == 7
+        assert 'op' in reply['error']
+
+        websocket.send_text('not json')
+        assert websocket.receive_json()['id'] is None
+
+        websocket.send_json({'id': 8, 'op': 'subtract', 'a': 19, 'b': 10})
+        assert websocket.receive_json() == {'id': 8, 'result': 9}
+
+# ---------------------------------------------
+# Test Function: test_websocket_overflow
+# ---------------------------------------------
+
+def test_websocket_overflow(client):
+    """
+    Test that an overflowing result gets an error reply that is valid JSON, not Infinity.
+    """
+    with client.websocket_connect('/ws/calculate') as websocket:
+        websocket.send_json({'id': 1, 'op': 'multiply', 'a': 1e308, 'b': 10})
+        reply = websocket.receive_text()
+        assert json.loads(reply, parse_constant=pytest.fail) == {'id': 1, 'error': NON_FINITE_ERROR}
+
+# ---------------------------------------------
+# Fast JSON response mode
+# ---------------------------------------------
+
+@pytest.fixture
+def fast_client(monkeypatch):
+    """
+    TestClient for an app built with settings.FAST_JSON_RESPONSES enabled.
+
+    The routes are registered when main is imported, so main is reloaded with the
+    setting patched, and reloaded again afterwards to restore the default app.
+    """
+    import main
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", True)
+    fast_main = importlib.reload(main)
+    try:
+        with TestClient(fast_main.app) as client:
+            yield client
+    finally:
+        monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", False)
+        importlib.reload(main)
+
+@pytest.mark.parametrize(
+    "path, payload, expected",
+    [
+        ('/add', {'a': 14, 'b': 5}, 19),
+        ('/subtract', {'a': 19, 'b': 10}, 9),
+        ('/multiply', {'a': 100, 'b': 7}, 700),
+        ('/divide', {'a': 24, 'b': 3}, 8),
+    ],
+    ids=["add", "subtract", "multiply", "divide"]
+)
+def test_fast_json_routes(fast_client, path, payload, expected):
+    """The fast routes return the same OperationResponse body as the classic routes."""
+    response = fast_client.post(path, json=payload)
+
+    assert response.status_code == 200, f"Expected status code 200, got {response.status_code}"
+    assert response.json() == {'result': expected}
+
+def test_fast_json_divide_by_zero(fast_client):
+    """Errors go through http_exception_handler, keeping the {'error': ...} contract."""
+    response = fast_client.post('/divide', json={'a': 10, 'b': 0})
+
+    assert response.status_code == 400
+    assert response.json() == {'error': 'Cannot divide by zero!'}
+
+def test_fast_json_validation_error(fast_client, client):
+    """Invalid bodies get the same 400 response from the fast and classic routes."""
+    fast_response = fast_client.post('/add', json={'a': 'abc', 'b': 5})
+    classic_response = client.post('/add', json={'a': 'abc', 'b': 5})
+
+    assert fast_response.status_code == classic_response.status_code == 400
+    assert fast_response.json() == classic_response.json()
@@ -0,0 +1,94 @@
+# tests/integration/test_msgpack_negotiation.py
+
+# MessagePack content negotiation on POST /batch and GET /calculations
+
+import uuid
+from datetime import timezone
+
+import msgpack
+import pytest
+
+from app.schemas.calculation import CalculationType
+from tests.conftest import auth_headers
+
+MSGPACK = "application/msgpack"
+
+BATCH = [
+    {"op": "add", "a": 1, "b": 2},
+    {"op": "divide", "a": 1, "b": 0},
+    {"op": "multiply", "a": 1.5, "b": 4},
+]
+EXPECTED_RESULTS = [
+    {"result": 3.0, "error": None},
+    {"result": None, "error": "Cannot divide by zero!"},
+    {"result": 6.0, "error": None},
+]
+
+def test_batch_json_is_the_default(client):
+    response = client.post("/batch", json=BATCH)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["vary"] == "Accept"
+    assert response.json() == {"results": EXPECTED_RESULTS}
+
+@pytest.mark.parametrize("content_type", [MSGPACK, "application/x-msgpack"])
+def test_batch_msgpack_request_and_response(client, content_type):
+    response = client.post(
+        "/batch",
+        content=msgpack.packb(BATCH),
+        headers={"Content-Type": content_type, "Accept": MSGPACK},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == MSGPACK
+    assert msgpack.unpackb(response.content) == {"results": EXPECTED_RESULTS}
+
+def test_batch_msgpack_request_json_response(client):
+    response = client.post("/batch", content=msgpack.packb(BATCH), headers={"Content-Type": MSGPACK})
+    assert response.status_code == 200
+    assert response.json() == {"results": EXPECTED_RESULTS}
+
+def test_batch_msgpack_invalid_item(client):
+    body = msgpack.packb([{"op": "add", "a": 1, "b": 2}, {"op": "modulo", "a": 1, "b": 2}])
+    response = client.post("/batch", content=body, headers={"Content-Type": MSGPACK})
+    assert response.status_code == 400
+    assert "op" in response.json()["error"]
+
+def test_batch_msgpack_undecodable_body(client):
+    response = client.post("/batch", content=b"\xc1", headers={"Content-Type": MSGPACK})
+    assert response.status_code == 400
+    assert "Invalid MessagePack body" in response.json()["error"]
+
+def test_history_msgpack_matches_json(test_user, client, seed_calculations):
+    seed_calculations(test_user, 5, CalculationType.DIVISION)
+
+    json_page = client.get("/calculations", params={"limit": 3}, headers=auth_headers(test_user)).json()
+    response = client.get("/calculations", params={"limit": 3}, headers=auth_headers(test_user, Accept=MSGPACK))
+    assert response.status_code == 200
+    assert response.headers["content-type"] == MSGPACK
+    assert response.headers["vary"] == "Accept"
+
+    page = msgpack.unpackb(response.content, timestamp=3)
+    assert page["next_cursor"] == json_page["next_cursor"]
+    assert len(page["items"]) == 3
+    for item, json_item in zip(page["items"], json_page["items"]):
+        assert uuid.UUID(bytes=item["id"]) == uuid.UUID(json_item["id"])
+        assert uuid.UUID(bytes=item["user_id"]) == test_user.id
+        assert item["type"] == json_item["type"] == "division"
+        assert (item["a"], item["b"], item["result"]) == (json_item["a"], json_item["b"], json_item["result"])
+        assert item["created_at"].tzinfo is timezone.utc
+        assert item["created_at"].isoformat().startswith(json_item["created_at"])
+
+    # The cursor works the same whichever format the previous page came in
+    response = client.get(
+        "/calculations",
+        params={"limit": 3, "cursor": page["next_cursor"]},
+        headers=auth_headers(test_user, Accept=MSGPACK),
+    )
+    last_page = msgpack.unpackb(response.content, timestamp=3)
+    assert len(last_page["items"]) == 2 and last_page["next_cursor"] is None
+
+def test_openapi_documents_msgpack(client):
+    paths = client.get("/openapi.json").json()["paths"]
+    assert set(paths["/batch"]["post"]["requestBody"]["content"]) == {"application/json", MSGPACK}
+    assert MSGPACK in paths["/batch"]["post"]["responses"]["200"]["content"]
+    assert MSGPACK in paths["/calculations"]["get"]["responses"]["200"]["content"]
@@ -0,0 +1,91 @@
+# tests/integration/test_operation_registry.py
+
+import asyncio
+import math
+import subprocess
+import sys
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.models.calculation import MODELS_BY_TYPE, Calculation
+from app.operations.registry import OPERATION_NAMES, OPERATIONS, OPERATIONS_BY_TYPE
+from app.schemas.calculation import CalculationType
+from main import OperationRequest, app, operation_route
+
+A = [7.5, -3.0, 0.0, 1e6]
+B = [2.0, 4.0, 5.0, -0.5]
+
+def test_every_calculation_type_is_registered_once():
+    assert set(OPERATIONS_BY_TYPE) == set(CalculationType)
+    assert OPERATION_NAMES == ("add", "subtract", "multiply", "divide")
+    assert all(OPERATIONS[name].name == name for name in OPERATION_NAMES)
+    assert set(MODELS_BY_TYPE) == set(CalculationType)
+
+def test_registry_does_not_import_the_models():
+    code = "import sys, app.operations.registry; assert 'app.models.calculation' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+def test_model_for_unknown_type():
+    with pytest.raises(ValueError, match="Unknown calculation type"):
+        Calculation.model_for("modulo")
+
+@pytest.mark.parametrize("name", OPERATION_NAMES)
+def test_implementations_agree(name, db_session):
+    """The scalar function, kernel, ORM subclass and SQL expression give the same results."""
+    operation = OPERATIONS[name]
+    expected = [operation.scalar(a, b) for a, b in zip(A, B)]
+
+    output = operation.kernel(A, B)
+    results = output[0] if isinstance(output, tuple) else output
+    assert results.tolist() == pytest.approx(expected)
+
+    calculations = [MODELS_BY_TYPE[operation.type](a=a, b=b) for a, b in zip(A, B)]
+    assert all(c.type == operation.type for c in calculations)
+    assert [c.get_result() for c in calculations] == pytest.approx(expected)
+
+    sql = [db_session.scalar(select(operation.sql(a, b))) for a, b in zip(A, B)]
+    assert sql == pytest.approx(expected)
+
+def test_divide_reports_zero_divisor_everywhere(db_session):
+    operation = OPERATIONS["divide"]
+    with pytest.raises(ValueError):
+        operation.scalar(1.0, 0.0)
+    quotients, errors = operation.kernel([1.0], [0.0])
+    assert math.isnan(quotients[0]) and errors.tolist() == [True]
+    assert db_session.scalar(select(operation.sql(1.0, 0.0))) is None
+
+def test_computed_result_has_a_branch_per_operation():
+    sql = str(Calculation.computed_result.expression.compile())
+    assert sql.count("WHEN") == len(OPERATIONS)
+
+def test_routes_generated_from_registry():
+    paths = {route.path for route in app.routes}
+    assert {f"/{name}" for name in OPERATION_NAMES} <= paths
+    with TestClient(app) as client:
+        for name in OPERATION_NAMES:
+            response = client.post(f"/{name}", json={"a": 6, "b": 3})
+            assert response.json() == {"result": OPERATIONS[name].scalar(6, 3)}
+        ops = [{"op": name, "a": 6, "b": 3} for name in OPERATION_NAMES]
+        results = client.post("/batch", json=ops).json()["results"]
+        assert [r["result"] for r in results] == [OPERATIONS[name].scalar(6, 3) for name in OPERATION_NAMES]
+
+def test_unexpected_error_is_a_500():
+    def broken(a, b):
+        raise RuntimeError("boom")
+
+    route = operation_route(OPERATIONS["add"]._replace(scalar=broken))
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(route(OperationRequest(a=1, b=2)))
+    assert exc_info.value.status_code == 500
+    assert exc_info.value.detail == "Internal Server Error"
+
+def test_batch_errors_come_from_the_registry(monkeypatch):
+    monkeypatch.setitem(OPERATIONS, "divide", OPERATIONS["divide"]._replace(error="No zero divisors, please"))
+    with TestClient(app) as client:
+        results = client.post("/batch", json=[{"op": "divide", "a": 1, "b": 0}]).json()["results"]
+        assert results == [{"result": None, "error": "No zero divisors, please"}]
+        lines = client.post("/calculate/stream", content=b'{"op": "divide", "a": 1, "b": 0}\n').text
+        assert lines == '{"error": "No zero divisors, please"}\n'
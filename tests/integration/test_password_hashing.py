@@ -0,0 +1,117 @@
+# tests/integration/test_password_hashing.py
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.auth.hashing import PasswordHashPool, password_hash_pool
+from app.models.user import User
+
+def test_hash_password_async_round_trip(fake_user_data):
+    fake_user_data.pop("password")
+    user = User(**fake_user_data)
+
+    async def run():
+        user.password_hash = await User.hash_password_async("TestPass123")
+        return (
+            await user.verify_password_async("TestPass123"),
+            await user.verify_password_async("WrongPass123"),
+        )
+
+    assert asyncio.run(run()) == (True, False)
+    # The async hash is a normal bcrypt hash the sync path can verify
+    assert user.verify_password("TestPass123") is True
+
+def test_pool_caps_concurrency_and_reports_queueing():
+    pool = PasswordHashPool(max_workers=2)
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+
+    def slow_job(value):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+        return value * 2
+
+    async def run():
+        tasks = [asyncio.ensure_future(pool.run(slow_job, i)) for i in range(6)]
+        await asyncio.sleep(0.02)
+        in_flight = pool.stats()
+        return await asyncio.gather(*tasks), in_flight
+
+    try:
+        results, in_flight = asyncio.run(run())
+    finally:
+        pool.shutdown()
+
+    assert results == [0, 2, 4, 6, 8, 10]
+    assert peak == 2
+    assert in_flight["running"] == 2
+    assert in_flight["queued"] == 4
+
+    stats = pool.stats()
+    assert stats["completed"] == 6
+    assert stats["queued"] == 0 and stats["running"] == 0
+    assert stats["max_wait_seconds"] >= 0.05
+    assert stats["avg_wait_seconds"] > 0
+
+def test_hashing_does_not_block_event_loop():
+    """The loop keeps running other coroutines while a bcrypt hash is in progress."""
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        task = asyncio.ensure_future(ticker())
+        await User.hash_password_async("TestPass123")
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(run()) > 0
+
+def test_pool_stats_before_use_and_restart_after_shutdown():
+    pool = PasswordHashPool(max_workers=1)
+    assert pool.stats()["completed"] == 0
+    assert pool.stats()["avg_wait_seconds"] == 0.0
+    pool.shutdown()  # no executor yet
+
+    assert asyncio.run(pool.run(len, "abc")) == 3
+    pool.shutdown()
+    assert asyncio.run(pool.run(len, "abcd")) == 4
+    pool.shutdown()
+
+def test_default_pool_uses_settings():
+    from app.config import settings
+    assert password_hash_pool.max_workers == settings.PASSWORD_HASH_MAX_CONCURRENCY
+
+def test_cancelled_queued_job_leaves_the_queue():
+    pool = PasswordHashPool(max_workers=1)
+    release = threading.Event()
+
+    async def run():
+        blocker = asyncio.create_task(pool.run(release.wait))
+        waiting = asyncio.create_task(pool.run(len, "abc"))
+        await asyncio.sleep(0.05)
+        assert pool.stats()["queued"] == 1 and pool.stats()["running"] == 1
+
+        waiting.cancel()  # e.g. the client disconnected while its hash was queued
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        release.set()
+        await blocker
+
+    asyncio.run(run())
+    stats = pool.stats()
+    assert stats["queued"] == 0 and stats["running"] == 0 and stats["completed"] == 1
+    pool.shutdown()
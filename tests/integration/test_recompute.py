@@ -0,0 +1,113 @@
+# tests/integration/test_recompute.py
+
+import json
+
+import pytest
+from sqlalchemy import insert, select
+
+from app import recompute
+from app.database_copy import seed
+from app.models.calculation import Calculation
+from app.recompute import plan_ranges, recompute_results
+from app.schemas.calculation import CalculationType
+from tests.conftest import TestingSessionLocal, test_engine
+
+def break_results(count):
+    """Seed calculations, then null out some results and corrupt others behind the ORM's back."""
+    seed(test_engine, 2, count)
+    table = Calculation.__table__
+    with test_engine.begin() as conn:
+        ids = conn.execute(select(table.c.id).order_by(table.c.id)).scalars().all()
+        conn.execute(table.update().where(table.c.id.in_(ids[::3])).values(result=None))
+        conn.execute(table.update().where(table.c.id.in_(ids[1::3])).values(result=-1.0))
+    return len(ids[::3]) + len(ids[1::3])
+
+def assert_results_correct(db_session):
+    db_session.expire_all()
+    calculations = db_session.query(Calculation).all()
+    assert calculations
+    assert all(c.result == c.get_result() for c in calculations)
+
+def test_plan_ranges_cover_the_table(db_session):
+    seed(test_engine, 1, 25)
+    ranges = plan_ranges(db_session, 10)
+    assert len(ranges) == 3  # boundaries after rows 10 and 20
+    assert ranges[0][0] is None and ranges[-1][1] is None
+    assert ranges[0][1] == ranges[1][0] and ranges[1][1] == ranges[2][0]
+    assert plan_ranges(db_session, 100) == [(None, None)]
+
+@pytest.mark.parametrize("strategy", ["sql", "python"])
+def test_recompute_fixes_missing_and_stale_results(db_session, tmp_path, strategy):
+    broken = break_results(60)
+    checkpoint = tmp_path / "recompute.json"
+
+    updated = recompute_results(TestingSessionLocal, chunk_size=7, workers=3,
+                                checkpoint_path=str(checkpoint), strategy=strategy)
+    assert updated == broken
+    assert_results_correct(db_session)
+    assert not checkpoint.exists()  # removed once every range is done
+
+    # Nothing left to change, so nothing is rewritten
+    assert recompute_results(TestingSessionLocal, chunk_size=7, workers=3, strategy=strategy) == 0
+
+def test_recompute_leaves_division_by_zero_null(db_session, test_user):
+    with test_engine.begin() as conn:
+        conn.execute(insert(Calculation.__table__).values(
+            user_id=test_user.id, type="DIVISION", a=1.0, b=0.0, result=5.0))
+    for strategy in ("sql", "python"):
+        assert recompute_results(TestingSessionLocal, strategy=strategy) <= 1
+        assert db_session.scalar(select(Calculation.result)) is None
+
+def test_recompute_range_with_overflowing_result(db_session, test_user):
+    overflow = Calculation.create(db_session, test_user.id, CalculationType.MULTIPLICATION, 1e308, 10)  # stored as inf
+    db_session.commit()
+    broken = break_results(20)
+    for strategy in ("sql", "python"):
+        updated = recompute_results(TestingSessionLocal, chunk_size=100, strategy=strategy)
+        assert updated == (broken if strategy == "sql" else 0)
+        db_session.expire_all()
+        assert db_session.get(Calculation, overflow.id).result == float("inf")
+        assert_results_correct(db_session)
+
+def test_recompute_resumes_from_checkpoint(db_session, tmp_path, monkeypatch):
+    broken = break_results(40)
+    checkpoint = tmp_path / "recompute.json"
+    real_range = recompute.recompute_range_sql
+    calls = []
+
+    def crash_on_third(db, key_range):
+        calls.append(key_range)
+        if len(calls) == 3:
+            raise RuntimeError("worker crashed")
+        return real_range(db, key_range)
+
+    monkeypatch.setattr(recompute, "recompute_range_sql", crash_on_third)
+    with pytest.raises(RuntimeError, match="worker crashed"):
+        recompute_results(TestingSessionLocal, chunk_size=5, workers=1, checkpoint_path=str(checkpoint))
+
+    saved = json.loads(checkpoint.read_text())
+    assert len(saved["ranges"]) == 9
+    # The ranges before the crash were committed; the one that failed was not. A range the
+    # worker picked up before the failure was noticed may have finished too
+    assert {0, 1} <= set(saved["done"]) and 2 not in saved["done"]
+
+    # The rerun only visits the ranges that were not finished
+    calls.clear()
+    monkeypatch.setattr(recompute, "recompute_range_sql", lambda db, key_range: calls.append(key_range) or real_range(db, key_range))
+    first_run_fixed = broken - recompute_results(TestingSessionLocal, workers=2, checkpoint_path=str(checkpoint))
+    assert len(calls) == 9 - len(saved["done"])
+    assert set(map(tuple, calls)).isdisjoint(tuple(saved["ranges"][i]) for i in saved["done"])
+    assert first_run_fixed > 0
+    assert_results_correct(db_session)
+    assert not checkpoint.exists()
+
+def test_recompute_rejects_unknown_strategy():
+    with pytest.raises(ValueError, match="Unknown strategy"):
+        recompute_results(TestingSessionLocal, strategy="spark")
+
+def test_main(db_session, monkeypatch, capsys):
+    broken = break_results(10)
+    monkeypatch.setattr("app.database.SessionLocal", TestingSessionLocal)
+    assert recompute.main(["--chunk-size", "4", "--workers", "2", "--strategy", "python"]) == 0
+    assert capsys.readouterr().out.strip() == f"Updated {broken} calculations"
+    assert_results_correct(db_session)
@@ -0,0 +1,41 @@
+# tests/integration/test_schema_sync.py
+
+# app.database_init.sync_schema: existing tables get the models' server defaults and indexes
+
+from sqlalchemy import inspect, text
+
+from app.database_init import sync_schema
+from app.models.calculation import Calculation
+from app.schemas.calculation import CalculationCreate, CalculationType
+from tests.conftest import test_engine
+
+def _defaults(table):
+    return {column["name"]: column["default"] for column in inspect(test_engine).get_columns(table)}
+
+def test_sync_schema_upgrades_existing_tables(db_session, test_user):
+    user_id = test_user.id
+    db_session.close()  # its open transaction would block the ALTER TABLEs
+
+    # A table created before timestamps moved to the database: no defaults, no newer indexes
+    with test_engine.begin() as conn:
+        for table in ("users", "calculations"):
+            for column in ("created_at", "updated_at"):
+                conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} DROP DEFAULT"))
+        conn.execute(text("DROP INDEX ix_calculations_user_id_created_at_id"))
+        conn.execute(text("DROP INDEX ix_calculations_result"))
+    assert _defaults("calculations")["created_at"] is None
+
+    sync_schema(test_engine)
+    sync_schema(test_engine)  # idempotent
+
+    for table in ("users", "calculations"):
+        assert "now()" in _defaults(table)["created_at"]
+        assert "now()" in _defaults(table)["updated_at"]
+    indexes = {index["name"] for index in inspect(test_engine).get_indexes("calculations")}
+    assert {"ix_calculations_user_id_created_at_id", "ix_calculations_result"} <= indexes
+
+    # Inserts that leave the timestamps to the database work again
+    items = [CalculationCreate(type=CalculationType.ADDITION, a=1, b=2)]
+    Calculation.bulk_create(db_session, user_id, items)
+    db_session.commit()
+    assert db_session.query(Calculation).one().created_at is not None
@@ -0,0 +1,74 @@
+# tests/integration/test_server_timestamps.py
+
+# created_at/updated_at are set by the database and read back through RETURNING
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app.models.calculation import Calculation
+from app.models.user import User
+from app.schemas.calculation import CalculationCreate, CalculationType
+from tests.conftest import create_fake_user, test_engine
+
+@contextmanager
+def captured_statements():
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(test_engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(test_engine, "before_cursor_execute", capture)
+
+def new_user(db_session):
+    user_data = create_fake_user()
+    user_data["password"] = "TestPass123"
+    return User.register(db_session, user_data)
+
+def test_insert_returns_server_timestamps(db_session):
+    user = new_user(db_session)
+    with captured_statements() as statements:
+        calculation = Calculation.create(db_session, user.id, CalculationType.ADDITION, 1, 2)
+        created_at, updated_at = calculation.created_at, calculation.updated_at  # no lazy load
+
+    assert len(statements) == 1
+    assert statements[0].startswith("INSERT INTO calculations")
+    assert "RETURNING" in statements[0] and "created_at" not in statements[0].split("VALUES")[0]
+    assert created_at == updated_at
+    assert abs(created_at - datetime.utcnow()) < timedelta(minutes=1)  # UTC, like utcnow
+    assert user.created_at is not None
+
+def test_update_returns_new_updated_at(db_session):
+    user = new_user(db_session)
+    db_session.commit()
+    first_updated_at = user.updated_at
+
+    user.first_name = "Renamed"
+    with captured_statements() as statements:
+        db_session.flush()
+        updated_at = user.updated_at
+
+    assert len(statements) == 1
+    assert statements[0].startswith("UPDATE users") and "RETURNING users.updated_at" in statements[0]
+    assert updated_at > first_updated_at  # now() of the new transaction
+    assert user.created_at < updated_at
+
+def test_rows_from_separate_transactions_are_time_ordered(db_session):
+    user = new_user(db_session)
+    db_session.commit()
+    created = []
+    for _ in range(3):
+        created.append(Calculation.create(db_session, user.id, CalculationType.ADDITION, 1, 2).created_at)
+        db_session.commit()
+    assert created == sorted(created) and len(set(created)) == 3
+
+def test_bulk_create_uses_server_timestamps(db_session):
+    user = new_user(db_session)
+    ids = Calculation.bulk_create(db_session, user.id, [CalculationCreate(type=CalculationType.ADDITION, a=1, b=2)] * 2)
+    rows = db_session.query(Calculation).filter(Calculation.id.in_(ids)).all()
+    assert all(abs(row.created_at - datetime.utcnow()) < timedelta(minutes=1) for row in rows)
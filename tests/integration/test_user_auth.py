@@ -1,10 +1,17 @@
 # tests/integration/test_user_auth.py
 
 import pytest
-from uuid import UUID
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest.mock import patch
+from uuid import UUID, uuid4
 import pydantic_core
 from sqlalchemy.exc import IntegrityError
+from app.auth.cache import ExpiringLRUCache, token_cache
 from app.models.user import User
+from tests.conftest import create_fake_user, managed_db_session
 
 # Note: User.register() uses UserCreate for input validation.
     # meaning we dont need to change password to password_hash
@@ -134,6 +141,102 @@ def test_missing_password_registration(db_session):
         User.register(db_session, test_data)
 
 
+def test_register_atomic(db_session, fake_user_data):
+    """Test single-statement registration"""
+    fake_user_data['password'] = "TestPass123"
+
+    user = User.register_atomic(db_session, fake_user_data)
+    db_session.commit()
+
+    assert user.id is not None
+    assert user.email == fake_user_data['email']
+    assert user.is_active is True
+    assert user.is_verified is False
+    assert user.verify_password("TestPass123") is True
+
+@pytest.mark.parametrize("field", ["email", "username"])
+def test_register_atomic_duplicate(db_session, field):
+    """Test that a duplicate email or username maps to the usual error"""
+    first = create_fake_user()
+    first['password'] = "TestPass123"
+    User.register_atomic(db_session, first)
+    db_session.commit()
+
+    second = create_fake_user()
+    second['password'] = "TestPass123"
+    second[field] = first[field]
+    with pytest.raises(ValueError, match="Username or email already exists"):
+        User.register_atomic(db_session, second)
+
+def test_register_atomic_duplicate_without_on_conflict(db_session):
+    """Test the plain-INSERT path used on dialects without ON CONFLICT"""
+    user_data = create_fake_user()
+    user_data['password'] = "TestPass123"
+    User.register_atomic(db_session, user_data)
+
+    with patch.object(User, "_supports_on_conflict", return_value=False):
+        with pytest.raises(ValueError, match="Username or email already exists"):
+            User.register_atomic(db_session, dict(user_data, username="someoneelse"))
+
+        # The savepoint rolled back only the failed insert
+        other = create_fake_user()
+        other['password'] = "TestPass123"
+        assert User.register_atomic(db_session, other).id is not None
+    db_session.commit()
+    assert db_session.query(User).count() == 2
+
+@pytest.mark.parametrize("on_conflict", [True, False])
+def test_register_atomic_other_conflicts_still_raise(db_session, on_conflict):
+    """Test that a conflict on a constraint other than email/username isn't reported as a duplicate"""
+    first = create_fake_user()
+    first['password'] = "TestPass123"
+    existing = User.register_atomic(db_session, first)
+    db_session.commit()
+
+    second = create_fake_user()
+    second['password'] = "TestPass123"
+    # password_hash is unique too: reuse the stored hash to collide on it
+    with patch.object(User, "hash_password", return_value=existing.password_hash), \
+            patch.object(User, "_supports_on_conflict", return_value=on_conflict):
+        with pytest.raises(IntegrityError):
+            User.register_atomic(db_session, second)
+    db_session.rollback()
+
+def test_register_atomic_invalid_data(db_session, fake_user_data):
+    """Test that validation errors surface as ValueError"""
+    fake_user_data['password'] = "Ab1"
+    with pytest.raises(ValueError, match="Password must be at least 6 characters long"):
+        User.register_atomic(db_session, fake_user_data)
+
+    fake_user_data['password'] = "nouppercase123"
+    with pytest.raises(ValueError, match="uppercase"):
+        User.register_atomic(db_session, fake_user_data)
+
+def test_register_atomic_concurrent_duplicates(db_session):
+    """Test that parallel duplicate signups create exactly one user"""
+    user_data = create_fake_user()
+    user_data['password'] = "TestPass123"
+    workers = 8
+    barrier = threading.Barrier(workers)
+
+    def signup(_):
+        with managed_db_session() as session:
+            barrier.wait()  # fire every INSERT at the same moment
+            try:
+                User.register_atomic(session, dict(user_data))
+                session.commit()
+                return "created"
+            except ValueError as e:
+                session.rollback()
+                return str(e)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        outcomes = list(pool.map(signup, range(workers)))
+
+    assert outcomes.count("created") == 1
+    assert outcomes.count("Username or email already exists") == workers - 1
+    assert db_session.query(User).filter(User.email == user_data['email']).count() == 1
+
 ############################
 ### Authentication Tests ###
 ############################
@@ -208,6 +311,72 @@ def test_token_creation_and_verification(db_session, fake_user_data):
     decoded_user_id = User.verify_token(token)
     assert decoded_user_id == user.id
 
+def test_verify_token_uses_cache():
+    """Test that a token seen before is answered from the cache"""
+    token_cache.clear()
+    user_id = uuid4()
+    token = User.create_access_token({"sub": str(user_id)})
+
+    assert User.verify_token(token) == user_id
+    with patch.object(User, "decode_token") as mock_decode:
+        assert User.verify_token(token) == user_id
+        mock_decode.assert_not_called()
+
+    assert token_cache.stats()["hits"] == 1
+    assert token_cache.stats()["misses"] == 1
+
+def test_verify_token_does_not_cache_invalid_tokens():
+    """Test that invalid tokens are re-checked every time"""
+    token_cache.clear()
+    assert User.verify_token("invalid.token.string") is None
+    assert User.verify_token("invalid.token.string") is None
+    assert token_cache.stats() == {"hits": 0, "misses": 2, "size": 0, "maxsize": token_cache.maxsize}
+
+def test_verify_token_entry_expires_with_token():
+    """Test that a cached entry never outlives the token's exp claim"""
+    token_cache.clear()
+    token = User.create_access_token({"sub": str(uuid4())}, expires_delta=timedelta(seconds=30))
+    User.verify_token(token)
+
+    entry_expires_at = next(iter(token_cache._entries.values()))[1]
+    assert entry_expires_at <= time.time() + 30
+
+def test_verify_token_uncached():
+    """Test that the uncached path gives the same answers without touching the cache"""
+    token_cache.clear()
+    user_id = uuid4()
+    token = User.create_access_token({"sub": str(user_id)})
+
+    assert User.verify_token_uncached(token) == user_id
+    assert User.verify_token_uncached("invalid.token.string") is None
+    assert User.verify_token_uncached(User.create_access_token({"sub": "not-a-uuid"})) is None
+    assert User.verify_token_uncached(User.create_access_token({"role": "admin"})) is None
+    assert token_cache.stats()["size"] == 0
+
+def test_expiring_lru_cache_evicts_and_expires():
+    """Test LRU eviction and per-entry expiry of the cache used for tokens"""
+    cache = ExpiringLRUCache(maxsize=2)
+    far = time.time() + 60
+    cache.set("a", 1, far)
+    cache.set("b", 2, far)
+    assert cache.get("a") == 1      # "a" is now the most recently used
+    cache.set("c", 3, far)          # evicts "b"
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+    cache.set("old", 4, time.time() - 1)   # already expired: not stored
+    assert cache.get("old") is None
+    cache.set("soon", 5, time.time() + 0.01)
+    time.sleep(0.02)
+    assert cache.get("soon") is None
+
+    cache.invalidate("a")
+    assert cache.get("a") is None
+
+    disabled = ExpiringLRUCache(maxsize=0)
+    disabled.set("a", 1, far)
+    assert disabled.get("a") is None
+
 ###########################
 ### Model Utility Tests ###
 ###########################
@@ -0,0 +1,96 @@
+# tests/integration/test_user_import.py
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app import user_import
+from app.models.user import User
+from app.user_import import DUPLICATE_USER_ERROR, import_users, read_rows
+from tests.conftest import create_fake_user
+
+def make_rows(count):
+    rows = []
+    for _ in range(count):
+        row = create_fake_user()
+        row["password"] = "TestPass123"
+        rows.append(row)
+    return rows
+
+def test_import_users(db_session):
+    rows = make_rows(5)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        report = import_users(db_session, enumerate(rows, start=1), batch_size=2, executor=executor)
+
+    assert report.created == 5
+    assert report.failures == []
+    users = db_session.query(User).order_by(User.email).all()
+    assert sorted(row["email"] for row in rows) == [user.email for user in users]
+    assert all(user.id is not None and user.created_at is not None for user in users)
+    assert users[0].verify_password("TestPass123") is True
+
+def test_import_users_reports_failures_without_aborting(db_session, test_user):
+    rows = make_rows(4)
+    rows[1]["password"] = "short"                   # invalid
+    rows[2]["email"] = rows[0]["email"]             # repeats an earlier row
+    rows[3]["username"] = test_user.username        # already in the database
+    good = make_rows(1)[0]
+    numbered = list(enumerate(rows + [good, "Invalid JSON: oops", [1, 2]], start=1))
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        report = import_users(db_session, numbered, batch_size=3, executor=executor)
+
+    assert report.created == 2
+    failures = {failure.row: failure.error for failure in report.failures}
+    assert sorted(failures) == [2, 3, 4, 6, 7]
+    assert "at least 6 characters" in failures[2]
+    assert failures[3] == DUPLICATE_USER_ERROR
+    assert failures[4] == DUPLICATE_USER_ERROR
+    assert failures[6] == "Invalid JSON: oops"
+    assert failures[7] == "Row must be an object"
+    assert db_session.query(User).count() == 3  # test_user + two imported
+
+def test_import_users_default_process_pool(db_session):
+    report = import_users(db_session, enumerate(make_rows(2), start=1))
+    assert report.created == 2
+
+def test_read_rows_csv_and_jsonl(tmp_path):
+    rows = make_rows(2)
+    csv_path = tmp_path / "users.csv"
+    csv_path.write_text(
+        "first_name,last_name,email,username,password\n"
+        + "".join(f"{r['first_name']},{r['last_name']},{r['email']},{r['username']},{r['password']}\n" for r in rows)
+    )
+    assert list(read_rows(str(csv_path))) == [(1, rows[0]), (2, rows[1])]
+
+    jsonl_path = tmp_path / "users.jsonl"
+    jsonl_path.write_text(json.dumps(rows[0]) + "\n\n{not json\n" + json.dumps(rows[1]) + "\n")
+    parsed = list(read_rows(str(jsonl_path)))
+    assert parsed[0] == (1, rows[0])
+    assert parsed[1][0] == 2 and parsed[1][1].startswith("Invalid JSON")
+    assert parsed[2] == (3, rows[1])
+
+def test_cli(db_session, tmp_path, capsys):
+    rows = make_rows(2)
+    rows[1]["email"] = "not-an-email"
+    path = tmp_path / "users.jsonl"
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+    report_path = tmp_path / "failures.csv"
+
+    assert user_import.main([str(path), "--workers", "1", "--report", str(report_path)]) == 1
+    assert "Created 1 users, 1 rows failed" in capsys.readouterr().out
+    lines = report_path.read_text().splitlines()
+    assert lines[0] == "row,error"
+    assert lines[1].startswith("2,")
+
+    # Everything in the file now exists, so a re-run reports every row on stderr
+    assert user_import.main([str(path), "--workers", "1"]) == 1
+    captured = capsys.readouterr()
+    assert "Created 0 users, 2 rows failed" in captured.out
+    assert DUPLICATE_USER_ERROR in captured.err
+
+def test_cli_success(db_session, tmp_path):
+    path = tmp_path / "users.jsonl"
+    path.write_text(json.dumps(make_rows(1)[0]) + "\n")
+    assert user_import.main([str(path), "--format", "jsonl", "--workers", "1"]) == 0
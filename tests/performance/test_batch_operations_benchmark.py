@@ -0,0 +1,49 @@
+# tests/performance/test_batch_operations_benchmark.py
+
+# Microbenchmark: vectorized batch operations vs. looping the scalar functions.
+# Marked slow, so it only runs with: pytest --run-slow -s tests/performance/test_batch_operations_benchmark.py
+
+import time
+
+import numpy as np
+import pytest
+
+from app.operations import add, subtract, multiply, divide
+from app.operations.batch import batch_add, batch_subtract, batch_multiply, batch_divide
+
+N = 1_000_000
+
+def _best_of(func, repeat=3):
+    """Return the fastest wall-clock time in seconds over a few runs."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+@pytest.mark.slow
+@pytest.mark.parametrize(
+    "scalar_func, batch_func",
+    [
+        (add, batch_add),
+        (subtract, batch_subtract),
+        (multiply, batch_multiply),
+        (divide, batch_divide),
+    ],
+    ids=["add", "subtract", "multiply", "divide"]
+)
+def test_batch_faster_than_scalar_loop(scalar_func, batch_func):
+    rng = np.random.default_rng(1234)
+    a = rng.uniform(-1000, 1000, N)
+    b = rng.uniform(1, 1000, N)  # keep divisors non-zero so the scalar loop never raises
+    a_list, b_list = a.tolist(), b.tolist()
+
+    scalar_time = _best_of(lambda: [scalar_func(x, y) for x, y in zip(a_list, b_list)])
+    batch_time = _best_of(lambda: batch_func(a, b))
+
+    print(
+        f"\n{scalar_func.__name__}: scalar loop {scalar_time * 1000:.1f} ms, "
+        f"batch {batch_time * 1000:.1f} ms ({scalar_time / batch_time:.0f}x) for {N:,} pairs"
+    )
+    assert batch_time < scalar_time
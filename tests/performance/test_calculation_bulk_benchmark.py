@@ -0,0 +1,50 @@
+# tests/performance/test_calculation_bulk_benchmark.py
+
+# Rows/sec saving calculation history: Calculation.bulk_create (COPY) vs. the
+# ORM path (Calculation._build per item, session.add_all, one flush). Each run is rolled
+# back, so the table is left as it was.
+# Marked slow: pytest --run-slow -s tests/performance/test_calculation_bulk_benchmark.py
+
+import time
+
+import numpy as np
+import pytest
+
+from app.models.calculation import Calculation
+from app.schemas.calculation import CalculationCreate, CalculationType
+
+TYPES = list(CalculationType)
+
+def _items(count):
+    rng = np.random.default_rng(1234)
+    a = rng.uniform(-1000, 1000, count).tolist()
+    b = rng.uniform(1, 1000, count).tolist()  # non-zero divisors
+    return [
+        CalculationCreate.model_construct(type=TYPES[i % len(TYPES)], a=a[i], b=b[i])
+        for i in range(count)
+    ]
+
+def _orm_save(db, user_id, items):
+    calculations = [Calculation._build(user_id, item.type, item.a, item.b) for item in items]
+    db.add_all(calculations)
+    db.flush()
+
+def _rows_per_second(db, save, count):
+    start = time.perf_counter()
+    save()
+    elapsed = time.perf_counter() - start
+    db.rollback()
+    return count / elapsed
+
+@pytest.mark.slow
+@pytest.mark.parametrize("count", [10_000, 100_000, 1_000_000])
+def test_bulk_create_vs_orm(db_session, test_user, count):
+    user_id = test_user.id
+    items = _items(count)
+
+    bulk = _rows_per_second(db_session, lambda: Calculation.bulk_create(db_session, user_id, items), count)
+    orm = _rows_per_second(db_session, lambda: _orm_save(db_session, user_id, items), count)
+    db_session.expunge_all()
+
+    print(f"\n{count:>9,} rows  ORM: {orm:>10,.0f} rows/s  bulk_create: {bulk:>10,.0f} rows/s  ({bulk / orm:.1f}x)")
+    assert bulk > orm
@@ -0,0 +1,73 @@
+# tests/performance/test_calculation_read_benchmark.py
+
+# Time to read a page of history and build its JSON body: the ORM path (Calculation.history,
+# then CalculationRead validated from attributes), the Core rows with CalculationRead.model_construct,
+# and the path used by GET /calculations (Calculation.history_rows into slotted CalculationRecords).
+# Marked slow: pytest --run-slow --no-cov -s tests/performance/test_calculation_read_benchmark.py
+# (coverage tracing slows the Python-side row handling this measures)
+
+import time
+
+import pytest
+
+from app.models.calculation import Calculation
+from app.schemas.calculation import (
+    CalculationCreate,
+    CalculationPage,
+    CalculationRead,
+    CalculationRecord,
+    CalculationRecordPage,
+    CalculationType,
+)
+from app.schemas.adapters import calculation_page_adapter
+
+SIZES = [1_000, 10_000, 100_000]
+
+def _best_of(func, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+@pytest.mark.slow
+def test_core_read_path_vs_orm(db_session, test_user):
+    user_id = test_user.id
+    types = list(CalculationType)
+    items = [
+        CalculationCreate.model_construct(type=types[i % len(types)], a=i, b=i % 7 + 1)
+        for i in range(max(SIZES))
+    ]
+    Calculation.bulk_create(db_session, user_id, items)
+    db_session.commit()
+
+    def orm_page(size):
+        calculations = Calculation.history(db_session, user_id, size)
+        items = [CalculationRead.model_validate(c, from_attributes=True) for c in calculations]
+        body = CalculationPage(items=items, next_cursor=None).model_dump_json()
+        db_session.expunge_all()  # each run starts with an empty identity map, like a new request
+        return body
+
+    def construct_page(size):
+        rows = Calculation.history_rows(db_session, user_id, size)
+        items = [CalculationRead.model_construct(**row._mapping) for row in rows]
+        return CalculationPage.model_construct(items=items, next_cursor=None).model_dump_json()
+
+    def record_page(size):
+        rows = Calculation.history_rows(db_session, user_id, size)
+        page = CalculationRecordPage([CalculationRecord(*row) for row in rows], None)
+        return calculation_page_adapter.dump_json(page).decode()
+
+    assert orm_page(10) == construct_page(10) == record_page(10)  # same response body
+
+    print()
+    for size in SIZES:
+        orm_time = _best_of(lambda: orm_page(size))
+        construct_time = _best_of(lambda: construct_page(size))
+        record_time = _best_of(lambda: record_page(size))
+        print(
+            f"{size:>7,} rows: ORM {orm_time * 1000:8.1f} ms  Core+model_construct {construct_time * 1000:8.1f} ms  "
+            f"Core+records {record_time * 1000:8.1f} ms ({orm_time / record_time:.1f}x, {size / record_time:,.0f} rows/s)"
+        )
+        assert record_time < orm_time
@@ -0,0 +1,79 @@
+# tests/performance/test_columnar_export_benchmark.py
+
+# Size, time and peak memory of exporting a user's history as NDJSON vs. Arrow IPC vs. Parquet
+# through export_calculations. Peak memory is Python's (tracemalloc) plus Arrow's own pool,
+# and should stay about the same for 10x the rows. Timings come from a separate run without
+# tracemalloc, which slows the export down several times.
+# Marked slow: pytest --run-slow --no-cov -s tests/performance/test_columnar_export_benchmark.py
+
+import asyncio
+import time
+import tracemalloc
+
+import pyarrow as pa
+import pytest
+
+from app.database import get_async_engine, get_async_sessionmaker
+from app.export import export_calculations
+from app.models.calculation import Calculation
+from app.schemas.calculation import CalculationCreate, CalculationType
+
+FORMATS = ("ndjson", "arrow", "parquet")
+
+def _export(user_id, fmt, trace_memory=False):
+    """Run one export; return (bytes written, seconds, peak MiB or None)."""
+    async def runner():
+        engine = get_async_engine()
+        try:
+            async with get_async_sessionmaker(engine)() as session:
+                size = 0
+                pool = pa.default_memory_pool()
+                pool_base = pool.bytes_allocated()
+                pool_peak = 0
+                if trace_memory:
+                    tracemalloc.start()
+                start = time.perf_counter()
+                try:
+                    async for chunk in export_calculations(session, user_id, fmt):
+                        size += len(chunk)
+                        pool_peak = max(pool_peak, pool.bytes_allocated() - pool_base)
+                    elapsed = time.perf_counter() - start
+                    if not trace_memory:
+                        return size, elapsed, None
+                    return size, elapsed, (tracemalloc.get_traced_memory()[1] + pool_peak) / 2**20
+                finally:
+                    if trace_memory:
+                        tracemalloc.stop()
+        finally:
+            await engine.dispose()
+    return asyncio.run(runner())
+
+@pytest.mark.slow
+def test_columnar_export_size_time_memory(db_session, test_user):
+    user_id = test_user.id
+    types = list(CalculationType)
+    peaks = {}
+    seeded = 0
+    print()
+    for rows in (50_000, 500_000):
+        items = [
+            CalculationCreate.model_construct(type=types[i % 4], a=i * 1.1, b=i % 7 + 1)
+            for i in range(seeded, rows)
+        ]
+        Calculation.bulk_create(db_session, user_id, items)
+        db_session.commit()
+        seeded = rows
+
+        results = {fmt: _export(user_id, fmt) for fmt in FORMATS}
+        ndjson_size, ndjson_time, _ = results["ndjson"]
+        for fmt, (size, elapsed, _) in results.items():
+            peak = _export(user_id, fmt, trace_memory=True)[2]
+            print(
+                f"{rows:>9,} rows {fmt:>7}: {size / 2**20:7.1f} MiB ({size / ndjson_size:4.0%} of NDJSON), "
+                f"{elapsed:6.2f} s ({rows / elapsed:>9,.0f} rows/s, {ndjson_time / elapsed:.1f}x), peak {peak:6.1f} MiB"
+            )
+            peaks[rows, fmt] = peak
+        assert results["parquet"][0] < results["arrow"][0] < ndjson_size
+
+    for fmt in ("arrow", "parquet"):
+        assert peaks[500_000, fmt] < peaks[50_000, fmt] * 2
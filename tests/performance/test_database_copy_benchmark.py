@@ -0,0 +1,35 @@
+# tests/performance/test_database_copy_benchmark.py
+
+# Time to bring up a 10M-row calculations fixture: seed it once, dump it with COPY,
+# then restore the dump into emptied tables (what a benchmark run would do each time).
+# Marked slow: pytest --run-slow -s tests/performance/test_database_copy_benchmark.py
+
+import time
+
+import pytest
+
+from app.database_copy import dump, restore, seed
+from tests.conftest import test_engine
+
+USERS = 1_000
+CALCULATIONS = 10_000_000
+
+@pytest.mark.slow
+def test_restore_10m_row_fixture(db_session, tmp_path):
+    start = time.perf_counter()
+    seed(test_engine, USERS, CALCULATIONS)
+    seeded = time.perf_counter() - start
+
+    start = time.perf_counter()
+    dump(test_engine, str(tmp_path), "binary")
+    dumped = time.perf_counter() - start
+
+    start = time.perf_counter()
+    counts = restore(test_engine, str(tmp_path), truncate=True)
+    restored = time.perf_counter() - start
+
+    print(
+        f"\n{CALCULATIONS:,} calculations: seed {seeded:.1f}s, dump {dumped:.1f}s, "
+        f"restore {restored:.1f}s ({CALCULATIONS / restored:,.0f} rows/s)"
+    )
+    assert counts == {"users": USERS, "calculations": CALCULATIONS}
@@ -0,0 +1,56 @@
+# tests/performance/test_export_memory.py
+
+# Peak Python memory while exporting a user's history: export_calculations (server-side
+# cursor, yield_per) vs. loading everything with .all(). The streamed export should use
+# about the same memory for 20k rows as for 200k.
+# Marked slow: pytest --run-slow -s tests/performance/test_export_memory.py
+
+import asyncio
+import tracemalloc
+
+import pytest
+from sqlalchemy import select
+
+from app.database import get_async_engine, get_async_sessionmaker
+from app.export import export_calculations
+from app.models.calculation import Calculation
+from app.schemas.calculation import CalculationCreate, CalculationType
+
+def _peak_mib(consume) -> float:
+    async def runner():
+        engine = get_async_engine()
+        try:
+            async with get_async_sessionmaker(engine)() as session:
+                tracemalloc.start()
+                try:
+                    await consume(session)
+                    return tracemalloc.get_traced_memory()[1] / 2**20
+                finally:
+                    tracemalloc.stop()
+        finally:
+            await engine.dispose()
+    return asyncio.run(runner())
+
+@pytest.mark.slow
+def test_export_memory_is_bounded(db_session, test_user):
+    user_id = test_user.id
+    peaks = {}
+    seeded = 0
+    print()
+    for rows in (20_000, 200_000):
+        items = [CalculationCreate.model_construct(type=CalculationType.ADDITION, a=i, b=1) for i in range(rows - seeded)]
+        Calculation.bulk_create(db_session, user_id, items)
+        db_session.commit()
+        seeded = rows
+
+        async def stream(session):
+            async for _ in export_calculations(session, user_id, "ndjson"):
+                pass
+
+        async def load_all(session):
+            (await session.execute(select(Calculation).where(Calculation.user_id == user_id))).scalars().all()
+
+        peaks[rows] = _peak_mib(stream)
+        print(f"{rows:>7,} rows: streamed export peak {peaks[rows]:6.1f} MiB, .all() peak {_peak_mib(load_all):7.1f} MiB")
+
+    assert peaks[200_000] < peaks[20_000] * 2
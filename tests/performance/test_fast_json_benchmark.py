@@ -0,0 +1,70 @@
+# tests/performance/test_fast_json_benchmark.py
+
+# Requests/sec of the /add route with and without settings.FAST_JSON_RESPONSES.
+# Requests are sent straight through the ASGI interface, so the numbers measure the
+# app's own parsing/validation/serialization work rather than an HTTP client.
+# Marked slow: pytest --run-slow -s tests/performance/test_fast_json_benchmark.py
+
+import asyncio
+import importlib
+import time
+
+import pytest
+
+import main
+from app.config import settings
+
+REQUESTS = 20_000
+BODY = b'{"a": 14.5, "b": 5}'
+
+async def _call(app, body: bytes) -> bytes:
+    """Send one POST /add through the ASGI interface and return the response body."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/add",
+        "raw_path": b"/add",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        "client": ("127.0.0.1", 1234),
+        "server": ("127.0.0.1", 8000),
+    }
+    chunks = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(chunks)
+
+def _requests_per_second(app) -> float:
+    async def run():
+        assert await _call(app, BODY) == b'{"result":19.5}'
+        start = time.perf_counter()
+        for _ in range(REQUESTS):
+            await _call(app, BODY)
+        return REQUESTS / (time.perf_counter() - start)
+    return asyncio.run(run())
+
+@pytest.mark.slow
+def test_fast_json_requests_per_second(monkeypatch):
+    classic_app = importlib.reload(main).app
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", True)
+    fast_app = importlib.reload(main).app
+    try:
+        classic = _requests_per_second(classic_app)
+        fast = _requests_per_second(fast_app)
+    finally:
+        monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", False)
+        importlib.reload(main)
+
+    print(f"\n/add classic: {classic:,.0f} req/s, fast JSON: {fast:,.0f} req/s ({fast / classic:.2f}x)")
+    assert fast > classic
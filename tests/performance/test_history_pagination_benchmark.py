@@ -0,0 +1,58 @@
+# tests/performance/test_history_pagination_benchmark.py
+
+# Latency of one history page at increasing depth: keyset (Calculation.history, as used by
+# GET /calculations) vs. the same query with OFFSET. Keyset should stay flat; OFFSET grows
+# with the number of rows it skips.
+# Marked slow: pytest --run-slow -s tests/performance/test_history_pagination_benchmark.py
+
+import time
+
+import pytest
+from sqlalchemy import select
+
+from app.models.calculation import Calculation
+from app.schemas.calculation import CalculationCreate, CalculationType
+
+ROWS = 200_000
+PAGE = 50
+DEPTHS = [0, 1_000, 10_000, 100_000, 190_000]
+
+def _best_of(func, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+@pytest.mark.slow
+def test_keyset_page_latency_is_flat(db_session, test_user):
+    user_id = test_user.id
+    items = [CalculationCreate.model_construct(type=CalculationType.ADDITION, a=i, b=1) for i in range(ROWS)]
+    for start in range(0, ROWS, 10_000):  # spread created_at over distinct commits
+        Calculation.bulk_create(db_session, user_id, items[start:start + 10_000])
+        db_session.commit()
+    db_session.execute(select(Calculation.id).limit(1))  # warm the connection
+    ordered = (
+        select(Calculation).where(Calculation.user_id == user_id)
+        .order_by(Calculation.created_at.desc(), Calculation.id.desc())
+    )
+
+    print()
+    keyset_timings = []
+    for depth in DEPTHS:
+        after = None
+        if depth:
+            row = db_session.execute(
+                select(Calculation.created_at, Calculation.id).where(Calculation.user_id == user_id)
+                .order_by(Calculation.created_at.desc(), Calculation.id.desc()).offset(depth - 1).limit(1)
+            ).one()
+            after = (row.created_at, row.id)
+        keyset = _best_of(lambda: Calculation.history(db_session, user_id, PAGE, after))
+        offset = _best_of(lambda: list(db_session.scalars(ordered.offset(depth).limit(PAGE))))
+        db_session.expunge_all()
+        keyset_timings.append(keyset)
+        print(f"depth {depth:>7,}: keyset {keyset * 1000:7.2f} ms  OFFSET {offset * 1000:7.2f} ms")
+
+    # The deepest keyset page costs about the same as the first one
+    assert keyset_timings[-1] < keyset_timings[0] * 3 + 0.002
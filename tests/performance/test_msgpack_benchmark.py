@@ -0,0 +1,90 @@
+# tests/performance/test_msgpack_benchmark.py
+
+# Body size and encode/decode time of JSON vs. MessagePack for the two negotiated routes:
+# a 10k-item POST /batch request and response, and a history page from GET /calculations.
+# Marked slow: pytest --run-slow --no-cov -s tests/performance/test_msgpack_benchmark.py
+
+import json
+import time
+
+import msgpack
+import pytest
+
+from app.models.calculation import Calculation
+from app.negotiation import pack, unpack
+from app.schemas.adapters import calculation_page_adapter
+from app.schemas.calculation import CalculationCreate, CalculationRecord, CalculationRecordPage, CalculationType
+from main import batch_operation_list_adapter
+
+SIZE = 10_000
+
+def _best_of(func, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def _report(name, json_body, msgpack_body, json_encode, msgpack_encode, json_decode, msgpack_decode):
+    print(
+        f"{name}: JSON {len(json_body):>9,} B, MessagePack {len(msgpack_body):>9,} B "
+        f"({len(msgpack_body) / len(json_body):.0%}) | encode JSON {json_encode * 1000:6.1f} ms, "
+        f"MessagePack {msgpack_encode * 1000:6.1f} ms | decode JSON {json_decode * 1000:6.1f} ms, "
+        f"MessagePack {msgpack_decode * 1000:6.1f} ms"
+    )
+
+@pytest.mark.slow
+def test_batch_bodies():
+    ops = ["add", "subtract", "multiply", "divide"]
+    request = [{"op": ops[i % 4], "a": i * 1.1, "b": i % 7 + 0.5} for i in range(SIZE)]
+    response = {"results": [{"result": i / 7, "error": None} for i in range(SIZE)]}
+
+    json_request, msgpack_request = json.dumps(request).encode(), pack(request)
+    # Request side: decoding plus validation, as the /batch route does it
+    assert (batch_operation_list_adapter.validate_json(json_request)
+            == batch_operation_list_adapter.validate_python(unpack(msgpack_request)))
+    print()
+    _report(
+        "batch request ",
+        json_request, msgpack_request,
+        _best_of(lambda: json.dumps(request).encode()),
+        _best_of(lambda: pack(request)),
+        _best_of(lambda: batch_operation_list_adapter.validate_json(json_request)),
+        _best_of(lambda: batch_operation_list_adapter.validate_python(unpack(msgpack_request))),
+    )
+
+    json_response, msgpack_response = json.dumps(response).encode(), pack(response)
+    assert msgpack.unpackb(msgpack_response) == json.loads(json_response)
+    _report(
+        "batch response",
+        json_response, msgpack_response,
+        _best_of(lambda: json.dumps(response).encode()),
+        _best_of(lambda: pack(response)),
+        _best_of(lambda: json.loads(json_response)),
+        _best_of(lambda: msgpack.unpackb(msgpack_response)),
+    )
+    assert len(msgpack_response) < len(json_response)
+
+@pytest.mark.slow
+def test_history_page_bodies(db_session, test_user):
+    types = list(CalculationType)
+    items = [CalculationCreate.model_construct(type=types[i % 4], a=i * 1.1, b=i % 7 + 1) for i in range(SIZE)]
+    Calculation.bulk_create(db_session, test_user.id, items)
+    db_session.commit()
+    rows = Calculation.history_rows(db_session, test_user.id, SIZE)
+    page = CalculationRecordPage([CalculationRecord(*row) for row in rows], None)
+
+    json_body = calculation_page_adapter.dump_json(page)
+    msgpack_body = pack(calculation_page_adapter.dump_python(page))
+    assert len(msgpack.unpackb(msgpack_body, timestamp=3)["items"]) == SIZE
+    print()
+    _report(
+        "history page  ",
+        json_body, msgpack_body,
+        _best_of(lambda: calculation_page_adapter.dump_json(page)),
+        _best_of(lambda: pack(calculation_page_adapter.dump_python(page))),
+        _best_of(lambda: json.loads(json_body)),
+        _best_of(lambda: msgpack.unpackb(msgpack_body, timestamp=3)),
+    )
+    assert len(msgpack_body) < len(json_body)
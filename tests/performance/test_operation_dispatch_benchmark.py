@@ -0,0 +1,84 @@
+# tests/performance/test_operation_dispatch_benchmark.py
+
+# Benchmark: registry dict dispatch vs. the old if/elif chain over CalculationType,
+# and CalculationFactory.create_many vs. calling create_calculation in a loop.
+# Marked slow, so it only runs with: pytest --run-slow -s tests/performance/test_operation_dispatch_benchmark.py
+
+import time
+
+import pytest
+
+from app.models.calculation import MODELS_BY_TYPE, Addition, Division, Multiplication, Subtraction
+from app.models.calculation_factory import CalculationFactory
+from app.schemas.calculation import CalculationCreate, CalculationType
+
+DISPATCHES = 1_000_000
+INSTANCES = 100_000
+
+def _best_of(func, repeat=3):
+    """Return the fastest wall-clock time in seconds over a few runs."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def if_elif_model(calc_type):
+    """The factory's dispatch before the registry, kept here as the baseline."""
+    if calc_type == CalculationType.ADDITION:
+        return Addition
+    elif calc_type == CalculationType.SUBTRACTION:
+        return Subtraction
+    elif calc_type == CalculationType.MULTIPLICATION:
+        return Multiplication
+    elif calc_type == CalculationType.DIVISION:
+        return Division
+    else:
+        raise ValueError(f"Unknown calculation type: {calc_type}")
+
+def registry_model(calc_type):
+    model = MODELS_BY_TYPE.get(calc_type)
+    if model is None:
+        raise ValueError(f"Unknown calculation type: {calc_type}")
+    return model
+
+@pytest.mark.slow
+def test_dict_dispatch_vs_if_elif():
+    types = list(CalculationType) * (DISPATCHES // len(CalculationType))
+
+    print()
+    for calc_type in CalculationType:
+        same = [calc_type] * DISPATCHES
+        chain_time = _best_of(lambda: [if_elif_model(t) for t in same])
+        dict_time = _best_of(lambda: [registry_model(t) for t in same])
+        print(f"{calc_type.name:<15} if/elif {chain_time * 1e9 / DISPATCHES:5.0f} ns, "
+              f"registry {dict_time * 1e9 / DISPATCHES:5.0f} ns per dispatch")
+
+    chain_time = _best_of(lambda: [if_elif_model(t) for t in types])
+    dict_time = _best_of(lambda: [registry_model(t) for t in types])
+    print(f"{'mixed':<15} if/elif {chain_time * 1e9 / len(types):5.0f} ns, "
+          f"registry {dict_time * 1e9 / len(types):5.0f} ns per dispatch")
+    assert dict_time < chain_time
+
+def registry_dispatch_share(items, total_time):
+    """How much of building the instances is spent choosing the class."""
+    dispatch_time = _best_of(lambda: [registry_model(item.type) for item in items])
+    return dispatch_time / total_time
+
+@pytest.mark.slow
+def test_create_many_vs_create_calculation_loop():
+    items = [
+        CalculationCreate(type=calc_type, a=i, b=i % 7 + 1)
+        for i, calc_type in zip(range(INSTANCES), list(CalculationType) * INSTANCES)
+    ]
+    loop_time = _best_of(lambda: [CalculationFactory.create_calculation(item.type, item.a, item.b) for item in items])
+    many_time = _best_of(lambda: CalculationFactory.create_many(items))
+
+    print(
+        f"\n{INSTANCES:,} instances: create_calculation loop {loop_time * 1000:.0f} ms, "
+        f"create_many {many_time * 1000:.0f} ms ({loop_time / many_time:.2f}x); "
+        f"dispatch is {registry_dispatch_share(items, many_time):.1%} of create_many"
+    )
+    # Building the ORM instances dominates, so create_many is at most on par with the loop
+    assert many_time < loop_time * 1.25
@@ -0,0 +1,56 @@
+# tests/performance/test_uuid7_benchmark.py
+
+# Insert rate and primary-key index size for calculations keyed by uuid4 vs. uuid7
+# (settings.UUID_VERSION). Rows go in through Calculation.bulk_create in committed batches,
+# like a busy history table filling up over time.
+# Marked slow: pytest --run-slow -s tests/performance/test_uuid7_benchmark.py
+
+import time
+
+import pytest
+from sqlalchemy import text
+
+from app.config import settings
+from app.models.calculation import Calculation
+from app.schemas.calculation import CalculationCreate, CalculationType
+
+ROWS = 1_000_000
+BATCH = 50_000
+
+def _load(db_session, user_id):
+    db_session.execute(text("TRUNCATE calculations"))
+    db_session.commit()
+    items = [CalculationCreate.model_construct(type=CalculationType.ADDITION, a=i, b=1) for i in range(BATCH)]
+    start = time.perf_counter()
+    for _ in range(ROWS // BATCH):
+        Calculation.bulk_create(db_session, user_id, items)
+        db_session.commit()
+    elapsed = time.perf_counter() - start
+    index_bytes = db_session.execute(text("SELECT pg_relation_size('calculations_pkey')")).scalar()
+    leaf_density = db_session.execute(text(
+        "SELECT avg_leaf_density FROM pgstatindex('calculations_pkey')"
+    )).scalar() if _has_pgstattuple(db_session) else None
+    return ROWS / elapsed, index_bytes, leaf_density
+
+def _has_pgstattuple(db_session) -> bool:
+    try:
+        db_session.execute(text("CREATE EXTENSION IF NOT EXISTS pgstattuple"))
+        db_session.commit()
+        return True
+    except Exception:
+        db_session.rollback()
+        return False
+
+@pytest.mark.slow
+def test_uuid7_vs_uuid4_inserts(db_session, test_user, monkeypatch):
+    results = {}
+    for version in (4, 7):
+        monkeypatch.setattr(settings, "UUID_VERSION", version)
+        results[version] = _load(db_session, test_user.id)
+
+    print()
+    for version, (rate, index_bytes, density) in results.items():
+        density_text = f", leaf density {density:.0f}%" if density is not None else ""
+        print(f"uuid{version}: {rate:>9,.0f} rows/s, primary key index {index_bytes / 2**20:6.1f} MiB{density_text}")
+
+    assert results[7][1] < results[4][1]  # sequential keys fill index pages instead of splitting them
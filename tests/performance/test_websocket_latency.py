@@ -0,0 +1,71 @@
+# tests/performance/test_websocket_latency.py
+
+# Tail latency of the /ws/calculate channel with many concurrent sockets, against a real
+# uvicorn server. Marked slow: pytest --run-slow -s tests/performance/test_websocket_latency.py
+
+import asyncio
+import json
+import socket
+import statistics
+import subprocess
+import time
+
+import pytest
+import websockets
+
+from tests.conftest import wait_for_server
+
+SOCKETS = 200
+MESSAGES_PER_SOCKET = 50
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+@pytest.fixture
+def live_server():
+    """Run the app with uvicorn in its own process, so the clients don't share its GIL."""
+    port = _free_port()
+    process = subprocess.Popen(
+        ["python", "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        if not wait_for_server(f"http://127.0.0.1:{port}/", timeout=30):
+            pytest.fail("uvicorn did not start")
+        yield f"ws://127.0.0.1:{port}/ws/calculate"
+    finally:
+        process.terminate()
+        process.wait(timeout=5)
+
+async def _client(url: str, latencies: list) -> None:
+    async with websockets.connect(url, compression=None) as ws:
+        for i in range(MESSAGES_PER_SOCKET):
+            start = time.perf_counter()
+            await ws.send(json.dumps({"id": i, "op": "multiply", "a": i, "b": 2}))
+            reply = json.loads(await ws.recv())
+            latencies.append(time.perf_counter() - start)
+            assert reply == {"id": i, "result": i * 2}
+
+@pytest.mark.slow
+def test_websocket_tail_latency(live_server):
+    latencies: list = []
+
+    async def run():
+        await asyncio.gather(*(_client(live_server, latencies) for _ in range(SOCKETS)))
+
+    start = time.perf_counter()
+    asyncio.run(run())
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(
+        f"\n{SOCKETS} sockets x {MESSAGES_PER_SOCKET} messages: "
+        f"p50 {p50:.2f} ms, p99 {p99:.2f} ms, max {latencies[-1] * 1000:.2f} ms, "
+        f"{len(latencies) / elapsed:,.0f} msg/s"
+    )
+    assert len(latencies) == SOCKETS * MESSAGES_PER_SOCKET
@@ -0,0 +1,91 @@
+# tests/unit/test_batch_operations.py
+
+import numpy as np
+import pytest
+
+from app.operations import add, subtract, multiply, divide
+from app.operations.batch import (
+    DIVIDE_BY_ZERO_ERROR,
+    batch_add,
+    batch_divide,
+    batch_multiply,
+    batch_subtract,
+    evaluate_batch,
+)
+
+A = [2, -2, 2.5, -2.5, 0]
+B = [3, -3, 3.5, 4.0, 5]
+
+# ---------------------------------------------
+# Batch results match the scalar functions
+# ---------------------------------------------
+
+@pytest.mark.parametrize(
+    "batch_func, scalar_func",
+    [
+        (batch_add, add),
+        (batch_subtract, subtract),
+        (batch_multiply, multiply),
+    ],
+    ids=["batch_add", "batch_subtract", "batch_multiply"]
+)
+def test_batch_matches_scalar(batch_func, scalar_func):
+    """Each batch function returns the same values as looping its scalar version."""
+    result = batch_func(A, B)
+
+    assert isinstance(result, np.ndarray)
+    assert result.tolist() == [scalar_func(a, b) for a, b in zip(A, B)]
+
+def test_batch_divide_matches_scalar():
+    quotients, zero_mask = batch_divide(A, B)
+
+    assert not zero_mask.any()
+    assert quotients.tolist() == [divide(a, b) for a, b in zip(A, B)]
+
+def test_batch_accepts_numpy_arrays():
+    a = np.arange(5, dtype=np.float64)
+    result = batch_add(a, a)
+    assert result.tolist() == [0.0, 2.0, 4.0, 6.0, 8.0]
+
+# ---------------------------------------------
+# Division by zero is reported per element
+# ---------------------------------------------
+
+def test_batch_divide_by_zero_masks_elements():
+    """A zero divisor marks only its own element instead of failing the batch."""
+    quotients, zero_mask = batch_divide([6, 10, 5], [3, 0, 0])
+
+    assert zero_mask.tolist() == [False, True, True]
+    assert quotients[0] == 2.0
+    assert np.isnan(quotients[zero_mask]).all()
+
+    # The mask uses the same message the scalar function raises
+    with pytest.raises(ValueError, match=DIVIDE_BY_ZERO_ERROR):
+        divide(10, 0)
+
+def test_batch_mismatched_lengths():
+    with pytest.raises(ValueError, match="same shape"):
+        batch_add([1, 2, 3], [1, 2])
+
+# ---------------------------------------------
+# Mixed-operation batches
+# ---------------------------------------------
+
+def test_evaluate_batch_mixed_operations():
+    results, errors = evaluate_batch(
+        ["add", "subtract", "multiply", "divide", "divide"],
+        [2, 5, 3, 6, 1],
+        [3, 3, 4, 3, 0],
+    )
+
+    assert results[:4].tolist() == [5.0, 2.0, 12.0, 2.0]
+    assert errors.tolist() == [False, False, False, False, True]
+    assert np.isnan(results[4])
+
+def test_evaluate_batch_unknown_operation():
+    with pytest.raises(ValueError, match="Unknown operation"):
+        evaluate_batch(["modulo"], [1], [2])
+
+def test_evaluate_batch_length_mismatch():
+    with pytest.raises(ValueError, match="one operation per operand pair"):
+        evaluate_batch(["add", "add"], [1], [2])
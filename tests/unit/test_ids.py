@@ -0,0 +1,54 @@
+# tests/unit/test_ids.py
+
+import time
+import uuid
+from unittest.mock import patch
+
+import pytest
+
+from app import ids
+from app.config import settings
+from app.ids import new_id, uuid7
+
+def test_uuid7_layout():
+    before = time.time_ns() // 1_000_000
+    value = uuid7()
+    after = time.time_ns() // 1_000_000
+
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+    assert before <= value.int >> 80 <= after + 1  # 48-bit millisecond timestamp
+
+def test_uuid7_is_monotonic_within_a_millisecond():
+    values = [uuid7() for _ in range(10_000)]
+    assert values == sorted(values)
+    assert len(set(values)) == len(values)
+
+def keep_generator_state(monkeypatch):
+    """Have monkeypatch restore the generator's clock and counter after the test."""
+    monkeypatch.setattr(ids, "_last_ms", ids._last_ms)
+    monkeypatch.setattr(ids, "_sequence", ids._sequence)
+
+def test_uuid7_counter_overflow_moves_to_next_millisecond(monkeypatch):
+    keep_generator_state(monkeypatch)  # later ids must not carry this test's future timestamp
+    future_ms = time.time_ns() // 1_000_000 + 60_000  # ahead of any id made so far
+    with patch.object(ids.time, "time_ns", return_value=future_ms * 1_000_000):
+        first = uuid7()
+        values = [uuid7() for _ in range(0x1000)]  # more than the 12-bit counter holds
+    assert values == sorted(values) and values[0] > first
+    assert first.int >> 80 == future_ms
+    assert values[-1].int >> 80 == future_ms + 1
+
+def test_generator_state_restored_after_overflow_test():
+    assert uuid7().int >> 80 <= time.time_ns() // 1_000_000 + 1
+
+def test_uuid7_stays_ordered_if_the_clock_goes_back(monkeypatch):
+    keep_generator_state(monkeypatch)
+    latest = uuid7()
+    with patch.object(ids.time, "time_ns", return_value=0):
+        assert uuid7() > latest
+
+@pytest.mark.parametrize("version", [4, 7])
+def test_new_id_follows_setting(monkeypatch, version):
+    monkeypatch.setattr(settings, "UUID_VERSION", version)
+    assert new_id().version == version
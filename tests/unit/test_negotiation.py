@@ -0,0 +1,49 @@
+# tests/unit/test_negotiation.py
+
+import uuid
+from datetime import datetime, timezone
+
+import msgpack
+import pytest
+
+from app.negotiation import JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, is_msgpack, negotiate, pack, unpack
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, JSON_MEDIA_TYPE),
+    ("", JSON_MEDIA_TYPE),
+    ("*/*", JSON_MEDIA_TYPE),
+    ("application/msgpack", MSGPACK_MEDIA_TYPE),
+    ("application/x-msgpack", MSGPACK_MEDIA_TYPE),
+    ("Application/MsgPack; charset=binary", MSGPACK_MEDIA_TYPE),
+    ("application/json, application/msgpack", JSON_MEDIA_TYPE),   # tie goes to JSON
+    ("application/json;q=0.5, application/msgpack", MSGPACK_MEDIA_TYPE),
+    ("application/msgpack;q=0.9, */*;q=0.1", MSGPACK_MEDIA_TYPE),
+    ("application/*, application/msgpack;q=0", JSON_MEDIA_TYPE),  # most specific range wins
+    ("text/html", JSON_MEDIA_TYPE),                                # nothing acceptable: default, not 406
+    ("application/msgpack;q=oops", JSON_MEDIA_TYPE),
+])
+def test_negotiate(accept, expected):
+    assert negotiate(accept) == expected
+
+def test_is_msgpack():
+    assert is_msgpack("application/msgpack")
+    assert is_msgpack("application/x-msgpack; charset=binary")
+    assert not is_msgpack("application/json")
+    assert not is_msgpack(None)
+
+def test_pack_round_trip():
+    id_ = uuid.uuid4()
+    created_at = datetime(2025, 7, 16, 12, 30, 1, 123456)
+    data = unpack(pack({"id": id_, "created_at": created_at, "result": 1.5, "error": None}))
+    assert uuid.UUID(bytes=data["id"]) == id_
+    assert data["created_at"] == created_at.replace(tzinfo=timezone.utc)  # naive datetimes are UTC
+    assert data["result"] == 1.5 and data["error"] is None
+
+def test_pack_rejects_unknown_types():
+    with pytest.raises(TypeError, match="Cannot serialize object"):
+        pack(object())
+
+@pytest.mark.parametrize("data", [b"\xc1", b"\x92\x01", msgpack.packb(1) + b"\x00"])
+def test_unpack_invalid(data):
+    with pytest.raises(ValueError, match="Invalid MessagePack body"):
+        unpack(data)
@@ -0,0 +1,34 @@
+# tests/unit/test_pagination.py
+
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from app.pagination import decode_cursor, encode_cursor
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 7, 16, 12, 30, 1, 123456)
+    id_ = uuid.uuid4()
+    cursor = encode_cursor(created_at, id_)
+    assert "=" not in cursor and "/" not in cursor and "+" not in cursor  # URL-safe, no padding
+    assert decode_cursor(cursor) == (created_at, id_)
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    "bm90IGpzb24",            # "not json"
+    "WzFd",                   # [1]
+    "WyJ4IiwieSJd",           # ["x","y"]
+    "WyIyMDI1LTAxLTAxIiwieSJd",  # ["2025-01-01","y"]
+    "WyIyMDI1LTAxLTAxIiwxXQ",    # ["2025-01-01",1]
+    "WzEsMl0",                   # [1,2]
+    "eyJhIjoxfQ",                # {"a":1}
+])
+def test_decode_cursor_invalid(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+
+def test_decode_cursor_rejects_timezone():
+    cursor = encode_cursor(datetime(2025, 7, 16, tzinfo=timezone.utc), uuid.uuid4())
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
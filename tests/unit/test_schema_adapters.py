@@ -0,0 +1,45 @@
+# tests/unit/test_schema_adapters.py
+
+import json
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.adapters import dump_calculation_reads, validate_calculation_creates, validate_calculation_reads
+from app.schemas.calculation import CalculationCreate, CalculationRead, CalculationType
+
+def test_validate_creates_from_json_bytes():
+    items = validate_calculation_creates(b'[{"type": "addition", "a": 1, "b": 2.5}, {"type": "division", "a": "6", "b": 3}]')
+    assert items == [
+        CalculationCreate(type=CalculationType.ADDITION, a=1, b=2.5),
+        CalculationCreate(type=CalculationType.DIVISION, a=6, b=3),
+    ]
+    assert validate_calculation_creates("[]") == []
+
+def test_strict_mode_rejects_coercion():
+    body = b'[{"type": "addition", "a": 1, "b": 2}, {"type": "division", "a": "6", "b": 3}]'
+    with pytest.raises(ValidationError) as exc_info:
+        validate_calculation_creates(body, strict=True)
+    errors = exc_info.value.errors()
+    assert [error["loc"] for error in errors] == [(1, "a")]  # the item's index comes first
+
+    # Well-typed input passes; JSON integers are still numbers
+    assert len(validate_calculation_creates(b'[{"type": "addition", "a": 1, "b": 2.5}]', strict=True)) == 1
+
+@pytest.mark.parametrize("body", [b'{"type": "addition", "a": 1, "b": 2}', b'[{"type": "power", "a": 1, "b": 2}]', b"[{"])
+def test_validate_creates_rejects_invalid_batches(body):
+    with pytest.raises(ValidationError):
+        validate_calculation_creates(body)
+
+def test_reads_round_trip():
+    calculation = CalculationRead(
+        id=uuid4(), user_id=uuid4(), type=CalculationType.MULTIPLICATION, a=2, b=4, result=8,
+        created_at=datetime(2025, 7, 16), updated_at=datetime(2025, 7, 16, 1),
+    )
+    body = dump_calculation_reads([calculation, calculation])
+    assert json.loads(body)[0]["id"] == str(calculation.id)
+    assert json.loads(body)[0]["type"] == "multiplication"
+    assert validate_calculation_reads(body) == [calculation, calculation]
+    assert validate_calculation_reads(body, strict=True) == [calculation, calculation]
@@ -0,0 +1,94 @@
+# tests/unit/test_streaming.py
+
+import asyncio
+
+import pytest
+
+from app.streaming import LineTooLongError, iter_line_batches, iter_lines
+
+async def _chunks(*parts):
+    for part in parts:
+        yield part
+
+def _collect(chunks, **kwargs):
+    async def run():
+        return [line async for line in iter_lines(chunks, **kwargs)]
+    return asyncio.run(run())
+
+def test_iter_lines_across_chunks():
+    lines = _collect(_chunks(b'{"a": 1}\n{"a"', b': 2}\n\n{"a": 3}'))
+    assert lines == [b'{"a": 1}', b'{"a": 2}', b'{"a": 3}']
+
+def test_iter_lines_too_long():
+    with pytest.raises(LineTooLongError):
+        _collect(_chunks(b"x" * 20), max_line_bytes=10)
+
+def test_iter_lines_too_long_complete_line():
+    with pytest.raises(LineTooLongError):
+        _collect(_chunks(b"x" * 20 + b"\n"), max_line_bytes=10)
+
+def test_iter_line_batches_one_batch_per_chunk():
+    async def run():
+        return [lines async for lines in iter_line_batches(_chunks(b'1\n2\n3', b'4', b'\n\n', b'5\n6'))]
+    # A chunk that completes no line yields nothing; the last line comes at the end
+    assert asyncio.run(run()) == [[b"1", b"2"], [b"34"], [b"5"], [b"6"]]
+
+def test_iter_line_batches_too_long_after_good_lines():
+    async def run():
+        batches = []
+        with pytest.raises(LineTooLongError):
+            async for lines in iter_line_batches(_chunks(b"ok\n" + b"x" * 20 + b"\n"), max_line_bytes=10):
+                batches.append(lines)
+        return batches
+    assert asyncio.run(run()) == [[b"ok"]]
+
+def test_closing_streaming_response_closes_body_on_disconnect():
+    from app.streaming import ClosingStreamingResponse
+
+    closed = asyncio.Event()
+
+    async def body():
+        try:
+            while True:
+                yield b"row\n"
+        finally:
+            closed.set()
+
+    async def run():
+        sent = []
+        disconnect = asyncio.Event()
+
+        async def receive():
+            await disconnect.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+            if len(sent) == 3:  # start + two body chunks, then the client goes away
+                disconnect.set()
+            await asyncio.sleep(0)  # the stream is cancelled here, outside the generator
+
+        response = ClosingStreamingResponse(body())
+        await response({"type": "http"}, receive, send)
+        return sent, closed.is_set()  # checked while the generator is still referenced
+
+    sent, closed_when_response_ended = asyncio.run(run())
+    assert sent[0]["type"] == "http.response.start"
+    assert closed_when_response_ended
+
+def test_closing_streaming_response_sync_iterator():
+    from app.streaming import ClosingStreamingResponse
+
+    async def run():
+        sent = []
+
+        async def receive():
+            await asyncio.sleep(10)
+
+        async def send(message):
+            sent.append(message)
+
+        await ClosingStreamingResponse(iter([b"a", b"b"]))({"type": "http"}, receive, send)
+        return b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body")
+
+    assert asyncio.run(run()) == b"ab"